@@ -0,0 +1,443 @@
+# ==============================
+# 🧠 LangGraph 노드 / 그래프 구성
+# ==============================
+# 추측 실행(SPECULATIVE_RETRIEVAL): route_intent 가 라우팅 결과를 기다리는 동안 제품 검색과 강의 검색을
+# ctx.speculation_pool 에서 함께 실행하고, 선택된 쪽 결과만 state["retrieval"] 로 에이전트에 넘깁니다.
+# 노드별 소요 시간은 node.<이름>_ms, 에이전트 안에서 검색을 기다린 시간은 <에이전트>.retrieval_wait_ms 로 기록합니다.
+# 라우팅 + 답변 한 번에(FUSED_ROUTING): route_intent 대신 route_and_answer 가 진입 노드가 되어, 로컬 분류가
+# 확정되지 않는 질문은 강의 컨텍스트 + product_lookup 도구로 한 번만 호출합니다 (바로 답하거나 Agent1 로 넘김).
+import time
+import logging
+import contextvars
+from functools import partial
+from typing import Callable, Literal, NamedTuple, TypedDict
+
+from langgraph.graph import END, StateGraph
+
+from config import (
+    CHAT_MODEL, FUSED_ROUTING, AGENT1_NORMALIZE_QUERY, AGENT1_TOP_K, AGENT2_METADATA_FILTER, AGENT2_TOP_K,
+    HYBRID_FETCH_K, HYBRID_RRF_K, AGENT1_MAX_K, AGENT1_MIN_SCORE, AGENT1_CONTEXT_TOKENS,
+    AGENT2_MAX_K, AGENT2_MIN_SCORE, AGENT2_CONTEXT_TOKENS, CONTEXT_MIN_DOCS,
+    MEMORY_RECENT_TURNS, MEMORY_MAX_TOKENS, MEMORY_SUMMARY_TOKENS, MEMORY_TURN_TOKENS,
+)
+from context_budget import ContextSelection, select_context
+from conversation_memory import ConversationMemory
+from llm_client import LLMUnavailableError
+from course_search import extract_conversation_constraints
+from metrics import metrics
+from retrievers import normalize_query, hybrid_search
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# 🧠 LangGraph 상태 정의
+# ==============================
+class GraphState(TypedDict, total=False):
+    user_query: str
+    chat_history: list
+    final_response: str
+    route: Literal["agent1", "agent2"]
+    route_source: Literal["local", "llm", "fallback", "fused"]
+    # 세션별 Agent2 대화 메모리 (conversation_memory.ConversationMemory)
+    memory: object
+    # 추측 실행으로 미리 가져온 선택 경로의 검색 결과 (ProductRetrieval | ContextSelection)
+    retrieval: object
+    # 스트리밍 실행 시에만 전달 (streaming.TokenStream)
+    on_token: Callable[[str], None]
+    on_route: Callable[[str], None]
+
+
+# ==============================
+# 💬 생성 호출 (on_token 이 있으면 스트리밍)
+# ==============================
+def chat_completion(ctx, messages: list, on_token: Callable[[str], None] | None = None) -> str:
+    if on_token is None:
+        res = ctx.client.chat.completions.create(model=CHAT_MODEL, messages=messages)
+        return res.choices[0].message.content.strip()
+
+    parts = []
+    for chunk in ctx.client.chat.completions.create(model=CHAT_MODEL, messages=messages, stream=True):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            on_token(delta)
+    return "".join(parts).strip()
+
+
+def chat_with_tools(ctx, messages: list, tools: list, on_token: Callable[[str], None] | None = None,
+                    on_answer: Callable[[], None] | None = None) -> tuple[str, str | None]:
+    # (답변, 호출한 도구 이름). 도구를 호출하면 답변은 "" (인자는 쓰지 않고 원래 질문으로 이어 감)
+    # 스트리밍은 첫 청크로 갈림: 도구 호출이면 본문을 내보내지 않고, 본문이면 on_answer() 후 토큰 전달
+    if on_token is None:
+        res = ctx.client.chat.completions.create(model=CHAT_MODEL, messages=messages, tools=tools)
+        message = res.choices[0].message
+        if getattr(message, "tool_calls", None):
+            return "", message.tool_calls[0].function.name
+        return (message.content or "").strip(), None
+
+    parts, tool = [], None
+    for chunk in ctx.client.chat.completions.create(model=CHAT_MODEL, messages=messages, tools=tools, stream=True):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        calls = getattr(delta, "tool_calls", None)
+        if calls and not parts:
+            # 이름은 첫 도구 호출 청크에만 옴
+            function = calls[0].function
+            if tool is None and function is not None and function.name:
+                tool = function.name
+        elif delta.content and tool is None:
+            if not parts and on_answer:
+                on_answer()
+            parts.append(delta.content)
+            on_token(delta.content)
+    return "".join(parts).strip(), tool
+
+
+# ==============================
+# 🩹 생성 장애 시 축약 답변 (llm_client 가 LLMUnavailableError 를 낸 경우)
+# ==============================
+def degraded_product_answer(docs: list) -> str:
+    if not docs:
+        return "⚠️ 지금은 답변 생성이 원활하지 않습니다. 잠시 후 다시 질문해 주세요."
+    excerpts = "\n\n".join(doc.page_content.strip()[:400] for doc in docs[:2])
+    return f"⚠️ 지금은 답변 생성이 지연되고 있어, 매뉴얼에서 찾은 관련 내용을 먼저 보여 드립니다.\n\n{excerpts}"
+
+
+def degraded_course_answer(docs: list) -> str:
+    titles = [doc.metadata.get("title") or doc.page_content.splitlines()[0] for doc in docs[:5]]
+    if not titles:
+        return "⚠️ 지금은 강의 추천이 원활하지 않습니다. 잠시 후 다시 시도해 주세요."
+    lines = "\n".join(f"- {title}" for title in titles)
+    return (f"⚠️ 지금은 맞춤 추천 생성이 지연되고 있어, 질문과 관련도가 높은 강의를 먼저 보여 드립니다.\n{lines}\n"
+            "링크: https://www.ubion.co.kr/ubion/")
+
+
+# ==============================
+# 📚 에이전트별 검색 (에이전트 노드 또는 추측 실행에서 호출)
+# ==============================
+class ProductRetrieval(NamedTuple):
+    query_vector: object
+    cached: str | None                # 의미 캐시 적중 시 답변 (검색 생략)
+    selection: ContextSelection | None
+    started: float                    # 검색 시작 시각 (캐시 비용 기록용, perf_counter)
+
+
+def retrieve_product_context(ctx, user_query: str) -> ProductRetrieval:
+    start = time.perf_counter()
+    # 검색은 질문 원문으로, 지시문 템플릿은 생성 단계에서만 적용
+    retrieval_query = normalize_query(user_query) if AGENT1_NORMALIZE_QUERY else user_query
+    query_vector = ctx.embeddings.embed_query(retrieval_query)
+
+    # 의미 캐시 적중 시 검색/생성 생략
+    if ctx.answer_cache is not None:
+        cached = ctx.answer_cache.lookup(query_vector)
+        if cached is not None:
+            return ProductRetrieval(query_vector, cached, None, start)
+
+    # 후보 AGENT1_MAX_K 개를 코사인 유사도와 함께 가져와 관련도 컷오프 + 토큰 예산으로 선택
+    if ctx.product_shards is not None:
+        # 질문에 맞는 제품군 샤드만 검색
+        candidates = ctx.product_shards.search(
+            retrieval_query, query_vector, k=AGENT1_MAX_K, fetch_k=HYBRID_FETCH_K, rrf_k=HYBRID_RRF_K,
+            with_similarity=True,
+        )
+    else:
+        # 모델명/단위 등 정확한 토큰은 키워드 검색으로 보완 (키워드 인덱스가 없으면 벡터 순위만)
+        candidates = hybrid_search(
+            ctx.rag_retriever.vectorstore, ctx.pdf_keyword_index, retrieval_query, query_vector,
+            k=AGENT1_MAX_K, fetch_k=HYBRID_FETCH_K, rrf_k=HYBRID_RRF_K, with_similarity=True,
+        )
+    selection = select_context(
+        candidates, AGENT1_CONTEXT_TOKENS, min_score=AGENT1_MIN_SCORE, min_docs=CONTEXT_MIN_DOCS,
+        baseline_k=AGENT1_TOP_K, name="agent1",
+    )
+    metrics.observe("agent1.retrieval_ms", (time.perf_counter() - start) * 1000)
+    return ProductRetrieval(query_vector, None, selection, start)
+
+
+def retrieve_course_context(ctx, user_query: str, chat_history: list) -> ContextSelection:
+    start = time.perf_counter()
+    # 대화에서 추출한 조건으로 카탈로그를 먼저 거른 뒤, 남은 강의 안에서만 유사 강의 Top N 추출
+    constraints = {}
+    if AGENT2_METADATA_FILTER:
+        user_messages = [turn["user"] for turn in chat_history] + [user_query]
+        constraints = extract_conversation_constraints(user_messages)
+    query_vector = ctx.embeddings.embed_query(user_query)
+    results = ctx.course_searcher.search(
+        user_query, k=AGENT2_MAX_K, constraints=constraints, query_vector=query_vector,
+        with_similarity=True,
+    )
+    if not results and constraints:
+        # 조건을 만족하는 강의가 없으면 조건 없이 검색
+        results = ctx.course_searcher.search(
+            user_query, k=AGENT2_MAX_K, query_vector=query_vector, with_similarity=True
+        )
+    selection = select_context(
+        results, AGENT2_CONTEXT_TOKENS, min_score=AGENT2_MIN_SCORE, min_docs=CONTEXT_MIN_DOCS,
+        baseline_k=AGENT2_TOP_K, name="agent2",
+    )
+    metrics.observe("agent2.retrieval_ms", (time.perf_counter() - start) * 1000)
+    return selection
+
+
+def _memory(state: GraphState) -> ConversationMemory:
+    # 세션 메모리가 없으면 (벤치마크 / 단발 호출) chat_history 의 최근 턴만 사용
+    return state.get("memory") or ConversationMemory.from_history(
+        state.get("chat_history", []), recent_turns=MEMORY_RECENT_TURNS, max_tokens=MEMORY_MAX_TOKENS,
+        summary_tokens=MEMORY_SUMMARY_TOKENS, turn_tokens=MEMORY_TURN_TOKENS,
+    )
+
+
+def _prefetched(state: GraphState, name: str, retrieve: Callable):
+    # 추측 실행 결과가 있으면 그대로, 없으면 지금 검색 (검색을 기다린 시간을 기록)
+    start = time.perf_counter()
+    result = state.get("retrieval") if state.get("route") == name else None
+    if result is None:
+        result = retrieve()
+    metrics.observe(f"{name}.retrieval_wait_ms", (time.perf_counter() - start) * 1000)
+    return result
+
+
+# ==============================
+# 🔍 의도 분류 엔진 노드
+# ==============================
+def route_intent(ctx, state: GraphState) -> GraphState:
+    speculative = {}
+    if ctx.speculation_pool is not None:
+        # 라우팅 LLM 호출과 겹치도록 두 경로의 검색을 먼저 시작 (요청 우선순위 등 contextvars 는 작업마다 복사)
+        user_query = state["user_query"]
+        speculative = {
+            "agent1": ctx.speculation_pool.submit(
+                contextvars.copy_context().run, retrieve_product_context, ctx, user_query),
+            "agent2": ctx.speculation_pool.submit(
+                contextvars.copy_context().run, retrieve_course_context, ctx, user_query,
+                state.get("chat_history", [])),
+        }
+
+    routed = False
+    try:
+        decision = ctx.router.route(state["user_query"])
+        if state.get("on_route"):
+            state["on_route"](decision.route)
+        routed = True
+    finally:
+        if not routed:
+            # 라우팅 실패: 어느 검색 결과도 쓰지 않으므로 모두 취소 (실행 중인 작업은 결과만 버림)
+            for future in speculative.values():
+                future.cancel()
+                metrics.incr("speculation.discarded")
+    update = {**state, "route": decision.route, "route_source": decision.source}
+
+    if speculative:
+        for name, future in speculative.items():
+            if name != decision.route:
+                future.cancel()  # 아직 시작 전이면 취소, 실행 중이면 결과만 버림
+                metrics.incr("speculation.discarded")
+        start = time.perf_counter()
+        try:
+            update["retrieval"] = speculative[decision.route].result()
+            metrics.incr("speculation.used")
+        except Exception as e:
+            # 에이전트 노드에서 다시 검색 (실패하면 거기서 오류 응답)
+            logger.warning(f"❗추측 검색 실패, 에이전트에서 다시 검색: {e}")
+        metrics.observe("speculation.wait_ms", (time.perf_counter() - start) * 1000)
+    return update
+
+
+# ==============================
+# 🔀 라우팅 + Agent2 답변 한 번에 (FUSED_ROUTING)
+# ==============================
+PRODUCT_LOOKUP_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "product_lookup",
+        "description": "삼성전자 제품의 스펙, 기능, 사용법 등 제품 정보 질문일 때 제품 매뉴얼을 검색해 답합니다.",
+        "parameters": {
+            "type": "object",
+            "properties": {"query": {"type": "string", "description": "매뉴얼에서 찾을 사용자 질문"}},
+            "required": ["query"],
+        },
+    },
+}
+
+
+def route_and_answer(ctx, state: GraphState) -> GraphState:
+    user_query = state["user_query"]
+    on_route = state.get("on_route")
+    decision = ctx.router.local_decision(user_query)
+    if decision is not None:
+        # 로컬 분류로 확정: 기존 에이전트 노드로 (라우팅 LLM 호출 없음)
+        if on_route:
+            on_route(decision.route)
+        return {**state, "route": decision.route, "route_source": decision.source}
+
+    product = course = None
+    if ctx.speculation_pool is not None:
+        # 강의 검색과 (도구 호출로 Agent1 에 넘어갈 경우를 대비한) 제품 검색을 동시에 시작
+        product = ctx.speculation_pool.submit(contextvars.copy_context().run, retrieve_product_context, ctx, user_query)
+        course = ctx.speculation_pool.submit(
+            contextvars.copy_context().run, retrieve_course_context, ctx, user_query, state.get("chat_history", []))
+
+    route_source, selection = "fused", None
+    try:
+        # 강의 컨텍스트를 붙여 한 번 호출: 바로 답하면 Agent2 답변, product_lookup 호출이면 Agent1 로
+        if course is not None:
+            selection = course.result()
+        else:
+            selection = retrieve_course_context(ctx, user_query, state.get("chat_history", []))
+        formatted_prompt = ctx.course_prompt_template.format(
+            full_history=_memory(state).render(user_query),
+            course_data="\n\n".join(doc.page_content for doc in selection.docs),
+        )
+        answer, tool = chat_with_tools(ctx, [
+            {"role": "system", "content": ctx.fused_route_prompt},
+            {"role": "user", "content": formatted_prompt},
+        ], [PRODUCT_LOOKUP_TOOL], on_token=state.get("on_token"),
+            on_answer=partial(on_route, "agent2") if on_route else None)
+    except LLMUnavailableError:
+        # 생성 장애: 로컬 분류로 이어 가고, Agent2 면 강의 제목 목록으로 대체
+        route_source, answer, tool = "fallback", "", None
+        if ctx.router.fallback_decision(user_query).route == "agent1":
+            tool = PRODUCT_LOOKUP_TOOL["function"]["name"]
+        else:
+            answer = degraded_course_answer(selection.docs if selection is not None else [])
+            if state.get("on_token"):
+                state["on_token"](answer)
+    except Exception as e:
+        answer, tool = f"❗추천 생성 중 오류 발생: {e}", None
+
+    if tool is not None:
+        metrics.incr("fused.tool_calls")
+        if on_route:
+            on_route("agent1")
+        update = {**state, "route": "agent1", "route_source": route_source}
+        if product is not None:
+            try:
+                update["retrieval"] = product.result()
+            except Exception as e:
+                logger.warning(f"❗추측 검색 실패, 에이전트에서 다시 검색: {e}")
+        return update
+
+    metrics.incr("fused.answers")
+    if product is not None:
+        product.cancel()
+        metrics.incr("speculation.discarded")
+    if on_route:
+        on_route("agent2")
+    return {**state, "route": "agent2", "route_source": route_source, "final_response": answer}
+
+
+# ==============================
+# 🤖 Agent1 (RAG 기반 제품 답변)
+# ==============================
+def agent1_product_info(ctx, state: GraphState) -> GraphState:
+    user_query = state["user_query"]
+    on_token = state.get("on_token")
+    try:
+        retrieval = _prefetched(state, "agent1", lambda: retrieve_product_context(ctx, user_query))
+        if retrieval.cached is not None:
+            if on_token:
+                on_token(retrieval.cached)
+            return {**state, "final_response": retrieval.cached}
+        selection = retrieval.selection
+        context = "\n\n".join(doc.page_content for doc in selection.docs)
+
+        formatted_prompt = ctx.agent1_prompt_template.format(
+            context=context,
+            user_query=user_query
+        )
+
+        try:
+            answer = chat_completion(ctx, [
+                {"role": "system", "content": "삼성전자 제품 정보 전문가"},
+                {"role": "user", "content": formatted_prompt}
+            ], on_token=on_token)
+        except LLMUnavailableError:
+            # 생성 장애: 검색한 매뉴얼 내용을 그대로 보여 주는 축약 답변 (캐시하지 않음)
+            answer = degraded_product_answer(selection.docs)
+            if on_token:
+                on_token(answer)
+            return {**state, "final_response": answer}
+
+        if ctx.answer_cache is not None:
+            ctx.answer_cache.put(retrieval.query_vector, answer, (time.perf_counter() - retrieval.started) * 1000)
+    except Exception as e:
+        answer = f"❗제품 정보 조회 중 오류 발생: {e}"
+    return {**state, "final_response": answer}
+
+
+# ==============================
+# 🎓 Agent2 (강의 추천 챗봇)
+# ==============================
+def agent2_recommend_courses(ctx, state: GraphState) -> GraphState:
+    full_history = _memory(state).render(state["user_query"])
+
+    try:
+        selection = _prefetched(state, "agent2", lambda: retrieve_course_context(
+            ctx, state["user_query"], state.get("chat_history", [])))
+        top_courses_text = "\n\n".join(doc.page_content for doc in selection.docs)
+
+        formatted_prompt = ctx.course_prompt_template.format(
+            full_history=full_history,
+            course_data=top_courses_text
+        )
+
+        try:
+            response_text = chat_completion(ctx, [
+                {"role": "system", "content": "삼성전자 세일즈 강의 추천 전문가"},
+                {"role": "user", "content": formatted_prompt}
+            ], on_token=state.get("on_token"))
+        except LLMUnavailableError:
+            # 생성 장애: 관련도 순 강의 제목 목록으로 대체
+            response_text = degraded_course_answer(selection.docs)
+            if state.get("on_token"):
+                state["on_token"](response_text)
+    except Exception as e:
+        response_text = f"❗추천 생성 중 오류 발생: {e}"
+
+    return {**state, "final_response": response_text}
+
+
+# ==============================
+# 🔁 LangGraph 구축
+# ==============================
+AGENTS = {
+    "agent1": agent1_product_info,
+    "agent2": agent2_recommend_courses
+}
+
+
+def _timed_node(name: str, node: Callable) -> Callable:
+    def run(state: GraphState) -> GraphState:
+        start = time.perf_counter()
+        try:
+            return node(state)
+        finally:
+            metrics.observe(f"node.{name}_ms", (time.perf_counter() - start) * 1000)
+    return run
+
+
+def _next_node(state: GraphState) -> str:
+    # route_and_answer 가 이미 답한 경우(Agent2 직접 답변) 바로 종료
+    return END if state.get("final_response") is not None else state["route"]
+
+
+def build_graph(ctx, fused: bool = FUSED_ROUTING):
+    builder = StateGraph(GraphState)
+    entry, node = ("route_and_answer", route_and_answer) if fused else ("route_intent", route_intent)
+    builder.add_node(entry, _timed_node(entry, partial(node, ctx)))
+
+    # 에이전트 등록 반복문
+    for name, func in AGENTS.items():
+        builder.add_node(name, _timed_node(name, partial(func, ctx)))
+    builder.set_entry_point(entry)
+
+    # 조건부 라우팅도 AGENTS 기반으로 구성
+    builder.add_conditional_edges(entry, _next_node, {
+        **{k: k for k in AGENTS}, END: END
+    })
+    return builder.compile()
@@ -0,0 +1,256 @@
+# ==============================
+# 🧩 프로세스 단위 애플리케이션 컨텍스트
+# ==============================
+# Streamlit 은 상호작용마다 엔트리 스크립트(stdemo7.py) 최상단을 다시 실행합니다.
+# 클라이언트 / 프롬프트 템플릿 / 리트리버 / 컴파일된 그래프는 여기서 프로세스당 한 번만
+# 만들고 모든 세션과 rerun 이 공유합니다.
+import os
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import httpx
+from supabase import create_client
+from langchain.prompts import PromptTemplate
+
+import config
+from agents import build_graph
+from backends import create_chat_client, create_embeddings, with_embedding_store
+from conversation_memory import ConversationMemory, summarize_with_llm
+from chat_store import ChatOutbox, ChatWriter, MemoryBackend, SupabaseBackend
+from router import IntentRouter, classify_with_llm
+from semantic_cache import SemanticCache, index_fingerprint
+from course_catalog import CourseCatalog
+from course_search import CourseSearcher
+from course_rerank import CourseReranker
+from keyword_index import sync_keyword_index
+from pdf_ingest import ingest_pdf_directory
+from product_shards import ShardRouter, build_product_shards
+from retrievers import (
+    load_or_create_rag_retriever,
+    load_course_data,
+    create_course_rag_retriever,
+)
+
+
+# ==============================
+# 프롬프트 로딩
+# ==============================
+def load_prompt(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class AppContext:
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+
+        with self._timed("openai_client"):
+            # 모든 OpenAI 호출(채팅 + 임베딩)이 하나의 커넥션 풀을 재사용
+            self.http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self.client = create_chat_client(self.http_client)
+            base_embeddings = create_embeddings(self.http_client)
+
+        with self._timed("embedding_store"):
+            self.embeddings = with_embedding_store(base_embeddings)
+
+        with self._timed("supabase_client"):
+            if config.CHAT_STORE_BACKEND == "memory":
+                self.supabase = None
+                chat_backend = MemoryBackend()
+            else:
+                self.supabase = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+                chat_backend = SupabaseBackend(self.supabase)
+            if config.CHAT_STORE_MODE == "queue":
+                self.chat_writer = ChatWriter(
+                    chat_backend,
+                    batch_size=config.CHAT_WRITER_BATCH_SIZE,
+                    flush_interval=config.CHAT_WRITER_FLUSH_INTERVAL,
+                    max_queue=config.CHAT_WRITER_MAX_QUEUE,
+                )
+            else:
+                self.chat_writer = ChatOutbox(
+                    config.CHAT_OUTBOX_PATH,
+                    chat_backend,
+                    batch_size=config.CHAT_WRITER_BATCH_SIZE,
+                    flush_interval=config.CHAT_WRITER_FLUSH_INTERVAL,
+                    max_backoff=config.CHAT_OUTBOX_MAX_BACKOFF,
+                    max_attempts=config.CHAT_OUTBOX_MAX_ATTEMPTS,
+                )
+
+        with self._timed("prompts"):
+            self.routing_prompt_template = PromptTemplate(
+                input_variables=["user_query"],
+                template=load_prompt(os.path.join(config.PROMPT_DIR, "routing_prompt.txt"))
+            )
+            self.agent1_prompt_template = PromptTemplate(
+                input_variables=["context", "user_query"],
+                template=load_prompt(os.path.join(config.PROMPT_DIR, "agent1_prompt.txt"))
+            )
+            self.course_prompt_template = PromptTemplate(
+                input_variables=["full_history", "course_data"],
+                template=load_prompt(os.path.join(config.PROMPT_DIR, "agent2_prompt.txt"))
+            )
+            # FUSED_ROUTING: 라우팅 지시 + 도구 정의로 분류와 Agent2 답변을 한 번에 (agents.route_and_answer)
+            self.fused_route_prompt = load_prompt(os.path.join(config.PROMPT_DIR, "fused_route_prompt.txt"))
+            self.summary_prompt_template = PromptTemplate(
+                input_variables=["summary", "turns", "max_tokens"],
+                template=load_prompt(os.path.join(config.PROMPT_DIR, "conversation_summary_prompt.txt"))
+            )
+
+        with self._timed("router"):
+            self.router = IntentRouter(
+                self.embeddings,
+                partial(classify_with_llm, self.client, self.routing_prompt_template),
+                config.ROUTING_EXAMPLES_PATH,
+                mode=config.ROUTER_MODE,
+                margin_threshold=config.ROUTER_MARGIN_THRESHOLD,
+            )
+            if self.router.mode != "llm":
+                self.router.centroids  # 예시 임베딩 미리 계산
+
+        with self._timed("rag_retriever"):
+            self.product_shards = None
+            self.rag_retriever = None
+            self.pdf_keyword_index = None
+            if config.PRODUCT_SHARDS_ENABLED:
+                ingest_kwargs = dict(
+                    workers=config.INGEST_WORKERS, batch_size=config.INGEST_EMBED_BATCH_SIZE,
+                    max_inflight=config.INGEST_EMBED_CONCURRENCY, storage=config.INDEX_STORAGE,
+                    checkpoint_every=config.INGEST_CHECKPOINT_CHUNKS,
+                )
+                if config.PRODUCT_CORPUS_DIR:
+                    build_product_shards(
+                        config.PRODUCT_CORPUS_DIR, config.PRODUCT_SHARD_DIR, self.embeddings,
+                        hybrid=config.HYBRID_SEARCH_ENABLED, **ingest_kwargs,
+                    )
+                self.product_shards = ShardRouter(
+                    config.PRODUCT_SHARD_DIR, self.embeddings,
+                    max_shards=config.PRODUCT_SHARD_MAX_ROUTED, margin=config.PRODUCT_SHARD_ROUTE_MARGIN,
+                    memory_budget_mb=config.PRODUCT_SHARD_MEMORY_MB, storage=config.INDEX_STORAGE,
+                    hybrid=config.HYBRID_SEARCH_ENABLED,
+                )
+            elif config.PDF_DIR:
+                pdf_db, _ = ingest_pdf_directory(
+                    config.PDF_DIR, self.embeddings, index_dir=config.PDF_INDEX_DIR,
+                    workers=config.INGEST_WORKERS, batch_size=config.INGEST_EMBED_BATCH_SIZE,
+                    max_inflight=config.INGEST_EMBED_CONCURRENCY, storage=config.INDEX_STORAGE,
+                    checkpoint_every=config.INGEST_CHECKPOINT_CHUNKS,
+                )
+                self.rag_retriever = pdf_db.as_retriever()
+            else:
+                self.rag_retriever = load_or_create_rag_retriever(
+                    config.PDF_PATH, self.embeddings, index_dir=config.PDF_INDEX_DIR,
+                    dedup=config.PDF_INDEX_DEDUP, storage=config.INDEX_STORAGE,
+                )
+            if self.rag_retriever is not None and config.HYBRID_SEARCH_ENABLED:
+                self.pdf_keyword_index = sync_keyword_index(config.PDF_INDEX_DIR, self.rag_retriever.vectorstore)
+
+        with self._timed("answer_cache"):
+            self.answer_cache = None
+            if config.AGENT1_CACHE_ENABLED:
+                agent1_index_dir = config.PRODUCT_SHARD_DIR if config.PRODUCT_SHARDS_ENABLED else config.PDF_INDEX_DIR
+                self.answer_cache = SemanticCache(
+                    threshold=config.AGENT1_CACHE_THRESHOLD,
+                    max_entries=config.AGENT1_CACHE_MAX_ENTRIES,
+                    ttl=config.AGENT1_CACHE_TTL,
+                    fingerprint_fn=partial(index_fingerprint, agent1_index_dir),
+                    fingerprint_interval=config.AGENT1_CACHE_FINGERPRINT_INTERVAL,
+                    name="agent1_cache",
+                )
+
+        with self._timed("course_catalog"):
+            self.course_catalog = CourseCatalog.from_records(load_course_data(config.COURSE_DATA_PATH))
+
+        with self._timed("course_retriever"):
+            self.course_retriever = create_course_rag_retriever(
+                self.course_catalog, self.embeddings, index_dir=config.COURSE_INDEX_DIR,
+                dedup=config.COURSE_INDEX_DEDUP, storage=config.INDEX_STORAGE,
+                index_type=config.COURSE_INDEX_TYPE, index_params=config.COURSE_INDEX_PARAMS,
+            )
+            self.course_keyword_index = None
+            if config.HYBRID_SEARCH_ENABLED:
+                self.course_keyword_index = sync_keyword_index(
+                    config.COURSE_INDEX_DIR, self.course_retriever.vectorstore
+                )
+            reranker = None
+            if config.AGENT2_RERANK_ENABLED:
+                reranker = CourseReranker(
+                    self.course_catalog,
+                    weights=config.AGENT2_RERANK_WEIGHTS,
+                    half_life_days=config.AGENT2_FRESHNESS_HALF_LIFE_DAYS,
+                )
+            self.course_searcher = CourseSearcher.from_vectorstore(
+                self.course_retriever.vectorstore, self.course_catalog, self.embeddings,
+                reranker=reranker, rerank_candidates=config.AGENT2_RERANK_CANDIDATES,
+                collapse_titles=config.AGENT2_COLLAPSE_TITLES, mmr_lambda=config.AGENT2_MMR_LAMBDA,
+                keyword_index=self.course_keyword_index, rrf_k=config.HYBRID_RRF_K,
+            )
+
+        with self._timed("graph"):
+            # 추측 실행용 검색 스레드 (SPECULATIVE_RETRIEVAL, agents.route_intent)
+            self.speculation_pool = None
+            if config.SPECULATIVE_RETRIEVAL:
+                self.speculation_pool = ThreadPoolExecutor(config.SPECULATIVE_WORKERS, thread_name_prefix="speculate")
+            # 대화 메모리 요약용 스레드 (new_memory, add_turn 이 LLM 호출을 기다리지 않게)
+            self.memory_pool = ThreadPoolExecutor(config.MEMORY_SUMMARY_WORKERS, thread_name_prefix="memory")
+            self.graph = build_graph(self)
+
+    def new_memory(self) -> ConversationMemory:
+        # 세션(대화)마다 하나씩 생성해 st.session_state 에 보관
+        return ConversationMemory(
+            partial(summarize_with_llm, self.client, self.summary_prompt_template,
+                    config.MEMORY_SUMMARY_MODEL, config.MEMORY_SUMMARY_TOKENS),
+            recent_turns=config.MEMORY_RECENT_TURNS, max_tokens=config.MEMORY_MAX_TOKENS,
+            summary_tokens=config.MEMORY_SUMMARY_TOKENS, turn_tokens=config.MEMORY_TURN_TOKENS,
+            executor=self.memory_pool,
+        )
+
+    @contextmanager
+    def _timed(self, step: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[step] = time.perf_counter() - start
+
+    def startup_report(self) -> str:
+        lines = [f"{step:<18}{sec * 1000:9.1f} ms" for step, sec in self.timings.items()]
+        lines.append(f"{'total':<18}{sum(self.timings.values()) * 1000:9.1f} ms")
+        return "\n".join(lines)
+
+    def close(self):
+        # 종료 시 큐에 남은 chat_history 행을 먼저 기록
+        self.chat_writer.close()
+        if self.speculation_pool is not None:
+            self.speculation_pool.shutdown(wait=False, cancel_futures=True)
+        self.memory_pool.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
+        self.http_client.close()
+
+
+# ==============================
+# 🔒 프로세스 싱글턴
+# ==============================
+_context: AppContext | None = None
+_context_lock = threading.Lock()
+
+
+def get_app_context() -> AppContext:
+    # Streamlit 세션은 스레드마다 실행되므로 최초 빌드는 락으로 한 번만 수행
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                _context = AppContext()
+                atexit.register(_context.close)
+    return _context
@@ -0,0 +1,80 @@
+# ==============================
+# 🔌 임베딩 / 채팅 백엔드 선택
+# ==============================
+# 인덱스 빌드, 질의 임베딩, 라우팅, 답변 생성이 모두 이 팩토리를 거칩니다.
+#   EMBEDDING_BACKEND: "openai" | "hashing" (오프라인, 결정적)
+#   CHAT_BACKEND     : "openai" | "fake"    (오프라인, client.chat.completions.create 호환)
+# 채팅 / 임베딩 호출은 프로세스 단위 스케줄러(scheduler.py)를 거쳐 RPM / TPM 한도 안에서 보냅니다.
+import threading
+
+import openai
+from langchain_openai import OpenAIEmbeddings
+
+import config
+from embedding_store import CachedEmbeddings, EmbeddingStore, embedding_model_name
+from llm_client import CircuitBreaker, ResilientChatClient
+from offline_backends import HashingEmbeddings, FakeChatClient
+from scheduler import RequestScheduler, ScheduledEmbeddings
+
+_schedulers: dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(kind: str) -> RequestScheduler | None:
+    # "llm" | "embedding": 세션이 몇 개든 프로세스 전체가 하나의 한도를 공유
+    # 오프라인 백엔드(fake / hashing)는 요청 한도가 없으므로 스케줄러 없음
+    if kind == "llm":
+        backend, limits = config.CHAT_BACKEND, (config.LLM_RPM, config.LLM_TPM, config.LLM_MAX_CONCURRENCY)
+    elif kind == "embedding":
+        backend = config.EMBEDDING_BACKEND
+        limits = (config.EMBEDDING_RPM, config.EMBEDDING_TPM, config.EMBEDDING_MAX_CONCURRENCY)
+    else:
+        raise ValueError(f"지원하지 않는 스케줄러 종류: {kind}")
+    if not config.SCHEDULER_ENABLED or backend != "openai":
+        return None
+    with _schedulers_lock:
+        if kind not in _schedulers:
+            rpm, tpm, max_concurrency = limits
+            _schedulers[kind] = RequestScheduler(rpm, tpm, max_concurrency,
+                                                 burst_seconds=config.SCHEDULER_BURST_SECONDS, name=f"{kind}_queue")
+        return _schedulers[kind]
+
+
+def create_embeddings(http_client=None):
+    if config.EMBEDDING_BACKEND == "openai":
+        embeddings = OpenAIEmbeddings(api_key=config.API_KEY, http_client=http_client)
+    elif config.EMBEDDING_BACKEND == "hashing":
+        embeddings = HashingEmbeddings(dim=config.HASHING_EMBEDDING_DIM)
+    else:
+        raise ValueError(f"지원하지 않는 임베딩 백엔드: {config.EMBEDDING_BACKEND}")
+    scheduler = get_scheduler("embedding")
+    if scheduler is None:
+        return embeddings
+    # 임베딩 저장소(with_embedding_store)가 바깥에서 감싸므로 저장소에 없는 텍스트만 한도를 씀
+    return ScheduledEmbeddings(embeddings, scheduler, timeout=config.EMBEDDING_QUEUE_TIMEOUT or None)
+
+
+def with_embedding_store(embeddings):
+    # 인덱스 빌드와 질의 임베딩이 모두 영속 저장소를 거침
+    if not config.EMBEDDING_STORE_ENABLED:
+        return embeddings
+    return CachedEmbeddings(embeddings, EmbeddingStore(config.EMBEDDING_STORE_DIR, embedding_model_name(embeddings)))
+
+
+def create_chat_client(http_client=None):
+    # 모든 채팅 호출이 마감 시간 / 재시도 / 헤징 / 서킷 브레이커 계층을 거침 (llm_client.py)
+    if config.CHAT_BACKEND == "openai":
+        # OPENAI_BASE_URL 로 로컬 가짜 서버(bench/fake_openai_server.py)를 가리킬 수 있음
+        client = openai.OpenAI(api_key=config.API_KEY, http_client=http_client, max_retries=0)
+    elif config.CHAT_BACKEND == "fake":
+        client = FakeChatClient(ttft=config.FAKE_CHAT_TTFT, token_delay=config.FAKE_CHAT_TOKEN_DELAY)
+    else:
+        raise ValueError(f"지원하지 않는 채팅 백엔드: {config.CHAT_BACKEND}")
+    return ResilientChatClient(
+        client, deadline=config.LLM_DEADLINE, attempt_timeout=config.LLM_ATTEMPT_TIMEOUT,
+        max_retries=config.LLM_MAX_RETRIES, backoff_base=config.LLM_BACKOFF_BASE, backoff_max=config.LLM_BACKOFF_MAX,
+        hedge=config.LLM_HEDGE_ENABLED, hedge_quantile=config.LLM_HEDGE_QUANTILE,
+        hedge_default_delay=config.LLM_HEDGE_DEFAULT_DELAY, hedge_min_delay=config.LLM_HEDGE_MIN_DELAY,
+        breaker=CircuitBreaker(config.LLM_BREAKER_FAILURES, config.LLM_BREAKER_COOLDOWN),
+        scheduler=get_scheduler("llm"), completion_tokens=config.SCHEDULER_COMPLETION_TOKENS,
+    )
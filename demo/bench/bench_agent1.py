@@ -0,0 +1,88 @@
+# ==============================
+# 🤖 Agent1 파이프라인 벤치마크 (before / after)
+# ==============================
+# before: 지시문 전체를 감싼 질의로 RetrievalQA(OpenAI completion) 호출
+# after : 질문 원문으로 검색 + 생성 단계에서만 템플릿 적용 (chat 1회)
+# 실행: 저장소 루트에서 python demo/bench/bench_agent1.py [--no-e2e]
+import os
+import sys
+import json
+import time
+import statistics
+
+from langchain.chains import RetrievalQA
+from langchain_openai import OpenAI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from app_context import get_app_context
+from agents import agent1_product_info
+from retrievers import normalize_query
+from token_count import get_encoding
+
+QUERIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "agent1_queries.json")
+
+
+def legacy_query(ctx, user_query: str) -> str:
+    # 기존 agent1_prompt.txt 는 지시문 블록만 있었고 그 전체가 검색 질의로 사용됨
+    instructions = ctx.agent1_prompt_template.template.split("\n\n\n[제품 정보]")[0]
+    return instructions.replace("{user_query}", user_query)
+
+
+def hit_rank(docs, keywords: list) -> int | None:
+    for rank, doc in enumerate(docs, start=1):
+        if any(k in doc.page_content for k in keywords):
+            return rank
+    return None
+
+
+def retrieval_stats(ctx, samples: list, to_query) -> dict:
+    enc = get_encoding("cl100k_base")
+    tokens, hits, rr = [], 0, []
+    for sample in samples:
+        query = to_query(sample["query"])
+        tokens.append(len(enc.encode(query)))
+        rank = hit_rank(ctx.rag_retriever.invoke(query), sample["keywords"])
+        hits += rank is not None
+        rr.append(1 / rank if rank else 0.0)
+    return {
+        "embed_tokens": statistics.mean(tokens),
+        "hit_rate": hits / len(samples),
+        "mrr": statistics.mean(rr),
+    }
+
+
+def e2e_latency(samples: list, answer) -> float:
+    latencies = []
+    for sample in samples:
+        start = time.perf_counter()
+        answer(sample["query"])
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def main(run_e2e: bool = True):
+    with open(QUERIES_PATH, "r", encoding="utf-8") as f:
+        samples = json.load(f)
+    ctx = get_app_context()
+
+    before = retrieval_stats(ctx, samples, lambda q: legacy_query(ctx, q))
+    after = retrieval_stats(ctx, samples, normalize_query)
+
+    print(f"samples={len(samples)}")
+    print(f"{'':<8}{'embed_tokens':>14}{'hit@k':>8}{'mrr':>8}{'p50_ms':>10}")
+    if run_e2e:
+        ctx.answer_cache = None  # 응답 캐시 제외하고 파이프라인만 비교
+        # before 는 OpenAI completion 모델 전용이므로 오프라인 백엔드에서는 생략
+        if config.CHAT_BACKEND == "openai":
+            legacy_chain = RetrievalQA.from_chain_type(llm=OpenAI(temperature=0), retriever=ctx.rag_retriever)
+            before["p50_ms"] = e2e_latency(samples, lambda q: legacy_chain.invoke(legacy_query(ctx, q)))
+        after["p50_ms"] = e2e_latency(samples, lambda q: agent1_product_info(ctx, {"user_query": q}))
+    for name, r in (("before", before), ("after", after)):
+        p50 = f"{r['p50_ms']:>10.0f}" if "p50_ms" in r else f"{'-':>10}"
+        print(f"{name:<8}{r['embed_tokens']:>14.1f}{r['hit_rate']:>8.2f}{r['mrr']:>8.2f}{p50}")
+
+
+if __name__ == "__main__":
+    main(run_e2e="--no-e2e" not in sys.argv)
@@ -0,0 +1,61 @@
+# ==============================
+# 💾 chat_history 저장 벤치마크 (동기 insert vs write-behind)
+# ==============================
+# Supabase 대신 지연을 주입한 MemoryBackend 사용
+# 실행: 저장소 루트에서 python demo/bench/bench_chat_writer.py
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_store import ChatWriter, MemoryBackend
+from metrics import metrics
+
+
+def make_rows(conversations: int, turns: int) -> list[dict]:
+    return [
+        {"conversation_id": f"conv_{c}", "turn_index": t, "user_input": "q", "llm_response": "a"}
+        for t in range(turns) for c in range(conversations)
+    ]
+
+
+def main(latency: float = 0.08, conversations: int = 10, turns: int = 30):
+    rows = make_rows(conversations, turns)
+
+    # before: 답변마다 동기 insert
+    backend = MemoryBackend(latency=latency)
+    sync_waits = []
+    for row in rows[:50]:
+        start = time.perf_counter()
+        backend.insert_rows([row])
+        sync_waits.append(time.perf_counter() - start)
+
+    # after: enqueue 후 즉시 반환, 백그라운드에서 배치 기록
+    backend = MemoryBackend(latency=latency)
+    writer = ChatWriter(backend, batch_size=20, flush_interval=0.2, max_queue=100)
+    async_waits = []
+    for row in rows:
+        start = time.perf_counter()
+        writer.enqueue(row)
+        async_waits.append(time.perf_counter() - start)
+    writer.close()
+
+    # conversation 별 turn_index 순서 확인
+    ordered = all(
+        [r["turn_index"] for r in backend.rows if r["conversation_id"] == f"conv_{c}"] == list(range(turns))
+        for c in range(conversations)
+    )
+
+    print(f"backend latency={latency * 1000:.0f} ms  rows={len(rows)}")
+    print(f"sync insert  p50 wait: {statistics.median(sync_waits) * 1000:8.2f} ms")
+    print(f"write-behind p50 wait: {statistics.median(async_waits) * 1000:8.3f} ms")
+    print(f"backend calls={backend.calls}  written={len(backend.rows)}  ordered={ordered}")
+    for name, value in metrics.summary().items():
+        if name.startswith("chat_writer."):
+            print(f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# ==============================
+# ✂️ 검색 컨텍스트 선택 벤치마크 (고정 k vs 관련도 컷오프 + 토큰 예산)
+# ==============================
+# Agent1 평가 질의(bench/data/agent1_queries.json)와 Agent2 라우팅 질의로
+#   - 고정 k: 상위 AGENT1_TOP_K / AGENT2_TOP_K 개를 그대로 프롬프트에 넣음
+#   - 선택  : 후보 *_MAX_K 개 중 min_score 이상을 토큰 예산 안에서 채움 (select_context)
+# 의 평균 컨텍스트 토큰 / 문서 수와 Agent1 정답 포함률(정답 키워드가 컨텍스트에 있는지)을 비교합니다.
+# min_score 를 바꿔 가며 토큰 절감과 정답 포함률의 교환 관계를 보여 줍니다.
+# 무관 질의(OFF_TOPIC_QUERIES)에서는 설정된 *_MIN_SCORE 컷오프가 실제로 후보를 버리는지 확인합니다
+# (버리지 않으면 종료 코드 1: 임베딩 모델에 비해 컷오프가 너무 낮음). 설정된 컷오프가 고정 k 보다
+# Agent1 정답 포함률을 떨어뜨려도 종료 코드 1 입니다 (컷오프가 너무 높음).
+# --e2e: 두 컨텍스트로 실제 생성까지 호출해 Agent1 p50 지연 비교 (CHAT_BACKEND=openai 일 때 의미 있음)
+# 실행: 저장소 루트에서 python demo/bench/bench_context_budget.py [--e2e]
+import os
+import sys
+import json
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from agents import chat_completion
+from app_context import get_app_context
+from context_budget import select_context
+from retrievers import hybrid_search, normalize_query
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+# 설정된 컷오프 전후 (임베딩 모델마다 유사도 분포가 다름)
+MIN_SCORES = (0.0, round(config.AGENT1_MIN_SCORE - 0.05, 2), config.AGENT1_MIN_SCORE,
+              round(config.AGENT1_MIN_SCORE + 0.05, 2))
+OFF_TOPIC_QUERIES = [
+    "오늘 점심 메뉴 뭐 먹을까", "주말에 비 온대?", "비트코인 시세 전망 알려줘", "축구 경기 결과 알려줘",
+    "좋은 여행지 추천해줘",
+]
+
+
+def agent1_candidates(ctx, query: str) -> list[tuple]:
+    query = normalize_query(query)
+    return hybrid_search(
+        ctx.rag_retriever.vectorstore, ctx.pdf_keyword_index, query, ctx.embeddings.embed_query(query),
+        k=config.AGENT1_MAX_K, fetch_k=config.HYBRID_FETCH_K, rrf_k=config.HYBRID_RRF_K, with_similarity=True,
+    )
+
+
+def agent2_candidates(ctx, query: str) -> list[tuple]:
+    return ctx.course_searcher.search(query, k=config.AGENT2_MAX_K, with_similarity=True)
+
+
+def compare(label: str, candidates: list, keywords: list | None, max_tokens: int, top_k: int):
+    # candidates: 질의별 후보 목록, keywords: 질의별 정답 키워드 (없으면 정답 포함률 생략)
+    rows = [("고정 k", None)] + [(f"min_score={score}", score) for score in MIN_SCORES]
+    print(f"\n[{label}]  질의={len(candidates)}  고정 k={top_k}  예산={max_tokens} tokens")
+    print(f"{'방식':<18}{'토큰':>8}{'절감':>8}{'문서':>6}{'정답 포함':>10}")
+    coverage = {}
+    for name, min_score in rows:
+        tokens, saved, docs, hits = [], [], [], []
+        for i, scored in enumerate(candidates):
+            if min_score is None:
+                selection = select_context(scored[:top_k], max_tokens=10**9, min_docs=top_k)
+            else:
+                selection = select_context(scored, max_tokens, min_score=min_score,
+                                           min_docs=config.CONTEXT_MIN_DOCS, baseline_k=top_k)
+            tokens.append(selection.tokens)
+            saved.append(selection.saved_tokens)
+            docs.append(len(selection.docs))
+            if keywords is not None:
+                hits.append(any(k in doc.page_content for doc in selection.docs for k in keywords[i]))
+        coverage[min_score] = statistics.mean(hits) if hits else None
+        hit = f"{statistics.mean(hits):>10.2f}" if hits else f"{'-':>10}"
+        print(f"{name:<18}{statistics.mean(tokens):>8.0f}{statistics.mean(saved):>8.0f}"
+              f"{statistics.mean(docs):>6.1f}{hit}")
+    return coverage
+
+
+def off_topic(label: str, candidates: list, max_tokens: int, min_score: float) -> bool:
+    # 무관 질의의 후보가 관련도 컷오프로 빠지는지 (토큰 예산으로 빠지는 것과 구분)
+    selections = [select_context(scored, max_tokens, min_score=min_score, min_docs=config.CONTEXT_MIN_DOCS)
+                  for scored in candidates]
+    below = sum(s.below_score for s in selections)
+    top = statistics.median(max(s.scores) for s in selections if s.scores)
+    print(f"{label:<8}후보 {statistics.mean(len(c) for c in candidates):.1f} -> 선택 "
+          f"{statistics.mean(len(s.docs) for s in selections):.1f}  컷오프로 뺀 후보 {below}  "
+          f"최고 유사도 p50 {top:.3f}  (min_score={min_score})")
+    return below > 0
+
+
+def e2e_p50(ctx, samples: list, candidates: list, adaptive: bool) -> float:
+    latencies = []
+    for sample, scored in zip(samples, candidates):
+        if adaptive:
+            docs = select_context(scored, config.AGENT1_CONTEXT_TOKENS, min_score=config.AGENT1_MIN_SCORE,
+                                  min_docs=config.CONTEXT_MIN_DOCS).docs
+        else:
+            docs = [doc for doc, _ in scored[:config.AGENT1_TOP_K]]
+        prompt = ctx.agent1_prompt_template.format(
+            context="\n\n".join(doc.page_content for doc in docs), user_query=sample["query"]
+        )
+        start = time.perf_counter()
+        chat_completion(ctx, [{"role": "system", "content": "삼성전자 제품 정보 전문가"},
+                              {"role": "user", "content": prompt}])
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def main(run_e2e: bool = False):
+    with open(os.path.join(DATA_DIR, "agent1_queries.json"), "r", encoding="utf-8") as f:
+        samples = json.load(f)
+    with open(os.path.join(DATA_DIR, "routing_labels.json"), "r", encoding="utf-8") as f:
+        course_queries = [row["query"] for row in json.load(f) if row["route"] == "agent2"]
+    ctx = get_app_context()
+
+    agent1 = [agent1_candidates(ctx, sample["query"]) for sample in samples]
+    coverage = compare("Agent1", agent1, [sample["keywords"] for sample in samples],
+                       config.AGENT1_CONTEXT_TOKENS, config.AGENT1_TOP_K)
+    agent2 = [agent2_candidates(ctx, query) for query in course_queries]
+    compare("Agent2", agent2, None, config.AGENT2_CONTEXT_TOKENS, config.AGENT2_TOP_K)
+
+    print(f"\n[무관 질의]  질의={len(OFF_TOPIC_QUERIES)}  embeddings={config.EMBEDDING_BACKEND}")
+    ok = off_topic("Agent1", [agent1_candidates(ctx, query) for query in OFF_TOPIC_QUERIES],
+                   config.AGENT1_CONTEXT_TOKENS, config.AGENT1_MIN_SCORE)
+    ok &= off_topic("Agent2", [agent2_candidates(ctx, query) for query in OFF_TOPIC_QUERIES],
+                    config.AGENT2_CONTEXT_TOKENS, config.AGENT2_MIN_SCORE)
+
+    if run_e2e:
+        print(f"\nAgent1 생성 p50: 고정 k {e2e_p50(ctx, samples, agent1, False):.0f} ms"
+              f"  /  선택 {e2e_p50(ctx, samples, agent1, True):.0f} ms")
+    if coverage[config.AGENT1_MIN_SCORE] < coverage[None]:
+        print(f"\nmin_score={config.AGENT1_MIN_SCORE} 가 고정 k 보다 정답 포함률을 떨어뜨림: 컷오프를 낮추세요")
+        sys.exit(1)
+    if not ok:
+        print("\n무관 질의에서 관련도 컷오프가 후보를 버리지 않음: *_MIN_SCORE 를 임베딩 모델에 맞게 올리세요")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(run_e2e="--e2e" in sys.argv)
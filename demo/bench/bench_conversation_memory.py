@@ -0,0 +1,131 @@
+# ==============================
+# 🧠 Agent2 대화 메모리 벤치마크 (30턴 세션)
+# ==============================
+# 같은 30턴 대화를
+#   - 기존: chat_history 전체(화면용 HTML 답변 포함)를 매 턴 이어 붙임
+#   - 메모리: 최근 MEMORY_RECENT_TURNS 턴 원문 + 이전 턴 누적 요약, MEMORY_MAX_TOKENS 상한 (conversation_memory.py)
+# 으로 Agent2 프롬프트를 만들어 턴별 프롬프트 토큰과 응답 지연을 비교합니다.
+# CHAT_BACKEND=openai 면 실제 API 를 호출하고, 그 외에는 프롬프트 토큰에 비례하는 prefill 지연을 흉내 낸
+# 가짜 클라이언트를 사용합니다 (기본 250 ms + 1k 토큰당 --ms-per-1k ms).
+# 턴 ms 는 사용자가 기다리는 턴 지연 (메모리 프롬프트 응답 + add_turn 이 막힌 시간)입니다.
+# 요약은 백그라운드 풀에서 실행되므로 요약 ms 는 따로 표시하고, 동기 ms 는 요약을 add_turn 안에서
+# 기다렸다면의 턴 지연 (응답 + 요약) 입니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_conversation_memory.py [--turns 30] [--ms-per-1k 80]
+import os
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from backends import create_chat_client
+from conversation_memory import ConversationMemory, summarize_with_llm
+from offline_backends import FakeChatClient, offline_reply
+from token_count import count_tokens
+from ui3 import agent_header
+
+USER_MESSAGES = [
+    "안녕하세요", "고객 응대가 너무 힘들어요", "불만 고객이 특히 어려워요", "짧은 강의가 좋아요",
+    "초급 수준으로 추천해 주세요", "갤럭시 S25 판매 전략 강의도 있나요?", "30분 이내 강의만 보여줘",
+    "평점 높은 순으로 다시 추천해 줘", "가전 제품 설명 잘하는 법도 궁금해요", "신입이라 기초부터 배우고 싶어요",
+]
+BOT_ANSWER = (
+    "고객 응대가 어려우시군요. 말씀하신 상황에 맞춰 강의를 추천해 드릴게요.\n"
+    + "\n".join(f"{i}. 고객 유형별 응대 전략 {i}편 - 불만 고객의 감정을 먼저 인정하고 해결책을 제시하는 "
+                f"대화 흐름을 사례 중심으로 익힙니다. 링크: https://www.ubion.co.kr/ubion/" for i in range(1, 5))
+)
+
+
+def simulated_client(ms_per_1k: float) -> FakeChatClient:
+    def responder(messages):
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        time.sleep(0.25 + ms_per_1k * prompt_tokens / 1000 / 1000)
+        if "요약" in messages[0]["content"]:
+            return offline_reply(messages)
+        return BOT_ANSWER
+    return FakeChatClient(responder)
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def ask(client, prompt: str) -> tuple[str, float]:
+    start = time.perf_counter()
+    res = client.chat.completions.create(model=config.CHAT_MODEL, messages=[
+        {"role": "system", "content": "삼성전자 세일즈 강의 추천 전문가"},
+        {"role": "user", "content": prompt},
+    ])
+    return res.choices[0].message.content.strip(), (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--ms-per-1k", type=float, default=80.0, help="가짜 클라이언트의 1k 프롬프트 토큰당 지연")
+    args = parser.parse_args()
+
+    client = create_chat_client() if config.CHAT_BACKEND == "openai" else simulated_client(args.ms_per_1k)
+    with open(os.path.join(config.PROMPT_DIR, "agent2_prompt.txt"), "r", encoding="utf-8") as f:
+        template = f.read()
+    with open(os.path.join(config.PROMPT_DIR, "conversation_summary_prompt.txt"), "r", encoding="utf-8") as f:
+        summary_template = f.read()
+    course_data = "\n\n".join(f"id: {i} title: 고객 응대 실전 {i} category: 세일즈 duration: 30분" for i in range(5))
+
+    summarize_ms = []
+
+    def summarize(summary, turns):
+        start = time.perf_counter()
+        try:
+            return summarize_with_llm(client, summary_template, config.MEMORY_SUMMARY_MODEL,
+                                      config.MEMORY_SUMMARY_TOKENS, summary, turns)
+        finally:
+            summarize_ms.append((time.perf_counter() - start) * 1000)
+
+    pool = ThreadPoolExecutor(config.MEMORY_SUMMARY_WORKERS, thread_name_prefix="memory")
+    memory = ConversationMemory(
+        summarize, recent_turns=config.MEMORY_RECENT_TURNS, max_tokens=config.MEMORY_MAX_TOKENS,
+        summary_tokens=config.MEMORY_SUMMARY_TOKENS, turn_tokens=config.MEMORY_TURN_TOKENS, executor=pool,
+    )
+    history = []
+    rows = []
+    for turn in range(args.turns):
+        user = USER_MESSAGES[turn % len(USER_MESSAGES)]
+
+        full_history = "".join(f"사용자: {t['user']}\n챗봇: {t['bot']}\n" for t in history) + f"사용자: {user}\n"
+        full_prompt = template.format(full_history=full_history, course_data=course_data)
+        answer, full_ms = ask(client, full_prompt)
+
+        memory_prompt = template.format(full_history=memory.render(user), course_data=course_data)
+        _, memory_ms = ask(client, memory_prompt)
+
+        # 기존 UI 처럼 헤더 + <br> 이 붙은 답변을 기록, 메모리는 정리된 텍스트만
+        history.append({"user": user, "bot": f"{agent_header('agent2')}<br><br>{answer.replace(chr(10), '<br>')}"})
+        done = len(summarize_ms)
+        start = time.perf_counter()
+        memory.add_turn(user, answer)
+        turn_ms = memory_ms + (time.perf_counter() - start) * 1000
+        memory.wait()  # 이번 턴이 예약한 요약 시간을 이 턴에 기록 (실제 UI 에서는 다음 입력과 겹침)
+        fold_ms = sum(summarize_ms[done:])
+        rows.append((turn + 1, count_tokens(full_prompt), count_tokens(memory_prompt), full_ms, turn_ms,
+                     fold_ms, memory_ms + fold_ms))
+    pool.shutdown()
+
+    print(f"turns={args.turns}  recent_turns={config.MEMORY_RECENT_TURNS}  max_tokens={config.MEMORY_MAX_TOKENS}  "
+          f"backend={config.CHAT_BACKEND}")
+    print(f"{'턴':>4}{'기존 토큰':>11}{'메모리 토큰':>12}{'기존 ms':>10}{'턴 ms':>9}{'요약 ms':>9}{'동기 ms':>9}")
+    for row in rows:
+        if row[0] in (1, 2, 5) or row[0] % 5 == 0:
+            print(f"{row[0]:>4}{row[1]:>11}{row[2]:>12}{row[3]:>10.0f}{row[4]:>9.0f}{row[5]:>9.0f}{row[6]:>9.0f}")
+    print(f"{'평균':>4}{statistics.mean(r[1] for r in rows):>11.0f}{statistics.mean(r[2] for r in rows):>12.0f}"
+          f"{statistics.mean(r[3] for r in rows):>10.0f}{statistics.mean(r[4] for r in rows):>9.0f}"
+          f"{statistics.mean(r[5] for r in rows):>9.0f}{statistics.mean(r[6] for r in rows):>9.0f}")
+    print(f"p95 턴 ms: 백그라운드 {percentile([r[4] for r in rows], 95):.0f}  동기 {percentile([r[6] for r in rows], 95):.0f}")
+
+
+if __name__ == "__main__":
+    main()
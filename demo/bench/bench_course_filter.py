@@ -0,0 +1,65 @@
+# ==============================
+# 🎯 메타데이터 사전 필터 검색 벤치마크 (선택도 vs 지연)
+# ==============================
+# 합성 카탈로그 + 무작위 정규화 벡터(Flat L2)로 측정합니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_course_filter.py [강의 수] [차원]
+import os
+import sys
+import time
+import statistics
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_catalog import synthetic_catalog
+from course_search import CourseSearcher
+
+CASES = [
+    ("필터 없음", None),
+    ("카테고리", {"category": ["고객응대"]}),
+    ("+ 난이도 중급", {"category": ["고객응대"], "difficulty": ["중급"]}),
+    ("+ 10분 이하", {"category": ["고객응대"], "difficulty": ["중급"], "duration_min": (None, 10)}),
+    ("+ 평점 4.5 이상", {"category": ["고객응대"], "difficulty": ["중급"], "duration_min": (None, 10),
+                      "user_rating": (4.5, None)}),
+]
+
+
+def random_unit(rng, n: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def latency_ms(searcher, queries, constraints) -> float:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        searcher.search_rows(query, 5, searcher.allowed_rows(constraints))
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(n: int = 200_000, dim: int = 256):
+    rng = np.random.default_rng(0)
+    catalog = synthetic_catalog(n)
+    index = faiss.IndexFlatL2(dim)
+    index.add(random_unit(rng, n, dim))
+    queries = random_unit(rng, 20, dim)
+
+    searcher = CourseSearcher(index, catalog, None, None, catalog.columns["id"])
+    selector_only = CourseSearcher(index, catalog, None, None, catalog.columns["id"])
+    selector_only._xb = None  # IDSelector 경로 강제
+
+    print(f"courses={n}  dim={dim}")
+    print(f"{'조건':<16}{'선택도':>10}{'후보 수':>9}{'subset ms':>11}{'selector ms':>13}")
+    for name, constraints in CASES:
+        rows = searcher.allowed_rows(constraints)
+        count = n if rows is None else rows.size
+        print(f"{name:<16}{count / n:>10.4f}{count:>9}"
+              f"{latency_ms(searcher, queries, constraints):>11.2f}{latency_ms(selector_only, queries, constraints):>13.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
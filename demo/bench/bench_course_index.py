@@ -0,0 +1,98 @@
+# ==============================
+# 🗜️ 강의 벡터 인덱스 타입 벤치마크 (recall@5 / 메모리 / 지연)
+# ==============================
+# 군집 구조가 있는 합성 임베딩(정규화)으로 vector_index 의 타입별 인덱스를 빌드하고
+# Flat 정확 검색 결과 대비 recall@5, 직렬화 크기(메모리), 단일 질의 p50/p95 지연, 빌드 시간을 측정합니다.
+# 같은 빌드 파라미터는 한 번만 빌드하고 nprobe / ef_search 만 바꿔 다시 측정합니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_course_index.py [벡터 수] [차원]
+import os
+import sys
+import time
+import statistics
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_index import build_index, build_params, configure_search, describe_index, index_spec
+
+K = 5
+QUERIES = 300
+CONFIGS = [
+    ("flat", {}),
+    ("sq_fp16", {}),
+    ("sq_int8", {}),
+    ("ivf_flat", {"nprobe": 8}),
+    ("ivf_flat", {"nprobe": 32}),
+    ("ivf_pq", {"nprobe": 16}),
+    ("ivf_pq", {"nprobe": 64}),
+    ("hnsw", {"ef_search": 32}),
+    ("hnsw", {"ef_search": 128}),
+]
+
+
+def clustered_vectors(n: int, dim: int, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    # 실제 임베딩처럼 주제별로 뭉친 분포 (중심 + 잡음)
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.8 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def queries_near(vectors: np.ndarray, count: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.integers(0, len(vectors), count)]
+    queries = picked + 0.05 * rng.standard_normal(picked.shape).astype(np.float32)
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+def latency_ms(index, queries: np.ndarray) -> tuple[float, float]:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query[None], K)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), float(np.percentile(samples, 95))
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / K for f, t in zip(found, truth)]))
+
+
+def main(n: int = 50_000, dim: int = 768):
+    faiss.omp_set_num_threads(1)  # 요청 하나 = 스레드 하나 기준 지연
+    vectors = clustered_vectors(n, dim)
+    queries = queries_near(vectors, QUERIES)
+    built = {}
+
+    print(f"vectors={n}  dim={dim}  queries={QUERIES}")
+    print(f"{'타입':<10}{'검색 파라미터':<16}{'빌드 s':>8}{'MB':>9}{'B/벡터':>9}"
+          f"{'recall@5':>10}{'p50 ms':>9}{'p95 ms':>9}  구성")
+    truth = None
+    for index_type, params in CONFIGS:
+        spec = index_spec(index_type, params)
+        key = (index_type, str(build_params(spec)))
+        if key not in built:
+            start = time.perf_counter()
+            index = build_index(spec, vectors)
+            index.add(vectors)
+            built[key] = (index, time.perf_counter() - start)
+        index, build_s = built[key]
+        configure_search(index, spec)
+
+        _, found = index.search(queries, K)
+        if truth is None:  # 첫 설정(flat)이 정답
+            truth = found
+        size_mb = faiss.serialize_index(index).nbytes / 2**20
+        p50, p95 = latency_ms(index, queries[:100])
+        search = ", ".join(f"{name}={value}" for name, value in params.items()) or "-"
+        info = describe_index(index)
+        detail = " ".join(f"{name}={info[name]}" for name in ("nlist", "code_size") if name in info)
+        print(f"{index_type:<10}{search:<16}{build_s:>8.1f}{size_mb:>9.1f}{size_mb * 2**20 / n:>9.0f}"
+              f"{recall_at_k(found, truth):>10.3f}{p50:>9.2f}{p95:>9.2f}  {detail}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
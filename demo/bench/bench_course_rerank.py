@@ -0,0 +1,92 @@
+# ==============================
+# 🏅 강의 재정렬 벤치마크 (품질 신호 / 프롬프트 토큰 / 지연)
+# ==============================
+# 합성 카탈로그 + 무작위 정규화 벡터(Flat L2)로 유사도 순 Top-k 와 재정렬 Top-k 를 비교합니다.
+# - 선택된 강의의 평균 유사도 / 평점 / 최신성, Agent2 프롬프트에 들어가는 강의 목록 토큰 수
+# - 재정렬 단계 자체의 지연 (후보 수별)
+# 실행: 저장소 루트에서 python demo/bench/bench_course_rerank.py [강의 수] [차원]
+import os
+import sys
+import time
+import statistics
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_catalog import synthetic_catalog
+from course_rerank import CourseReranker
+from course_search import CourseSearcher
+from retrievers import course_to_document
+from token_count import get_encoding
+
+
+def random_unit(rng, n: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def evaluate(searcher, reranker, queries, k: int, enc) -> dict:
+    similarity, rating, freshness, tokens = [], [], [], []
+    for query in queries:
+        rows, scores = searcher.search_rows(query, k)
+        if searcher.post_processing:
+            rows, scores = searcher.search_rows(query, max(k, searcher.rerank_candidates))
+            rows, scores = searcher.select_rows(rows, scores, k)
+        positions = searcher.vector_positions[rows]
+        similarity.append(scores.mean())
+        rating.append(searcher.catalog.columns["user_rating"][positions].mean())
+        freshness.append(reranker.signals[positions, reranker.signal_names.index("freshness")].mean())
+        text = "\n\n".join(course_to_document(searcher.catalog[int(p)]).page_content for p in positions)
+        tokens.append(len(enc.encode(text)))
+    return {
+        "similarity": float(np.mean(similarity)),
+        "rating": float(np.mean(rating)),
+        "freshness": float(np.mean(freshness)),
+        "tokens": float(np.mean(tokens)),
+    }
+
+
+def rerank_latency_ms(searcher, queries, candidates: int, k: int) -> float:
+    samples = []
+    for query in queries:
+        rows, scores = searcher.search_rows(query, candidates)
+        start = time.perf_counter()
+        searcher.select_rows(rows, scores, k)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(n: int = 100_000, dim: int = 128):
+    rng = np.random.default_rng(0)
+    catalog = synthetic_catalog(n)
+    index = faiss.IndexFlatL2(dim)
+    index.add(random_unit(rng, n, dim))
+    queries = random_unit(rng, 50, dim)
+    enc = get_encoding("cl100k_base")
+
+    start = time.perf_counter()
+    reranker = CourseReranker(catalog)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    plain = CourseSearcher(index, catalog, None, None, catalog.columns["id"])
+    reranked = CourseSearcher(index, catalog, None, None, catalog.columns["id"], reranker=reranker)
+
+    print(f"courses={n}  dim={dim}  신호 행렬 계산 {build_ms:.1f} ms")
+    print(f"{'방식':<14}{'k':>3}{'유사도':>9}{'평점':>8}{'최신성':>9}{'토큰':>8}")
+    for k in (3, 5):
+        for name, searcher in (("유사도 순", plain), ("재정렬", reranked)):
+            result = evaluate(searcher, reranker, queries, k, enc)
+            print(f"{name:<14}{k:>3}{result['similarity']:>9.3f}{result['rating']:>8.2f}"
+                  f"{result['freshness']:>9.3f}{result['tokens']:>8.0f}")
+
+    print()
+    print(f"{'후보 수':<10}{'재정렬 ms':>10}")
+    for candidates in (30, 200, 1000):
+        print(f"{candidates:<10}{rerank_latency_ms(reranked, queries, candidates, 5):>10.3f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
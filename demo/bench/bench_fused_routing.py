@@ -0,0 +1,111 @@
+# ==============================
+# 🔀 라우팅 + 답변 한 번에(FUSED_ROUTING) 벤치마크
+# ==============================
+# 라우팅 질의(bench/data/routing_labels.json)를 스트리밍 그래프로 실행해
+#   - 2단계  : route_intent(분류 호출) -> agent1 / agent2 (생성 호출)
+#   - 한 번에: route_and_answer (강의 컨텍스트 + product_lookup 도구로 한 번 호출, 도구 호출이면 Agent1)
+# 의 질의당 채팅 호출 수, 프롬프트 / 응답 토큰(tiktoken, 도구 정의 포함), 첫 토큰 / 전체 지연, 라우팅 정확도를
+# ROUTER_MODE llm / hybrid 각각에서 비교합니다. (hybrid 는 로컬 분류가 확정된 질문은 두 방식 모두 호출 1회)
+# 오프라인(CHAT_BACKEND=fake)에서는 호출마다 --llm-ms 첫 토큰 지연을 흉내 냅니다. 답변 캐시와 요청 스케줄러는 끔
+# (스케줄러 TPM 버킷 대기가 아닌 호출 횟수 차이만 보기 위해).
+# 실행: 저장소 루트에서 python demo/bench/bench_fused_routing.py [--llm-ms 400]
+import os
+import sys
+import json
+import argparse
+from functools import partial
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "routing_labels.json")
+
+
+class CountingClient:
+    # chat.completions.create 를 감싸 호출 수와 프롬프트 / 응답 토큰을 셈 (스트리밍 포함)
+    def __init__(self, client, count_tokens):
+        self.client = client
+        self.count_tokens = count_tokens
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        self.prompt_tokens += sum(self.count_tokens(m["content"]) for m in kwargs["messages"])
+        if kwargs.get("tools"):
+            self.prompt_tokens += self.count_tokens(json.dumps(kwargs["tools"], ensure_ascii=False))
+        res = self.client.chat.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return self._stream(res)
+        message = res.choices[0].message
+        self.completion_tokens += self.count_tokens(message.content or "")
+        for call in getattr(message, "tool_calls", None) or []:
+            self.completion_tokens += self.count_tokens(call.function.name + call.function.arguments)
+        return res
+
+    def _stream(self, chunks):
+        for chunk in chunks:
+            if chunk.choices:
+                delta = chunk.choices[0].delta
+                self.completion_tokens += self.count_tokens(delta.content or "")
+                for call in getattr(delta, "tool_calls", None) or []:
+                    if call.function is not None:
+                        self.completion_tokens += self.count_tokens((call.function.name or "")
+                                                                    + (call.function.arguments or ""))
+            yield chunk
+
+    def close(self):
+        self.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-ms", type=float, default=400.0, help="가짜 채팅 클라이언트의 첫 토큰 지연")
+    args = parser.parse_args()
+    os.environ.setdefault("AGENT1_CACHE_ENABLED", "0")
+    os.environ.setdefault("SCHEDULER_ENABLED", "0")
+    os.environ.setdefault("FAKE_CHAT_TTFT", str(args.llm_ms / 1000))
+
+    import config
+    from agents import build_graph
+    from app_context import get_app_context
+    from router import classify_with_llm
+    from streaming import TokenStream
+    from token_count import count_tokens
+
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        samples = json.load(f)
+    ctx = get_app_context()
+    client = CountingClient(ctx.client, count_tokens)
+    ctx.client = client
+    ctx.router.llm_classify = partial(classify_with_llm, client, ctx.routing_prompt_template)
+    graphs = {"2단계": build_graph(ctx, fused=False), "한 번에": build_graph(ctx, fused=True)}
+    list(TokenStream(graphs["2단계"], {"user_query": samples[0]["query"], "chat_history": []}))  # 워밍업
+
+    print(f"queries={len(samples)}  chat={config.CHAT_BACKEND}  embeddings={config.EMBEDDING_BACKEND}")
+    print(f"{'router':<8}{'그래프':<8}{'호출/질의':>10}{'프롬프트':>9}{'응답':>7}{'TTFT p50':>10}"
+          f"{'p50 ms':>8}{'p95 ms':>8}{'정확도':>8}")
+    for mode in ("llm", "hybrid"):
+        ctx.router.mode = mode
+        for label, graph in graphs.items():
+            client.calls = client.prompt_tokens = client.completion_tokens = 0
+            ttft, total, correct = [], [], 0
+            for sample in samples:
+                stream = TokenStream(graph, {"user_query": sample["query"], "chat_history": []})
+                list(stream)
+                ttft.append(stream.ttft_ms or stream.total_ms)
+                total.append(stream.total_ms)
+                correct += stream.result["route"] == sample["route"]
+            n = len(samples)
+            print(f"{mode:<8}{label:<8}{client.calls / n:>10.2f}{client.prompt_tokens / n:>9.0f}"
+                  f"{client.completion_tokens / n:>7.0f}{np.percentile(ttft, 50):>10.0f}"
+                  f"{np.percentile(total, 50):>8.0f}{np.percentile(total, 95):>8.0f}{correct / n:>8.2f}")
+    ctx.router.mode = config.ROUTER_MODE
+
+
+if __name__ == "__main__":
+    main()
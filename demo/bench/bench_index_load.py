@@ -0,0 +1,111 @@
+# ==============================
+# 💾 인덱스 로드 시간 / 메모리 벤치마크 (pickle vs mmap, 1 / 8 프로세스)
+# ==============================
+# 합성 강의 문서 + 무작위 벡터로 같은 벡터스토어를 두 형식으로 저장한 뒤,
+# 프로세스 P 개가 동시에 로드하고 검색(문서 읽기 포함)을 돌린 상태에서
+# 로드 시간, 프로세스당 RSS 증가량, 전체 PSS(공유 페이지를 나눠 계산한 실사용량) 증가량을 측정합니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_index_load.py [문서 수] [차원]
+import os
+import sys
+import time
+import shutil
+import tempfile
+import statistics
+import multiprocessing as mp
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from course_catalog import synthetic_catalog
+from index_store import load_store, save_store
+from offline_backends import HashingEmbeddings
+from retrievers import course_to_document
+
+PROCESS_COUNTS = (1, 8)
+
+
+def memory_mb() -> tuple[float, float]:
+    # (RSS, PSS) MB
+    values = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0]) / 1024
+    return values["Rss"], values["Pss"]
+
+
+def build(workdir: str, n: int, dim: int):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = faiss.IndexFlatL2(dim)
+    index.add(vectors)
+    catalog = synthetic_catalog(n)
+    ids = [f"course:{i}#c0" for i in range(n)]
+    docstore = InMemoryDocstore({doc_id: course_to_document(row) for doc_id, row in zip(ids, catalog)})
+    db = FAISS(HashingEmbeddings(dim), index, docstore, dict(enumerate(ids)))
+    for storage in ("pickle", "mmap"):
+        os.makedirs(os.path.join(workdir, storage))
+        save_store(db, os.path.join(workdir, storage), storage)
+
+
+def worker(index_dir: str, storage: str, dim: int, barrier, results):
+    rss_before, pss_before = memory_mb()
+    start = time.perf_counter()
+    db = load_store(index_dir, HashingEmbeddings(dim), storage)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(os.getpid())
+    for query in rng.standard_normal((20, dim)).astype(np.float32):
+        db.similarity_search_by_vector(query.tolist(), k=5)
+
+    barrier.wait()  # 모든 프로세스가 로드를 마친 상태에서 측정
+    rss, pss = memory_mb()
+    results.put((load_ms, rss - rss_before, pss - pss_before))
+    barrier.wait()
+
+
+def run(index_dir: str, storage: str, dim: int, processes: int) -> tuple[float, float, float]:
+    context = mp.get_context("spawn")
+    barrier = context.Barrier(processes)
+    results = context.Queue()
+    workers = [context.Process(target=worker, args=(index_dir, storage, dim, barrier, results))
+               for _ in range(processes)]
+    for process in workers:
+        process.start()
+    samples = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    load_ms = statistics.median(sample[0] for sample in samples)
+    rss = statistics.mean(sample[1] for sample in samples)
+    pss = sum(sample[2] for sample in samples)
+    return load_ms, rss, pss
+
+
+def main(n: int = 200_000, dim: int = 256):
+    workdir = tempfile.mkdtemp()
+    try:
+        build(workdir, n, dim)
+        sizes = {storage: sum(os.path.getsize(os.path.join(workdir, storage, name))
+                              for name in os.listdir(os.path.join(workdir, storage)))
+                 for storage in ("pickle", "mmap")}
+        print(f"docs={n}  dim={dim}  "
+              f"on-disk pickle={sizes['pickle'] / 2**20:.0f} MB  mmap={sizes['mmap'] / 2**20:.0f} MB")
+        print(f"{'형식':<8}{'프로세스':>8}{'로드 ms':>10}{'RSS/프로세스 MB':>17}{'PSS 합계 MB':>13}")
+        for storage in ("pickle", "mmap"):
+            for processes in PROCESS_COUNTS:
+                load_ms, rss, pss = run(os.path.join(workdir, storage), storage, dim, processes)
+                print(f"{storage:<8}{processes:>8}{load_ms:>10.1f}{rss:>17.1f}{pss:>13.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,58 @@
+# ==============================
+# 🧾 강의 인덱스 증분 재빌드 벤치마크 (1% 변경 vs 전체 재빌드)
+# ==============================
+# 임베딩 저장소를 거치지 않는 원본 임베딩으로 측정합니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_index_rebuild.py
+import os
+import sys
+import copy
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from backends import create_embeddings
+from course_catalog import CourseCatalog
+from retrievers import load_course_data, create_course_rag_retriever
+
+
+def mutate(course_data: list, ratio: float, seed: int = 0) -> list:
+    # ratio 만큼의 강의 평점/수강자 수를 수정
+    changed = copy.deepcopy(course_data)
+    rng = random.Random(seed)
+    for course in rng.sample(changed, max(1, int(len(changed) * ratio))):
+        course["user_rating"] = round(rng.uniform(0.1, 5.0), 2)
+        course["num_of_learners"] += 1
+    return changed
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(ratio: float = 0.01):
+    embeddings = create_embeddings()
+    course_data = load_course_data(config.COURSE_DATA_PATH)
+    changed = CourseCatalog.from_records(mutate(course_data, ratio))
+    course_data = CourseCatalog.from_records(course_data)
+    workdir = tempfile.mkdtemp()
+    incremental_dir = os.path.join(workdir, "incremental")
+    full_dir = os.path.join(workdir, "full")
+
+    create_course_rag_retriever(course_data, embeddings, index_dir=incremental_dir)
+    unchanged = timed(lambda: create_course_rag_retriever(course_data, embeddings, index_dir=incremental_dir))
+    incremental = timed(lambda: create_course_rag_retriever(changed, embeddings, index_dir=incremental_dir))
+    full = timed(lambda: create_course_rag_retriever(changed, embeddings, index_dir=full_dir))
+
+    print(f"courses={len(course_data)}  changed={ratio:.0%}")
+    print(f"unchanged load     : {unchanged * 1000:9.1f} ms")
+    print(f"incremental rebuild: {incremental * 1000:9.1f} ms")
+    print(f"full rebuild       : {full * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.01)
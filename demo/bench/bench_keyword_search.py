@@ -0,0 +1,99 @@
+# ==============================
+# 🔤 키워드(BM25) 인덱스 벤치마크
+# ==============================
+# 저장된 faiss_index / course_faiss_index 의 청크와 합성 강의 문서로
+# 전체 빌드, 1% 변경 증분 반영, 저장 후 재로드, 질의 p50/p95 지연을 측정합니다.
+# 임베딩/네트워크 없이 docstore 만 사용합니다. 인덱스 디렉터리는 임시 복사본을 씁니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_keyword_search.py [합성 강의 수]
+import os
+import sys
+import time
+import shutil
+import tempfile
+import statistics
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import PDF_INDEX_DIR, COURSE_INDEX_DIR
+from course_catalog import synthetic_catalog
+from index_store import has_store, load_store
+from offline_backends import HashingEmbeddings
+from keyword_index import KeywordIndex, sync_keyword_index
+from retrievers import course_to_document
+
+QUERIES = ["배터리 용량 mAh", "S펜 기능", "200MP 카메라", "방수 등급 IP68", "고객 응대 중급 강의", "세일즈 전략 입문"]
+
+
+class DictDocstore:
+    def __init__(self, texts: dict):
+        self.texts = texts
+
+    def search(self, doc_id):
+        return SimpleNamespace(page_content=self.texts[doc_id])
+
+
+def stored_chunks(index_dir: str) -> dict[str, str]:
+    # 저장된 형식(mmap / pickle) 그대로 읽되 임베딩 객체 없이 docstore 만 사용
+    db = load_store(index_dir, HashingEmbeddings(), storage="pickle")
+    return {doc_id: db.docstore.search(doc_id).page_content for doc_id in db.index_to_docstore_id.values()}
+
+
+def fake_vectorstore(texts: dict) -> SimpleNamespace:
+    return SimpleNamespace(index_to_docstore_id=dict(enumerate(texts)), docstore=DictDocstore(texts))
+
+
+def timed_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def query_latency_us(index: KeywordIndex) -> tuple[float, float]:
+    index.search(QUERIES[0])
+    samples = []
+    for _ in range(200):
+        for query in QUERIES:
+            start = time.perf_counter()
+            index.search(query, 20)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), float(np.percentile(samples, 95))
+
+
+def measure(name: str, texts: dict):
+    workdir = tempfile.mkdtemp()
+    try:
+        build = timed_ms(lambda: sync_keyword_index(workdir, fake_vectorstore(texts)))
+        reload = timed_ms(lambda: sync_keyword_index(workdir, fake_vectorstore(texts)))
+
+        # 1% 청크 교체 (삭제 + 새 id 추가)
+        changed = dict(texts)
+        for doc_id in list(texts)[::100]:
+            changed[f"{doc_id}-v2"] = changed.pop(doc_id) + " 수정"
+        incremental = timed_ms(lambda: sync_keyword_index(workdir, fake_vectorstore(changed)))
+
+        index = KeywordIndex.load(workdir)
+        p50, p95 = query_latency_us(index)
+        size_kb = os.path.getsize(os.path.join(workdir, "keyword_index.json")) / 1024
+        print(f"{name:<22}{len(texts):>8}{build:>10.1f}{reload:>10.1f}{incremental:>10.1f}"
+              f"{p50:>10.1f}{p95:>10.1f}{size_kb:>10.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(synthetic: int = 20_000):
+    print(f"{'코퍼스':<22}{'청크 수':>8}{'빌드 ms':>10}{'로드 ms':>10}{'1% ms':>10}"
+          f"{'p50 µs':>10}{'p95 µs':>10}{'KB':>10}")
+    for name, index_dir in (("faiss_index", PDF_INDEX_DIR), ("course_faiss_index", COURSE_INDEX_DIR)):
+        if has_store(index_dir):
+            measure(name, stored_chunks(index_dir))
+    catalog = synthetic_catalog(synthetic)
+    measure(f"합성 강의 {synthetic}", {f"course:{i}": course_to_document(row).page_content
+                                   for i, row in enumerate(catalog)})
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,170 @@
+# ==============================
+# 🛡️ 채팅 호출 안정화 계층 검증 / 벤치마크 (로컬 가짜 서버)
+# ==============================
+# fake_openai_server 로 지연 / 오류를 주입하고 실제 openai SDK 로
+#   - 원본 클라이언트 (SDK 재시도 없음, 기본 타임아웃)
+#   - ResilientChatClient (마감 시간 / 재시도 / 헤징 / 서킷 브레이커, llm_client.py)
+# 를 비교합니다. 시나리오마다 기대 동작을 확인하고, 하나라도 어긋나면 종료 코드 1 로 끝납니다.
+#   꼬리 지연 : 5% 요청이 1.5초 더 늦음 -> 헤징으로 p99 감소, 추가 요청 비율
+#   일시 오류 : 20% 500 / 429 -> 재시도로 성공률 유지
+#   무응답    : 서버가 응답하지 않음 -> 마감 시간 안에 LLMUnavailableError
+#   장애      : 모든 요청 503 -> 서킷이 열려 즉시 실패, 복구 후 시험 요청으로 닫힘
+#   스트리밍  : 첫 청크 꼬리 지연에 헤징, 본문이 그대로 전달되는지
+# 실행: 저장소 루트에서 python demo/bench/bench_llm_resilience.py [호출 수]
+import os
+import sys
+import time
+import logging
+import statistics
+
+import numpy as np
+import openai
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_openai_server import FakeOpenAIServer
+from llm_client import CircuitBreaker, LLMUnavailableError, ResilientChatClient
+from metrics import metrics
+
+MESSAGES = [{"role": "user", "content": "[사용자 질문]\n배터리 용량 알려줘"}]
+failures: list[str] = []
+
+
+def check(ok: bool, message: str):
+    print(f"  {'OK  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+def raw_client(server) -> openai.OpenAI:
+    return openai.OpenAI(api_key="sk-test", base_url=server.base_url, max_retries=0)
+
+
+def resilient_client(server, **kwargs) -> ResilientChatClient:
+    options = dict(deadline=3.0, attempt_timeout=2.5, backoff_base=0.05, backoff_max=0.2, hedge_min_delay=0.05,
+                   hedge_default_delay=0.5, breaker=CircuitBreaker(5, 1.0))
+    options.update(kwargs)
+    return ResilientChatClient(raw_client(server), **options)
+
+
+def run(client, calls: int, stream: bool = False) -> tuple[list[float], int, list[str]]:
+    # (지연 ms 목록, 실패 수, 응답 본문)
+    latencies, errors, texts = [], 0, []
+    for _ in range(calls):
+        start = time.perf_counter()
+        try:
+            if stream:
+                chunks = client.chat.completions.create(model="fake", messages=MESSAGES, stream=True)
+                texts.append("".join(c.choices[0].delta.content or "" for c in chunks if c.choices))
+            else:
+                res = client.chat.completions.create(model="fake", messages=MESSAGES)
+                texts.append(res.choices[0].message.content)
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, errors, texts
+
+
+def report(label: str, latencies: list[float], errors: int, requests: int):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"  {label:<10}{p50:>9.0f}{p95:>9.0f}{p99:>9.0f}{1 - errors / len(latencies):>9.3f}"
+          f"{requests / len(latencies):>10.2f}")
+
+
+def header(title: str):
+    print(f"\n[{title}]")
+    print(f"  {'':<10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'성공률':>9}{'요청/호출':>10}")
+
+
+def tail_latency(server, calls: int, stream: bool = False):
+    header("스트리밍 첫 청크 꼬리 지연" if stream else "꼬리 지연 (5% +1.5s)")
+    server.faults.update(latency=0.03, tail_prob=0.05, tail_latency=1.5)
+    results = {}
+    for label, client in (("원본", raw_client(server)), ("안정화", resilient_client(server))):
+        before = server.requests
+        latencies, errors, texts = run(client, calls, stream)
+        report(label, latencies, errors, server.requests - before)
+        results[label] = (np.percentile(latencies, 99), texts)
+    check(results["안정화"][0] < results["원본"][0] * 0.6, "헤징으로 p99 지연이 40% 이상 감소")
+    if stream:
+        check(set(results["안정화"][1]) == set(results["원본"][1]), "헤징된 스트림 본문이 원본과 동일")
+
+
+def transient_errors(server, calls: int, status: int):
+    header(f"일시 오류 (20% {status})")
+    server.faults.update(latency=0.02, tail_prob=0.0, error_prob=0.2, error_status=status)
+    rates = {}
+    for label, client in (("원본", raw_client(server)), ("안정화", resilient_client(server))):
+        before = server.requests
+        latencies, errors, _ = run(client, calls)
+        report(label, latencies, errors, server.requests - before)
+        rates[label] = 1 - errors / calls
+    # 시도 3번이 모두 실패할 확률 0.2^3 = 0.8% -> 여유를 두고 97%
+    check(rates["안정화"] >= 0.97 and rates["안정화"] > rates["원본"] + 0.1, f"재시도로 성공률 97% 이상 ({status})")
+    server.faults.update(error_prob=0.0, error_status=500)
+
+
+def hang(server):
+    print("\n[무응답 (서버가 5초 동안 응답하지 않음, 마감 1초)]")
+    server.faults.update(hang=5.0)
+    client = resilient_client(server, deadline=1.0, attempt_timeout=1.0)
+    start = time.perf_counter()
+    try:
+        client.chat.completions.create(model="fake", messages=MESSAGES)
+        raised = False
+    except LLMUnavailableError:
+        raised = True
+    elapsed = time.perf_counter() - start
+    print(f"  경과 {elapsed * 1000:.0f} ms")
+    check(raised and elapsed < 1.3, "마감 시간 안에 LLMUnavailableError")
+    server.faults.update(hang=0.0)
+
+
+def outage(server):
+    print("\n[장애 (모든 요청 503) -> 복구]")
+    server.faults.update(latency=0.02, outage=True, error_status=503)
+    client = resilient_client(server)
+    latencies = []
+    for _ in range(20):
+        start = time.perf_counter()
+        try:
+            client.chat.completions.create(model="fake", messages=MESSAGES)
+        except LLMUnavailableError:
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+    opened = client.breaker.state
+    print(f"  처음 5회 평균 {statistics.mean(latencies[:5]):.0f} ms, 이후 15회 평균 {statistics.mean(latencies[5:]):.2f} ms"
+          f"  서킷={opened}")
+    check(opened == "open" and statistics.mean(latencies[5:]) < 5, "연속 실패 후 서킷이 열려 즉시 실패")
+
+    server.faults.update(outage=False, error_status=500)
+    time.sleep(client.breaker.cooldown)
+    _, errors, _ = run(client, 3)
+    print(f"  복구 후 3회 실패 {errors}  서킷={client.breaker.state}")
+    check(errors == 0 and client.breaker.state == "closed", "쿨다운 후 시험 요청 성공으로 서킷 닫힘")
+
+
+def main(calls: int = 300):
+    logging.getLogger("llm_client").setLevel(logging.ERROR)  # 재시도 경고 생략
+    server = FakeOpenAIServer().start()
+    try:
+        tail_latency(server, calls)
+        tail_latency(server, calls // 2, stream=True)
+        transient_errors(server, calls, 500)
+        transient_errors(server, calls, 429)
+        hang(server)
+        outage(server)
+    finally:
+        server.stop()
+    summary = metrics.summary()
+    print("\n" + "  ".join(f"{name}={summary[name]:.0f}" for name in
+                           ("llm.attempts", "llm.hedges", "llm.hedge_wins", "llm.retries", "llm.timeouts",
+                            "llm.failures", "llm.breaker_rejections") if name in summary))
+    if failures:
+        print(f"\n{len(failures)}개 검증 실패")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
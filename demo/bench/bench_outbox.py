@@ -0,0 +1,58 @@
+# ==============================
+# 💾 chat_history outbox 벤치마크 (장애 중 적재 -> 복구 후 drain)
+# ==============================
+# 두 번째 시나리오: 백엔드가 영구 거부하는 행(poison) 하나가 섞여도 나머지는 모두 전송되고
+# 그 행만 dead letter 로 가는지 확인 (아니면 exit 1)
+# 실행: 저장소 루트에서 python demo/bench/bench_outbox.py
+import os
+import sys
+import time
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_store import ChatOutbox, MemoryBackend
+
+
+def main(rows: int = 300, outage_calls: int = 5, latency: float = 0.08):
+    path = os.path.join(tempfile.mkdtemp(), "outbox.sqlite3")
+    backend = MemoryBackend(latency=latency, fail_times=outage_calls)
+    outbox = ChatOutbox(path, backend, batch_size=50, flush_interval=0.1, base_backoff=0.2, max_backoff=2.0)
+
+    waits = []
+    for i in range(rows):
+        start = time.perf_counter()
+        outbox.enqueue({"conversation_id": f"conv_{i % 10}", "turn_index": i // 10, "user_input": "q", "llm_response": "a"})
+        waits.append(time.perf_counter() - start)
+    print(f"enqueue p50: {statistics.median(waits) * 1000:.3f} ms  (원격 insert 지연 {latency * 1000:.0f} ms)")
+
+    start = time.perf_counter()
+    while outbox.backlog():
+        print(f"  t={time.perf_counter() - start:5.2f}s  {outbox.stats()}")
+        time.sleep(0.5)
+    print(f"drained {len(backend.rows)} rows in {time.perf_counter() - start:.2f}s  (backend calls={backend.calls})")
+    outbox.close()
+
+
+def poison(rows: int = 100, poison_index: int = 5, timeout: float = 10.0) -> bool:
+    path = os.path.join(tempfile.mkdtemp(), "outbox.sqlite3")
+    backend = MemoryBackend(reject=lambda row: row["turn_index"] == poison_index and row["conversation_id"] == "conv_0")
+    outbox = ChatOutbox(path, backend, batch_size=20, flush_interval=0.1, base_backoff=0.2, max_backoff=2.0)
+    for i in range(rows):
+        outbox.enqueue({"conversation_id": f"conv_{i % 10}", "turn_index": i // 10, "user_input": "q", "llm_response": "a"})
+
+    start = time.perf_counter()
+    while outbox.backlog() and time.perf_counter() - start < timeout:
+        time.sleep(0.1)
+    stats = outbox.stats()
+    outbox.close()
+    print(f"poison: sent={len(backend.rows)}/{rows - 1} in {time.perf_counter() - start:.2f}s  "
+          f"backlog={stats['backlog']}  dead_letters={stats['dead_letters']}")
+    return len(backend.rows) == rows - 1 and stats["backlog"] == 0 and stats["dead_letters"] == 1
+
+
+if __name__ == "__main__":
+    main()
+    if not poison():
+        sys.exit(1)
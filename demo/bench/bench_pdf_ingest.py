@@ -0,0 +1,135 @@
+# ==============================
+# 📥 PDF 디렉터리 인제스트 벤치마크
+# ==============================
+# 합성 매뉴얼 PDF 디렉터리를 만들어
+#   - 기존 방식: 모든 페이지 추출/청킹을 메모리에 모은 뒤 순차 임베딩 -> FAISS.from_embeddings
+#   - pdf_ingest: 프로세스 풀 추출 + 배치 동시 임베딩 + 인덱스에 바로 추가
+# 의 pages/s, chunks/s, 최대 RSS 를 비교합니다. 임베딩은 요청당 지연 + 본문 해시 벡터로 원격 API 를 흉내 냅니다.
+# 설정마다 새 프로세스에서 실행합니다 (최대 RSS 는 추출 워커를 제외한 메인 프로세스 기준).
+# 실행: 저장소 루트에서 python demo/bench/bench_pdf_ingest.py [파일 수] [파일당 페이지] [요청 지연 ms]
+import os
+import sys
+import time
+import random
+import shutil
+import resource
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("배터리 카메라 화면 충전 방수 무게 성능 메모리 저장 용량 디스플레이 프로세서 "
+         "S펜 5000mAh 200MP IP68 갤럭시 울트라 고속 무선 야간 줌 해상도").split()
+BATCH_SIZE = 64
+
+
+def make_corpus(root: str, files: int, pages: int):
+    import pymupdf
+    rng = random.Random(0)
+    for f in range(files):
+        doc = pymupdf.open()
+        for p in range(pages):
+            lines = [f"제품 {f} 매뉴얼 {p} 페이지"]
+            lines += [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(45)]
+            doc.new_page().insert_text((36, 36), "\n".join(lines), fontname="korea", fontsize=7)
+        subdir = os.path.join(root, f"line{f % 4}")
+        os.makedirs(subdir, exist_ok=True)
+        doc.save(os.path.join(subdir, f"manual_{f:04d}.pdf"))
+
+
+def latency_embeddings(delay: float):
+    import hashlib
+
+    import numpy as np
+    from langchain_core.embeddings import Embeddings
+
+    class RemoteLikeEmbeddings(Embeddings):
+        # embed_documents 호출 1회 = 요청 1회: delay 초 대기 후 본문 해시로 만든 벡터 반환
+        # (임베딩 계산은 원격에서 일어나므로 로컬 CPU 는 거의 쓰지 않음)
+        model = "remote-like-d256"
+
+        def _vector(self, text: str) -> list[float]:
+            seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+            return np.random.default_rng(seed).standard_normal(256).astype(np.float32).tolist()
+
+        def embed_documents(self, texts):
+            time.sleep(delay)
+            return [self._vector(text) for text in texts]
+
+        def embed_query(self, text):
+            return self._vector(text)
+
+    return RemoteLikeEmbeddings()
+
+
+def run_serial(pdf_dir: str, index_dir: str, delay: float) -> tuple[int, int]:
+    # 기존 load_or_create_rag_retriever 흐름을 디렉터리로 확장한 기준선
+    from langchain_community.vectorstores import FAISS
+    from pdf_ingest import extract_units, find_pdfs
+
+    embeddings = latency_embeddings(delay)
+    units = [unit for source, path in find_pdfs(pdf_dir).items() for unit in extract_units(path, source, 700, 150)]
+    docs = [doc for unit in units for doc in unit.chunks]
+    texts = [doc.page_content for doc in docs]
+    vectors = []
+    for i in range(0, len(texts), BATCH_SIZE):
+        vectors.extend(embeddings.embed_documents(texts[i:i + BATCH_SIZE]))
+    db = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=[doc.metadata for doc in docs])
+    db.save_local(index_dir)
+    return len(units), len(docs)
+
+
+def run_pipeline(pdf_dir: str, index_dir: str, delay: float, workers: int, inflight: int) -> tuple[int, int]:
+    from pdf_ingest import ingest_pdf_directory
+
+    _, stats = ingest_pdf_directory(pdf_dir, latency_embeddings(delay), index_dir, workers=workers,
+                                    batch_size=BATCH_SIZE, max_inflight=inflight)
+    return stats.pages, stats.chunks
+
+
+def child(mode: str, pdf_dir: str, delay: float, workers: int, inflight: int, results):
+    index_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        if mode == "serial":
+            pages, chunks = run_serial(pdf_dir, index_dir, delay)
+        else:
+            pages, chunks = run_pipeline(pdf_dir, index_dir, delay, workers, inflight)
+        seconds = time.perf_counter() - start
+        results.put((pages, chunks, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+
+def measure(mode: str, pdf_dir: str, delay: float, workers: int = 1, inflight: int = 1):
+    context = mp.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=child, args=(mode, pdf_dir, delay, workers, inflight, results))
+    process.start()
+    pages, chunks, seconds, peak_mb = results.get()
+    process.join()
+    label = "기존 (순차)" if mode == "serial" else f"pipeline w={workers} inflight={inflight}"
+    print(f"{label:<28}{pages:>7}{chunks:>8}{seconds:>9.1f}{pages / seconds:>10.1f}{chunks / seconds:>11.1f}"
+          f"{peak_mb:>11.0f}")
+
+
+def main(files: int = 40, pages: int = 30, delay_ms: int = 80):
+    pdf_dir = tempfile.mkdtemp()
+    try:
+        make_corpus(pdf_dir, files, pages)
+        cpus = os.cpu_count() or 1
+        delay = delay_ms / 1000
+        print(f"files={files}  pages/file={pages}  batch={BATCH_SIZE}  요청 지연={delay_ms} ms  CPU={cpus}")
+        print(f"{'방식':<28}{'페이지':>7}{'청크':>8}{'초':>9}{'pages/s':>10}{'chunks/s':>11}{'최대 RSS MB':>11}")
+        measure("serial", pdf_dir, delay)
+        measure("pipeline", pdf_dir, delay, 1, 1)
+        measure("pipeline", pdf_dir, delay, 1, 8)
+        if cpus > 1:
+            measure("pipeline", pdf_dir, delay, cpus, 8)
+    finally:
+        shutil.rmtree(pdf_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,132 @@
+# ==============================
+# 🗂️ 제품군 샤드 라우팅 벤치마크
+# ==============================
+# 제품군마다 고유 용어 + 공통 용어로 된 합성 매뉴얼 PDF 코퍼스를 만들어
+#   - 단일 인덱스: 코퍼스 전체를 한 인덱스로 인제스트 -> hybrid_search
+#   - 샤드: 제품군별 인덱스 + ShardRouter (별칭 / 중심 벡터 라우팅)
+# 의 질의 지연(p50/p95), Top-k 중 질문한 제품군 문서 비율(정밀도), 라우팅 정확도와
+# 메모리 한도에 따른 샤드 로드/언로드 횟수를 비교합니다. 임베딩은 오프라인 HashingEmbeddings 를 사용합니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_product_shards.py [제품군 수] [제품군당 파일] [파일당 페이지]
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_index import sync_keyword_index
+from metrics import metrics
+from offline_backends import HashingEmbeddings
+from pdf_ingest import ingest_pdf_directory
+from product_shards import ShardRouter, build_product_shards
+from retrievers import hybrid_search
+
+K = 4
+FETCH_K = 20
+COMMON = "배터리 충전 화면 설정 전원 연결 업데이트 초기화 보증 서비스 소음 온도".split()
+TOPICS = ("카메라 렌즈 셀카 야간 줌 S펜 5G 유심 통화 문자", "채널 리모컨 HDMI 패널 화질 음향 사운드바 넷플릭스 벽걸이 스탠드",
+          "세탁 탈수 헹굼 건조 세제 통살균 급수 배수 필터 코스", "심박 수면 걸음 운동 스트랩 워치페이스 혈압 산소 GPS 방수",
+          "냉동 냉장 제빙 정수 도어 선반 김치 보관 성에 냉매", "흡입 먼지통 브러시 물걸레 청정 스테이션 배터리팩 흡입력 헤파 소음",
+          "에어컨 냉방 제습 송풍 실외기 필터 무풍 바람 리모컨 예약", "노트북 키보드 터치패드 SSD 램 썬더볼트 팬 발열 지문 웹캠")
+
+
+def make_corpus(root: str, lines: int, files: int, pages: int) -> list[tuple[str, list[str]]]:
+    # 제품군 디렉터리 + 모델명 별칭 파일 생성 -> [(제품군, 모델명)]
+    import pymupdf
+    rng = random.Random(0)
+    catalog = []
+    for line in range(lines):
+        name = f"line{line}"
+        words = TOPICS[line % len(TOPICS)].split() + COMMON
+        models = [f"MX{line}{m}0" for m in range(3)]
+        os.makedirs(os.path.join(root, name))
+        for f in range(files):
+            doc = pymupdf.open()
+            for p in range(pages):
+                text = [f"{models[f % len(models)]} 사용 설명서 {p} 페이지"]
+                text += [" ".join(rng.choice(words) for _ in range(10)) for _ in range(40)]
+                doc.new_page().insert_text((36, 36), "\n".join(text), fontname="korea", fontsize=7)
+            doc.save(os.path.join(root, name, f"{name}_{f:03d}.pdf"))
+        with open(os.path.join(root, name, "aliases.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(models))
+        catalog.append((name, models))
+    return catalog
+
+
+def make_queries(catalog, count: int = 200) -> list[tuple[str, str]]:
+    # 절반은 모델명 포함, 절반은 제품군 용어만 -> [(질문, 정답 제품군)]
+    # 실제 트래픽처럼 일부 제품군에 질문이 몰림 (1/순위 가중치)
+    rng = random.Random(1)
+    weights = [1 / (rank + 1) for rank in range(len(catalog))]
+    queries = []
+    for i in range(count):
+        line, models = rng.choices(catalog, weights)[0]
+        topic = TOPICS[int(line[4:]) % len(TOPICS)].split()
+        words = rng.sample(topic, 2) + rng.sample(COMMON, 1)
+        if i % 2 == 0:
+            words.insert(0, rng.choice(models))
+        queries.append((" ".join(words) + " 알려줘", line))
+    return queries
+
+
+def measure(label: str, search, queries, embeddings):
+    samples, precision = [], []
+    for query, line in queries:
+        vector = embeddings.embed_query(query)
+        start = time.perf_counter()
+        docs = search(query, vector)
+        samples.append((time.perf_counter() - start) * 1000)
+        precision.append(sum(os.path.basename(doc.metadata["source"]).startswith(line + "_") for doc in docs) / K)
+    print(f"{label:<26}{statistics.median(samples):>9.2f}{float(statistics.quantiles(samples, n=20)[-1]):>9.2f}"
+          f"{statistics.mean(precision):>12.3f}")
+
+
+def main(lines: int = 6, files: int = 4, pages: int = 20):
+    root = tempfile.mkdtemp()
+    try:
+        corpus = os.path.join(root, "corpus")
+        catalog = make_corpus(corpus, lines, files, pages)
+        embeddings = HashingEmbeddings()
+        queries = make_queries(catalog)
+
+        single_dir = os.path.join(root, "single")
+        db, _ = ingest_pdf_directory(corpus, embeddings, single_dir, workers=1)
+        keyword_index = sync_keyword_index(single_dir, db)
+        shard_root = os.path.join(root, "shards")
+        build_product_shards(corpus, shard_root, embeddings, workers=1)
+        router = ShardRouter(shard_root, embeddings, memory_budget_mb=0)
+
+        print(f"제품군={lines}  파일/제품군={files}  페이지/파일={pages}  청크={db.index.ntotal}  질의={len(queries)}")
+        print(f"{'방식':<26}{'p50 ms':>9}{'p95 ms':>9}{'정밀도@' + str(K):>12}")
+        measure("단일 인덱스 (hybrid)", lambda q, v: hybrid_search(db, keyword_index, q, v, k=K, fetch_k=FETCH_K),
+                queries, embeddings)
+        for _ in router.names:  # 전체 샤드 미리 로드 (지연만 비교)
+            router.shard(_)
+        measure("샤드 라우팅 (hybrid)", lambda q, v: router.search(q, v, k=K, fetch_k=FETCH_K), queries, embeddings)
+
+        routed = [router.route(query, embeddings.embed_query(query)) for query, _ in queries]
+        hit = statistics.mean(line in names for names, (_, line) in zip(routed, queries))
+        fanout = statistics.mean(len(names) for names in routed)
+        print(f"라우팅 정답 포함률 {hit:.3f}  평균 검색 샤드 수 {fanout:.2f} / {len(router.names)}")
+
+        shard_mb = max(d["bytes"] for d in router.descriptors.values()) / 2**20
+        for budget_shards in (len(router.names), 3, 1):
+            budget = ShardRouter(shard_root, embeddings, memory_budget_mb=shard_mb * budget_shards + 1e-3)
+            before = metrics.summary()
+            for query, _ in queries:
+                budget.search(query, embeddings.embed_query(query), k=K, fetch_k=FETCH_K)
+            after = metrics.summary()
+            loads, evictions = (after.get(name, 0) - before.get(name, 0) for name in ("shards.loads", "shards.evictions"))
+            print(f"메모리 한도 ≈ 샤드 {budget_shards}개 ({shard_mb * budget_shards:.1f} MB): "
+                  f"로드 {loads:.0f}회  언로드 {evictions:.0f}회  "
+                  f"상주 {budget.loaded_bytes / 2**20:.1f} MB")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,76 @@
+# ==============================
+# 🔍 의도 분류 벤치마크 (llm / local / hybrid)
+# ==============================
+# local / hybrid 는 질의 임베딩 비용이 지연의 대부분이므로 모드마다 빈 임베딩 저장소(임시 디렉터리)로
+#   - cold: 처음 보는 질의 (임베딩 API 호출 포함)
+#   - warm: 같은 질의 반복 (임베딩 저장소 적중)
+# 을 따로 잽니다. 예시 중심 벡터는 측정에서 제외합니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_routing.py
+import os
+import sys
+import json
+import time
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_context import get_app_context
+from embedding_store import CachedEmbeddings, EmbeddingStore, embedding_model_name
+from router import IntentRouter
+
+LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "routing_labels.json")
+
+
+def run_mode(router, samples: list, mode: str) -> dict:
+    correct, llm_calls, latencies = 0, 0, []
+    for sample in samples:
+        start = time.perf_counter()
+        decision = router.route(sample["query"], mode=mode)
+        latencies.append(time.perf_counter() - start)
+        correct += decision.route == sample["route"]
+        llm_calls += decision.source == "llm"
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "accuracy": correct / len(samples),
+        "llm_calls": llm_calls,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+    }
+
+
+def fresh_router(base_router: IntentRouter, base_embeddings, store_root: str) -> IntentRouter:
+    # 앱 라우터와 같은 분류기 / 중심 벡터, 임베딩 저장소만 비어 있음
+    embeddings = CachedEmbeddings(base_embeddings, EmbeddingStore(store_root, embedding_model_name(base_embeddings)))
+    router = IntentRouter(embeddings, base_router.llm_classify, base_router.examples_path,
+                          mode=base_router.mode, margin_threshold=base_router.margin_threshold)
+    router._centroids = base_router.centroids
+    return router
+
+
+def main():
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        samples = json.load(f)
+    ctx = get_app_context()
+    base_embeddings = ctx.embeddings.base if isinstance(ctx.embeddings, CachedEmbeddings) else ctx.embeddings
+
+    print(f"samples={len(samples)}  margin_threshold={ctx.router.margin_threshold}")
+    print(f"{'mode':<8}{'accuracy':>10}{'llm_calls':>11}{'cold p50':>10}{'cold p95':>10}"
+          f"{'warm p50':>10}{'warm p95':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in ("llm", "local", "hybrid"):
+            router = fresh_router(ctx.router, base_embeddings, os.path.join(workdir, mode))
+            cold = run_mode(router, samples, mode)
+            warm = run_mode(router, samples, mode) if mode != "llm" else None
+            row = (f"{mode:<8}{cold['accuracy']:>10.3f}{cold['llm_calls']:>11}"
+                   f"{cold['p50_ms']:>10.1f}{cold['p95_ms']:>10.1f}")
+            if warm is None:
+                row += f"{'-':>10}{'-':>10}"  # 임베딩을 쓰지 않음
+            else:
+                row += f"{warm['p50_ms']:>10.1f}{warm['p95_ms']:>10.1f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
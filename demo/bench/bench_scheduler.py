@@ -0,0 +1,189 @@
+# ==============================
+# 🚦 요청 스케줄러 검증 / 벤치마크 (RPM 한도, 우선순위, 대화별 공정 큐)
+# ==============================
+# 1) 몰림: 여러 세션이 동시에 채팅 호출을 보내고, 가짜 서버(fake_openai_server)는 초당 요청 한도를 넘으면 429
+#    - 개별 호출: ResilientChatClient 재시도만 (세션마다 따로 보내고 429 를 받으면 백오프)
+#    - 스케줄러 : 같은 클라이언트 + 한도보다 조금 낮은 RequestScheduler (scheduler.py)
+#    429 수, 성공률, 호출 지연 p50/p95 를 비교합니다.
+# 2) 우선순위 / 공정 큐: 한 대화가 요청 40개를 한꺼번에 넣고 분석 / 인덱스 빌드 요청이 쌓인 상태에서
+#    다른 대화 5개가 요청 2개씩 보낼 때 대기 시간 (FIFO 단일 큐 vs 우선순위 + 공정 큐)
+# 3) 서킷 시험 요청: 반쯤 열린 서킷에서 시험 요청이 스케줄러 대기 시간 초과로 끝나도 다음 요청이 다시 시험할 수 있는지
+# 기대 동작이 어긋나면 종료 코드 1 로 끝납니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_scheduler.py [세션 수]
+import os
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import openai
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_openai_server import FakeOpenAIServer
+from llm_client import CircuitBreaker, LLMUnavailableError, ResilientChatClient
+from metrics import metrics
+from scheduler import RequestScheduler, request_context
+from token_count import count_tokens
+
+MESSAGES = [{"role": "user", "content": "[사용자 질문]\n배터리 용량 알려줘"}]
+SERVER_RPS = 20
+failures: list[str] = []
+
+
+def check(ok: bool, message: str):
+    print(f"  {'OK  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+def burst(server, sessions: int, calls_per_session: int, scheduler: RequestScheduler | None):
+    client = ResilientChatClient(
+        openai.OpenAI(api_key="sk-test", base_url=server.base_url, max_retries=0),
+        deadline=15.0, attempt_timeout=5.0, max_retries=3, backoff_base=0.5, backoff_max=2.0,
+        hedge=False, scheduler=scheduler,
+    )
+    latencies, errors = [], []
+
+    def session(index: int):
+        with request_context("interactive", f"conv_{index}"):
+            for _ in range(calls_per_session):
+                start = time.perf_counter()
+                try:
+                    client.chat.completions.create(model="fake", messages=MESSAGES)
+                except Exception:
+                    errors.append(1)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    before = server.rate_limited
+    start = time.perf_counter()
+    with ThreadPoolExecutor(sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    elapsed = time.perf_counter() - start
+    client.close()
+    calls = sessions * calls_per_session
+    return {
+        "rate_limited": server.rate_limited - before, "success": 1 - len(errors) / calls,
+        "p50": float(np.percentile(latencies, 50)), "p95": float(np.percentile(latencies, 95)),
+        "throughput": calls / elapsed,
+    }
+
+
+def rate_limit_burst(sessions: int):
+    print(f"\n[몰림: 세션 {sessions}개 x 호출 4회 동시, 서버 한도 {SERVER_RPS} rps]")
+    server = FakeOpenAIServer(latency=0.15, rps=SERVER_RPS).start()
+    try:
+        print(f"  {'':<10}{'429':>7}{'성공률':>9}{'p50 ms':>9}{'p95 ms':>9}{'호출/s':>9}")
+        results = {}
+        for label, scheduler in (
+            ("개별 호출", None),
+            # 서버가 1초 창으로 세므로 버킷도 0.1초 분량만 (버킷 크기 + 1초 충전량이 한도를 넘지 않게)
+            ("스케줄러", RequestScheduler(rpm=SERVER_RPS * 60 * 0.9, burst_seconds=0.1, name="bench_llm")),
+        ):
+            time.sleep(1.1)  # 서버 한도 창 비우기
+            r = burst(server, sessions, 4, scheduler)
+            results[label] = r
+            print(f"  {label:<10}{r['rate_limited']:>7}{r['success']:>9.3f}{r['p50']:>9.0f}{r['p95']:>9.0f}"
+                  f"{r['throughput']:>9.1f}")
+    finally:
+        server.stop()
+    base, scheduled = results["개별 호출"], results["스케줄러"]
+    check(scheduled["rate_limited"] <= max(1, base["rate_limited"] // 20), "스케줄러로 429 가 95% 이상 감소")
+    check(scheduled["success"] == 1.0, "스케줄러 사용 시 모든 호출 성공")
+    check(scheduled["p95"] < base["p95"], "스케줄러 사용 시 p95 지연 감소 (백오프 재시도 대신 대기열)")
+
+
+def priority_fairness():
+    print("\n[우선순위 / 공정 큐: 대화 A 요청 40개 + 분석 20개 + 인덱스 빌드 20개가 쌓인 뒤 대화 5개가 2개씩]")
+    print(f"  {'':<16}{'대화 A p50':>11}{'다른 대화 p50':>13}{'다른 대화 max':>13}{'분석 p50':>10}{'빌드 p50':>10}")
+    rows = {}
+    for label, fair in (("FIFO 단일 큐", False), ("우선순위+공정 큐", True)):
+        # 초당 20건, 동시 4건, 요청당 50 ms
+        scheduler = RequestScheduler(rpm=1200, max_concurrency=4, burst_seconds=0.5, name="bench_fair")
+        waits: dict[str, list[float]] = {"heavy": [], "light": [], "analysis": [], "batch": []}
+        lock = threading.Lock()
+
+        def request(group: str, conversation: str, priority: str):
+            start = time.perf_counter()
+            if fair:
+                permit = scheduler.acquire(10, priority=priority, conversation_id=conversation)
+            else:
+                permit = scheduler.acquire(10, priority="interactive", conversation_id="fifo")
+            with permit:
+                waited = (time.perf_counter() - start) * 1000
+                time.sleep(0.05)
+            with lock:
+                waits[group].append(waited)
+
+        threads = []
+
+        def spawn(*args):
+            thread = threading.Thread(target=request, args=args)
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.001)  # 도착 순서 고정
+
+        for _ in range(40):
+            spawn("heavy", "conv_heavy", "interactive")
+        for _ in range(20):
+            spawn("analysis", "conv_analysis", "analysis")
+        for _ in range(20):
+            spawn("batch", None, "batch")
+        time.sleep(0.1)
+        for i in range(5):
+            for _ in range(2):
+                spawn("light", f"conv_{i}", "interactive")
+        for thread in threads:
+            thread.join()
+        rows[label] = {group: (float(np.median(v)), float(max(v))) for group, v in waits.items()}
+        r = rows[label]
+        print(f"  {label:<16}{r['heavy'][0]:>11.0f}{r['light'][0]:>13.0f}{r['light'][1]:>13.0f}"
+              f"{r['analysis'][0]:>10.0f}{r['batch'][0]:>10.0f}")
+    fifo, fair = rows["FIFO 단일 큐"], rows["우선순위+공정 큐"]
+    check(fair["light"][1] < fifo["light"][1] * 0.25, "공정 큐로 다른 대화의 최대 대기 75% 이상 감소")
+    check(fair["light"][1] < fair["heavy"][1] and fair["analysis"][0] < fair["batch"][0]
+          and fair["heavy"][0] < fair["analysis"][0], "interactive > analysis > batch 순으로 처리")
+
+
+def breaker_probe_timeout():
+    print("\n[반쯤 열린 서킷 + 스케줄러 대기 시간 초과 -> 다음 요청의 시험]")
+    scheduler = RequestScheduler(rpm=6000, max_concurrency=1, name="bench_probe")
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.2)
+    client = ResilientChatClient(object(), deadline=0.1, hedge=False, breaker=breaker, scheduler=scheduler)
+    breaker.record_failure()
+    time.sleep(breaker.cooldown)
+    held = scheduler.acquire(10)  # 동시 요청 자리를 막아 시험 요청이 대기열에서 마감 시간을 넘기게 함
+    try:
+        client.chat.completions.create(model="fake", messages=MESSAGES)
+        timed_out = False
+    except LLMUnavailableError:
+        timed_out = True
+    finally:
+        held.release()
+        client.close()
+    state = breaker.state
+    print(f"  대기 시간 초과 {timed_out}  서킷={state}")
+    check(timed_out and state == "half_open" and breaker.allow(), "대기 시간 초과 뒤에도 다음 요청이 시험 요청으로 허용")
+
+
+def main(sessions: int = 30):
+    logging.getLogger("llm_client").setLevel(logging.ERROR)  # 재시도 경고 생략
+    count_tokens("")  # 토크나이저를 스레드 시작 전에 한 번 로드
+    rate_limit_burst(sessions)
+    priority_fairness()
+    breaker_probe_timeout()
+    summary = metrics.summary()
+    for name in ("bench_llm.wait_ms", "bench_fair.interactive.wait_ms", "bench_fair.analysis.wait_ms",
+                 "bench_fair.batch.wait_ms"):
+        if name in summary:
+            print(f"{name}: p50={summary[name]['p50']:.0f} p95={summary[name]['p95']:.0f} ms")
+    if failures:
+        print(f"\n{len(failures)}개 검증 실패")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,103 @@
+# ==============================
+# 🏎️ 라우팅 + 검색 추측 실행 벤치마크 (순차 vs SPECULATIVE_RETRIEVAL)
+# ==============================
+# 라우팅 질의(bench/data/routing_labels.json)를 그래프 전체(graph.invoke)로 실행해
+#   - 순차  : route_intent(LLM 분류)가 끝난 뒤 에이전트 노드에서 검색
+#   - 추측  : 라우팅과 동시에 제품 / 강의 검색을 모두 시작, 선택된 쪽 결과를 에이전트가 바로 사용
+# 의 질의당 지연과 노드별 시간(node.*_ms), 에이전트가 검색을 기다린 시간(*.retrieval_wait_ms)을 비교합니다.
+# 라우팅이 항상 LLM 을 거치도록 ROUTER_MODE=llm, 답변 캐시는 끔.
+# 오프라인 백엔드에서는 채팅 첫 토큰 지연(--llm-ms)과 질의 임베딩 왕복 지연(--embed-ms)을 흉내 냅니다.
+# 실행: 저장소 루트에서 python demo/bench/bench_speculative.py [--llm-ms 400] [--embed-ms 150]
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "routing_labels.json")
+
+
+class DelayedEmbeddings:
+    # 질의 임베딩마다 네트워크 왕복 지연을 더함 (임베딩 저장소 적중 여부와 무관하게)
+    def __init__(self, base, delay: float):
+        self.base = base
+        self.delay = delay
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.delay)
+        return self.base.embed_query(text)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.base.embed_documents(texts)
+
+
+def run(ctx, samples: list) -> tuple[list[float], list[str]]:
+    latencies, answers = [], []
+    for sample in samples:
+        start = time.perf_counter()
+        result = ctx.graph.invoke({"user_query": sample["query"], "chat_history": []})
+        latencies.append((time.perf_counter() - start) * 1000)
+        answers.append(result["final_response"])
+    return latencies, answers
+
+
+def p50(summary: dict, name: str) -> str:
+    return f"{summary[name]['p50']:.0f}" if name in summary else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-ms", type=float, default=400.0, help="가짜 채팅 클라이언트의 첫 토큰 지연")
+    parser.add_argument("--embed-ms", type=float, default=150.0, help="오프라인 임베딩의 질의당 지연")
+    args = parser.parse_args()
+    os.environ.setdefault("ROUTER_MODE", "llm")
+    os.environ.setdefault("AGENT1_CACHE_ENABLED", "0")
+    os.environ.setdefault("SPECULATIVE_RETRIEVAL", "1")
+    os.environ.setdefault("FAKE_CHAT_TTFT", str(args.llm_ms / 1000))
+
+    import config
+    from app_context import get_app_context
+    from metrics import metrics
+
+    with open(LABELS_PATH, "r", encoding="utf-8") as f:
+        samples = json.load(f)
+    ctx = get_app_context()
+    if config.EMBEDDING_BACKEND != "openai":
+        ctx.embeddings = DelayedEmbeddings(ctx.embeddings, args.embed_ms / 1000)
+    pool = ctx.speculation_pool
+    if pool is None:
+        raise ValueError("SPECULATIVE_RETRIEVAL=1 로 실행해야 합니다")
+    run(ctx, samples[:2])  # 워밍업
+
+    print(f"queries={len(samples)}  router={config.ROUTER_MODE}  chat={config.CHAT_BACKEND}  "
+          f"embeddings={config.EMBEDDING_BACKEND}")
+    print(f"{'':<6}{'p50 ms':>8}{'p95 ms':>8}{'route':>8}{'agent1':>8}{'agent2':>8}"
+          f"{'검색대기1':>10}{'검색대기2':>10}{'추측대기':>9}")
+    rows = {}
+    for label, speculation_pool in (("순차", None), ("추측", pool)):
+        ctx.speculation_pool = speculation_pool
+        metrics.reset()
+        latencies, answers = run(ctx, samples)
+        summary = metrics.summary()
+        rows[label] = (latencies, answers, summary)
+        print(f"{label:<6}{np.percentile(latencies, 50):>8.0f}{np.percentile(latencies, 95):>8.0f}"
+              f"{p50(summary, 'node.route_intent_ms'):>8}{p50(summary, 'node.agent1_ms'):>8}"
+              f"{p50(summary, 'node.agent2_ms'):>8}{p50(summary, 'agent1.retrieval_wait_ms'):>10}"
+              f"{p50(summary, 'agent2.retrieval_wait_ms'):>10}{p50(summary, 'speculation.wait_ms'):>9}")
+
+    sequential, speculative = rows["순차"], rows["추측"]
+    saved = np.percentile(sequential[0], 50) - np.percentile(speculative[0], 50)
+    retrieval = np.median([v for name in ("agent1.retrieval_ms", "agent2.retrieval_ms")
+                           for v in [sequential[2].get(name, {}).get("p50")] if v is not None])
+    print(f"\n질의당 p50 단축 {saved:.0f} ms (순차 검색 p50 {retrieval:.0f} ms), "
+          f"버린 검색 {speculative[2].get('speculation.discarded', 0):.0f}건, "
+          f"답변 동일 {sum(a == b for a, b in zip(sequential[1], speculative[1]))}/{len(samples)}")
+    ctx.speculation_pool = pool
+
+
+if __name__ == "__main__":
+    main()
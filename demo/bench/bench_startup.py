@@ -0,0 +1,49 @@
+# ==============================
+# ⏱️ rerun 당 초기화 비용 벤치마크 (before / after)
+# ==============================
+# 실행: 저장소 루트에서 python demo/bench/bench_startup.py
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_context import AppContext, get_app_context
+
+# 기존 stdemo7.py 에서 rerun 마다 다시 실행되던 단계
+# (리트리버는 st.cache_resource, 강의 데이터는 st.cache_data 복사본으로 반환)
+RERUN_STEPS = ("openai_client", "supabase_client", "prompts", "course_catalog", "graph")
+
+
+def main(runs: int = 5):
+    # before: 매 rerun 마다 컨텍스트 구성 요소를 새로 생성
+    per_step: dict[str, list[float]] = {}
+    for _ in range(runs):
+        ctx = AppContext()
+        for step, sec in ctx.timings.items():
+            per_step.setdefault(step, []).append(sec)
+        ctx.close()
+
+    print("[cold build, 단계별 평균]")
+    for step, values in per_step.items():
+        mark = "*" if step in RERUN_STEPS else " "
+        print(f" {mark} {step:<18}{statistics.mean(values) * 1000:9.2f} ms")
+    before = sum(statistics.mean(per_step[s]) for s in RERUN_STEPS if s in per_step)
+
+    # after: 프로세스 싱글턴 재사용
+    get_app_context()
+    samples = []
+    for _ in range(runs * 100):
+        start = time.perf_counter()
+        get_app_context()
+        samples.append(time.perf_counter() - start)
+    after = statistics.mean(samples)
+
+    print()
+    print(f"rerun 당 비용 before (* 단계 합): {before * 1000:9.2f} ms")
+    print(f"rerun 당 비용 after  (싱글턴 조회): {after * 1000:9.4f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
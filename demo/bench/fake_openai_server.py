@@ -0,0 +1,163 @@
+# ==============================
+# 🧪 지연 / 오류를 주입하는 로컬 가짜 OpenAI 서버
+# ==============================
+# POST /v1/chat/completions 만 구현합니다 (일반 JSON / stream=True SSE). 답변은 offline_reply 로 만듭니다.
+# 요청마다 아래 설정으로 지연과 오류를 주입합니다 (실행 중 FakeOpenAIServer.faults 값을 바꿔 장애 시나리오 재현).
+#   latency    : 기본 지연(초)
+#   tail_prob  : tail_latency 만큼 추가로 늦어질 확률 (꼬리 지연)
+#   error_prob : error_status (기본 500) 로 실패할 확률
+#   outage     : True 면 모든 요청을 error_status 로 실패
+#   hang       : True 면 응답 없이 hang 초 동안 대기 (마감 시간 확인용)
+#   rps        : 0 보다 크면 초당 요청 한도, 넘으면 429 (계정 RPM 한도 흉내)
+# 앱을 이 서버에 붙이려면:
+#   python demo/bench/fake_openai_server.py --port 8765 --error-prob 0.1 --tail-prob 0.05
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 MY_API_KEY=sk-test streamlit run demo/stdemo7.py
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from offline_backends import offline_reply
+
+DEFAULT_FAULTS = {
+    "latency": 0.02, "tail_prob": 0.0, "tail_latency": 2.0, "error_prob": 0.0,
+    "error_status": 500, "outage": False, "hang": 0.0, "rps": 0,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+        faults = dict(server.faults)
+        with server.lock:
+            server.requests += 1
+            now = time.monotonic()
+            while server.recent and now - server.recent[0] >= 1.0:
+                server.recent.popleft()
+            limited = faults["rps"] and len(server.recent) >= faults["rps"]
+            if limited:
+                server.rate_limited += 1
+            else:
+                server.recent.append(now)
+        if limited:
+            self._json(429, {"error": {"message": "rate limit exceeded", "type": "requests"}})
+            return
+        if faults["hang"]:
+            time.sleep(faults["hang"])
+        delay = faults["latency"] + (faults["tail_latency"] if random.random() < faults["tail_prob"] else 0.0)
+        time.sleep(delay)
+        if faults["outage"] or random.random() < faults["error_prob"]:
+            with server.lock:
+                server.errors += 1
+            self._json(faults["error_status"], {"error": {"message": "injected failure", "type": "server_error"}})
+            return
+
+        text = offline_reply(request.get("messages", []))
+        model = request.get("model", "fake")
+        created = int(time.time())
+        if not request.get("stream"):
+            self._json(200, {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        pieces = [text[i:i + 4] for i in range(0, len(text), 4)] + [None]
+        try:
+            for piece in pieces:
+                chunk = {
+                    "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "finish_reason": None if piece else "stop",
+                                 "delta": {"content": piece} if piece else {}}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 헤지에 밀려 클라이언트가 먼저 닫음
+
+
+class FakeOpenAIServer:
+    def __init__(self, port: int = 0, **faults):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.faults = {**DEFAULT_FAULTS, **faults}
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = 0
+        self.httpd.errors = 0
+        self.httpd.rate_limited = 0
+        self.httpd.recent = deque()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def faults(self) -> dict:
+        return self.httpd.faults
+
+    @property
+    def requests(self) -> int:
+        return self.httpd.requests
+
+    @property
+    def rate_limited(self) -> int:
+        return self.httpd.rate_limited
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지연 / 오류를 주입하는 로컬 가짜 OpenAI 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=DEFAULT_FAULTS["latency"])
+    parser.add_argument("--tail-prob", type=float, default=0.0)
+    parser.add_argument("--tail-latency", type=float, default=DEFAULT_FAULTS["tail_latency"])
+    parser.add_argument("--error-prob", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--rps", type=int, default=0)
+    args = parser.parse_args()
+    server = FakeOpenAIServer(args.port, latency=args.latency, tail_prob=args.tail_prob,
+                              tail_latency=args.tail_latency, error_prob=args.error_prob,
+                              error_status=args.error_status, rps=args.rps)
+    print(f"listening on {server.base_url}")
+    server.httpd.serve_forever()
@@ -0,0 +1,399 @@
+# ==============================
+# 💾 chat_history 비동기 저장
+# ==============================
+# ChatWriter : 메모리 큐 write-behind. UI 는 enqueue() 후 바로 반환하고, 백그라운드
+#              스레드 하나가 행을 모아 크기/시간 조건을 만족하면 multi-row insert 로 기록합니다.
+# ChatOutbox : 로컬 SQLite(WAL) outbox. 행을 로컬에 먼저 커밋한 뒤 Supabase 로
+#              (conversation_id, turn_index) 기준 upsert 재전송 -> 장애 중에도 유실 없음.
+#              백엔드가 영구적으로 거부한 행(스키마 / 검증 4xx)이나 max_attempts 번 실패한 행은
+#              outbox_dead 테이블로 옮겨 뒤의 대화 저장을 막지 않게 함 (requeue_dead_letters() 로 재전송)
+# 둘 다 단일 전송 스레드 + 입력 순서 전송이므로 conversation_id 별 turn_index 순서가 유지됩니다.
+import json
+import time
+import queue
+import random
+import sqlite3
+import logging
+import threading
+from collections import deque
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================
+# 저장 백엔드
+# ==============================
+class SupabaseBackend:
+    def __init__(self, supabase, table: str = "chat_history"):
+        self.supabase = supabase
+        self.table = table
+
+    def insert_rows(self, rows: list[dict]):
+        self.supabase.table(self.table).insert(rows).execute()
+
+    def upsert_rows(self, rows: list[dict]):
+        # chat_history 에 (conversation_id, turn_index) unique 제약이 필요
+        self.supabase.table(self.table).upsert(
+            rows, on_conflict="conversation_id,turn_index", ignore_duplicates=True
+        ).execute()
+
+
+class MemoryBackend:
+    # Supabase 없이 테스트/벤치마크할 때 쓰는 로컬 대체 백엔드 (지연/장애 주입 가능)
+    # reject: 행을 받아 True 면 그 행이 든 요청을 영구 오류(ValueError)로 거부
+    def __init__(self, latency: float = 0.0, fail_times: int = 0, reject=None):
+        self.latency = latency
+        self.fail_times = fail_times
+        self.reject = reject
+        self.rows: list[dict] = []
+        self.calls = 0
+        self._keys: set = set()
+        self._lock = threading.Lock()
+
+    def _call(self):
+        time.sleep(self.latency)
+        self.calls += 1
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("memory backend: injected failure")
+
+    def insert_rows(self, rows: list[dict]):
+        with self._lock:
+            self._call()
+            self.rows.extend(dict(row) for row in rows)
+
+    def upsert_rows(self, rows: list[dict]):
+        with self._lock:
+            self._call()
+            if self.reject is not None and any(self.reject(row) for row in rows):
+                raise ValueError("memory backend: row rejected")
+            for row in rows:
+                key = (row["conversation_id"], row["turn_index"])
+                if key not in self._keys:
+                    self._keys.add(key)
+                    self.rows.append(dict(row))
+
+
+# ==============================
+# write-behind 큐
+# ==============================
+_STOP = object()
+
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class ChatWriter:
+    def __init__(self, backend, batch_size: int = 20, flush_interval: float = 0.5,
+                 max_queue: int = 1000, max_retries: int = 3):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="chat-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, row: dict):
+        start = time.perf_counter()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # backpressure: 큐가 가득 차면 자리가 날 때까지 호출 스레드가 대기 (유실/순서 역전 없음)
+            metrics.incr("chat_writer.backpressure_waits")
+            self._queue.put(row)
+        metrics.observe("chat_writer.enqueue_wait_ms", (time.perf_counter() - start) * 1000)
+        metrics.gauge("chat_writer.queue_depth", self._queue.qsize())
+
+    def flush(self, timeout: float | None = None) -> bool:
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def close(self, timeout: float = 10.0):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        batch: list[dict] = []
+        deadline = 0.0
+        while True:
+            wait = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None  # 시간 조건 도달
+
+            if item is _STOP:
+                self._write(batch)
+                return
+            if isinstance(item, _FlushRequest):
+                self._write(batch)
+                batch = []
+                item.done.set()
+                continue
+            if item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+
+    def _write(self, rows: list[dict]):
+        if not rows:
+            return
+        # 실패 시 같은 배치를 재시도해 이후 행이 앞지르지 않도록 함
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                self.backend.insert_rows(rows)
+                metrics.observe("chat_writer.flush_ms", (time.perf_counter() - start) * 1000)
+                metrics.observe("chat_writer.batch_rows", len(rows))
+                metrics.incr("chat_writer.written_rows", len(rows))
+                break
+            except Exception as e:
+                logger.warning(f"❗chat_history 저장 실패 ({attempt + 1}회): {e}")
+                if attempt < self.max_retries:
+                    time.sleep(min(2.0, 0.1 * 2 ** attempt))
+        else:
+            metrics.incr("chat_writer.failed_rows", len(rows))
+        metrics.gauge("chat_writer.queue_depth", self._queue.qsize())
+
+
+# ==============================
+# 로컬 durable outbox (SQLite WAL)
+# ==============================
+def is_permanent_error(error: Exception) -> bool:
+    # 다시 보내도 같은 결과인 오류: HTTP 4xx (408 / 429 제외), PostgreSQL 데이터 / 제약 / 스키마 오류, 직렬화 오류
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return 400 <= status < 500 and status not in (408, 429)
+    code = getattr(error, "code", None)  # postgrest APIError: SQLSTATE
+    if isinstance(code, str) and code[:2] in ("22", "23", "42"):
+        return True
+    return isinstance(error, (ValueError, TypeError, KeyError))
+
+
+class ChatOutbox:
+    def __init__(self, path: str, backend, batch_size: int = 20, flush_interval: float = 0.5,
+                 base_backoff: float = 0.5, max_backoff: float = 60.0, synchronous: str = "FULL",
+                 max_attempts: int = 20):
+        # max_attempts: 일시 오류로 이만큼 실패한 행은 dead letter 로 (0 이면 무제한)
+        self.backend = backend
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.last_error: str | None = None
+        self._failures = 0
+        self._sent: deque = deque()  # (시각, 행 수) - 최근 60초 drain rate 계산용
+        self._sent_lock = threading.Lock()
+
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={synchronous}")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL,
+                turn_index INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                UNIQUE (conversation_id, turn_index)
+            )
+        """)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(outbox)")]
+        if "attempts" not in columns:
+            self._db.execute("ALTER TABLE outbox ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS outbox_dead (
+                id INTEGER PRIMARY KEY,
+                conversation_id TEXT NOT NULL,
+                turn_index INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL,
+                error TEXT,
+                failed_at REAL NOT NULL
+            )
+        """)
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="chat-outbox", daemon=True)
+        self._thread.start()
+
+    # --- 사용자 경로: 로컬 커밋만 대기 ---
+    def enqueue(self, row: dict):
+        start = time.perf_counter()
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO outbox (conversation_id, turn_index, payload, created_at) VALUES (?, ?, ?, ?)",
+                (row["conversation_id"], row["turn_index"], json.dumps(row, ensure_ascii=False), time.time()),
+            )
+        metrics.observe("outbox.enqueue_ms", (time.perf_counter() - start) * 1000)
+        self._wake.set()
+
+    def backlog(self) -> int:
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def dead_letters(self) -> int:
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox_dead").fetchone()[0]
+
+    def requeue_dead_letters(self) -> int:
+        # 원인을 고친 뒤 dead letter 행을 outbox 로 되돌려 다시 전송 (upsert 이므로 순서와 무관)
+        with self._db_lock:
+            self._db.execute("BEGIN")
+            moved = self._db.execute("""
+                INSERT OR IGNORE INTO outbox (conversation_id, turn_index, payload, created_at)
+                SELECT conversation_id, turn_index, payload, created_at FROM outbox_dead ORDER BY id
+            """).rowcount
+            self._db.execute("DELETE FROM outbox_dead")
+            self._db.execute("COMMIT")
+        metrics.gauge("outbox.dead_letters", 0)
+        self._wake.set()
+        return moved
+
+    def drain_rate(self, window: float = 60.0) -> float:
+        now = time.monotonic()
+        with self._sent_lock:
+            while self._sent and now - self._sent[0][0] > window:
+                self._sent.popleft()
+            return sum(n for _, n in self._sent) / window
+
+    def stats(self) -> dict:
+        return {
+            "backlog": self.backlog(),
+            "drain_rate_per_s": self.drain_rate(),
+            "consecutive_failures": self._failures,
+            "dead_letters": self.dead_letters(),
+            "last_error": self.last_error,
+        }
+
+    def flush(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._wake.set()
+        while self.backlog():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        # 남은 행은 한 번 더 전송 시도 후, 실패해도 다음 기동 때 재전송됨
+        self.flush(timeout)
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        with self._db_lock:
+            self._db.close()
+
+    # --- 재전송 스레드 ---
+    def _peek(self) -> list[tuple]:
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT id, payload, created_at FROM outbox ORDER BY id LIMIT ?", (self.batch_size,)
+            ).fetchall()
+
+    def _delete(self, ids: list[int]):
+        with self._db_lock:
+            self._db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def _record_failure(self, ids: list[int], error: Exception):
+        # 일시 오류: 시도 횟수를 늘리고, max_attempts 에 도달한 행은 dead letter 로
+        with self._db_lock:
+            self._db.executemany("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", [(i,) for i in ids])
+        if self.max_attempts:
+            with self._db_lock:
+                exhausted = [row[0] for row in self._db.execute(
+                    f"SELECT id FROM outbox WHERE attempts >= ? AND id IN ({','.join('?' * len(ids))})",
+                    (self.max_attempts, *ids),
+                )]
+            if exhausted:
+                self._dead_letter(exhausted, error)
+
+    def _dead_letter(self, ids: list[int], error: Exception):
+        marks = ",".join("?" * len(ids))
+        with self._db_lock:
+            self._db.execute("BEGIN")
+            self._db.execute(f"""
+                INSERT OR REPLACE INTO outbox_dead
+                    (id, conversation_id, turn_index, payload, created_at, attempts, error, failed_at)
+                SELECT id, conversation_id, turn_index, payload, created_at, attempts, ?, ?
+                FROM outbox WHERE id IN ({marks})
+            """, (repr(error), time.time(), *ids))
+            self._db.execute(f"DELETE FROM outbox WHERE id IN ({marks})", ids)
+            self._db.execute("COMMIT")
+            dead = self._db.execute("SELECT COUNT(*) FROM outbox_dead").fetchone()[0]
+        logger.error(f"❗chat_history {len(ids)}행을 dead letter 로 이동: {error!r}")
+        metrics.incr("outbox.dead_letter_rows", len(ids))
+        metrics.gauge("outbox.dead_letters", dead)
+
+    def _send(self, rows: list[tuple]) -> list[int]:
+        # 보낸 행 id 목록. 배치가 영구 오류로 거부되면 한 행씩 보내 거부된 행만 dead letter 로
+        # (일시 오류는 그대로 올려 배치 전체를 백오프 후 재시도)
+        try:
+            self.backend.upsert_rows([json.loads(payload) for _, payload, _ in rows])
+            return [row_id for row_id, _, _ in rows]
+        except Exception as e:
+            if not is_permanent_error(e):
+                raise
+            if len(rows) == 1:
+                self._dead_letter([rows[0][0]], e)
+                return []
+        sent = []
+        for row in rows:
+            sent += self._send([row])
+        return sent
+
+    def _run(self):
+        while not self._stop.is_set():
+            rows = self._peek()
+            if not rows:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                continue
+
+            # 배치가 덜 찼으면 가장 오래된 행이 flush_interval 에 도달할 때까지 대기
+            age = time.time() - rows[0][2]
+            if len(rows) < self.batch_size and age < self.flush_interval:
+                self._stop.wait(self.flush_interval - age)
+                continue
+
+            start = time.perf_counter()
+            try:
+                sent = self._send(rows)
+            except Exception as e:
+                self._failures += 1
+                self.last_error = str(e)
+                self._record_failure([row_id for row_id, _, _ in rows], e)
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (self._failures - 1))
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(f"❗chat_history 재전송 실패 ({self._failures}회), {delay:.1f}초 후 재시도: {e}")
+                metrics.incr("outbox.failed_attempts")
+                metrics.gauge("outbox.backlog", self.backlog())  # 장애 중에도 적체량 갱신
+                self._stop.wait(delay)
+                continue
+
+            self._delete(sent)
+            self._failures = 0
+            self.last_error = None
+            with self._sent_lock:
+                self._sent.append((time.monotonic(), len(sent)))
+            metrics.observe("outbox.send_ms", (time.perf_counter() - start) * 1000)
+            metrics.incr("outbox.sent_rows", len(sent))
+            metrics.gauge("outbox.backlog", self.backlog())
+            metrics.gauge("outbox.drain_rate_per_s", self.drain_rate())
@@ -0,0 +1,183 @@
+# ==========================
+# 🔧 환경 설정
+# ==========================
+# 모든 경로는 저장소 루트 기준입니다 (streamlit run demo/stdemo7.py)
+import os
+import json
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_KEY = os.getenv("MY_API_KEY")
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# 모델
+CHAT_MODEL = os.getenv("CHAT_MODEL", "gpt-4.1-mini")
+ANALYSIS_MODEL = os.getenv("ANALYSIS_MODEL", "gpt-4.1-nano")
+
+# 백엔드: "openai" | 오프라인 대체 구현 (EMBEDDING_BACKEND="hashing", CHAT_BACKEND="fake")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+CHAT_BACKEND = os.getenv("CHAT_BACKEND", "openai")
+HASHING_EMBEDDING_DIM = int(os.getenv("HASHING_EMBEDDING_DIM", "256"))
+# 가짜 채팅 응답 지연 (초): 첫 토큰 / 스트리밍 청크 간
+FAKE_CHAT_TTFT = float(os.getenv("FAKE_CHAT_TTFT", "0"))
+FAKE_CHAT_TOKEN_DELAY = float(os.getenv("FAKE_CHAT_TOKEN_DELAY", "0"))
+REQUIRES_API_KEY = "openai" in (EMBEDDING_BACKEND, CHAT_BACKEND)
+
+# 데이터 / 인덱스 경로
+# (오프라인 임베딩은 저장된 OpenAI 인덱스를 덮어쓰지 않도록 별도 디렉터리 사용)
+_INDEX_SUFFIX = "" if EMBEDDING_BACKEND == "openai" else f"_{EMBEDDING_BACKEND}"
+PROMPT_DIR = "prompts"
+PDF_PATH = "RAG/Rag_Galaxy25_Ultra.pdf"
+PDF_INDEX_DIR = os.getenv("PDF_INDEX_DIR", "faiss_index" + _INDEX_SUFFIX)
+# 설정하면 PDF_PATH 대신 디렉터리의 PDF 전체를 Agent1 인덱스로 사용 (pdf_ingest.py, 바뀐 파일만 반영)
+PDF_DIR = os.getenv("PDF_DIR", "")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0"))  # 0: CPU 수
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "128"))
+INGEST_EMBED_CONCURRENCY = int(os.getenv("INGEST_EMBED_CONCURRENCY", "4"))
+# 인제스트 중간 저장 간격(청크 수, 0 이면 끝날 때만): 중단 후 이어서 처리 + docstore 본문을 디스크로 내림
+INGEST_CHECKPOINT_CHUNKS = int(os.getenv("INGEST_CHECKPOINT_CHUNKS", "20000"))
+# 제품군별 샤드 (product_shards.py): 켜면 Agent1 은 단일 인덱스 대신 질문에 맞는 샤드 1~3 개만 검색
+# PRODUCT_CORPUS_DIR 를 설정하면 시작 시 하위 디렉터리(제품군)별로 바뀐 파일만 반영
+PRODUCT_SHARDS_ENABLED = os.getenv("PRODUCT_SHARDS_ENABLED", "0") == "1"
+PRODUCT_CORPUS_DIR = os.getenv("PRODUCT_CORPUS_DIR", "")
+PRODUCT_SHARD_DIR = os.getenv("PRODUCT_SHARD_DIR", "product_shards" + _INDEX_SUFFIX)
+PRODUCT_SHARD_MAX_ROUTED = int(os.getenv("PRODUCT_SHARD_MAX_ROUTED", "3"))
+# 별칭이 없는 질문: 중심 벡터 유사도가 1등과 이 값 이내인 샤드까지 함께 검색
+PRODUCT_SHARD_ROUTE_MARGIN = float(os.getenv("PRODUCT_SHARD_ROUTE_MARGIN", "0.05"))
+# 동시에 로드해 둘 샤드 파일 크기 합 상한 (넘으면 오래 안 쓴 샤드부터 언로드, 0: 제한 없음)
+PRODUCT_SHARD_MEMORY_MB = float(os.getenv("PRODUCT_SHARD_MEMORY_MB", "1024"))
+COURSE_DATA_PATH = "RAG/sales_learning_dummy_data.json"
+COURSE_INDEX_DIR = os.getenv("COURSE_INDEX_DIR", "course_faiss_index" + _INDEX_SUFFIX)
+# 인덱스 저장 형식: "mmap" (pickle 없이 mmap 으로 열어 프로세스 간 페이지 공유) | "pickle" (save_local)
+INDEX_STORAGE = os.getenv("INDEX_STORAGE", "mmap")
+# 본문이 같은 청크를 인덱스에 한 번만 저장 (바꾸면 해당 인덱스 전체 재빌드)
+PDF_INDEX_DEDUP = os.getenv("PDF_INDEX_DEDUP", "0") == "1"
+COURSE_INDEX_DEDUP = os.getenv("COURSE_INDEX_DEDUP", "0") == "1"
+# 강의 인덱스 타입: flat | ivf_flat | ivf_pq | hnsw | sq_fp16 | sq_int8 (vector_index.py 참고)
+# 예: COURSE_INDEX_PARAMS='{"nlist": 4096, "nprobe": 32}' (빌드 파라미터가 바뀌면 전체 재빌드)
+COURSE_INDEX_TYPE = os.getenv("COURSE_INDEX_TYPE", "flat")
+COURSE_INDEX_PARAMS = json.loads(os.getenv("COURSE_INDEX_PARAMS", "{}"))
+
+# 영속 임베딩 저장소 (hash(model, text) -> 벡터)
+EMBEDDING_STORE_ENABLED = os.getenv("EMBEDDING_STORE_ENABLED", "1") == "1"
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "embedding_store")
+
+# HTTP 커넥션 풀 (OpenAI 클라이언트와 임베딩이 공유)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# 채팅 호출 안정화 (llm_client.py): 호출당 마감 시간, 재시도, 헤징, 서킷 브레이커
+# (OpenAI SDK 자체 재시도는 끄고 이 계층이 담당)
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "30"))
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "4"))
+# 시도가 최근 지연 LLM_HEDGE_QUANTILE 분위(스트리밍은 첫 토큰까지) 안에 안 끝나면 같은 요청을 한 번 더 보냄
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "1") == "1"
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "95"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "2"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.2"))
+# 재시도까지 실패한 호출이 연속 N 번이면 쿨다운 동안 즉시 실패 (축약 답변으로 대체)
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+# 프로세스 단위 요청 스케줄러 (scheduler.py): 분당 요청 / 토큰 한도, 동시 요청 상한 (0 이면 제한 없음)
+# OpenAI 계정 한도보다 조금 낮게 두면 몰릴 때도 429 대신 로컬 대기열에서 순서대로 보냄
+# 백엔드가 openai 인 호출에만 적용 (오프라인 fake / hashing 백엔드에는 한도가 없으므로 걸지 않음)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+LLM_RPM = float(os.getenv("LLM_RPM", "450"))
+LLM_TPM = float(os.getenv("LLM_TPM", "180000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+EMBEDDING_RPM = float(os.getenv("EMBEDDING_RPM", "2700"))
+EMBEDDING_TPM = float(os.getenv("EMBEDDING_TPM", "900000"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "8"))
+# 버킷 크기(순간 허용량)는 SCHEDULER_BURST_SECONDS 초 분량 (OpenAI 는 분 한도를 더 짧은 구간으로 나눠 적용)
+# 1초 분량(TPM 180k 기준 3k 토큰)이면 한 사용자의 연속 질문도 로컬 버킷에 막히므로 10초 분량
+SCHEDULER_BURST_SECONDS = float(os.getenv("SCHEDULER_BURST_SECONDS", "10"))
+# max_tokens 가 없는 채팅 요청의 응답 토큰 추정치 (TPM 계산용)
+SCHEDULER_COMPLETION_TOKENS = int(os.getenv("SCHEDULER_COMPLETION_TOKENS", "500"))
+# 임베딩 요청의 최대 대기 시간(초, 0 이면 무제한). 채팅은 LLM_DEADLINE 안에서 대기
+EMBEDDING_QUEUE_TIMEOUT = float(os.getenv("EMBEDDING_QUEUE_TIMEOUT", "0"))
+
+# Agent1 검색 질의 정규화 여부
+AGENT1_NORMALIZE_QUERY = os.getenv("AGENT1_NORMALIZE_QUERY", "1") == "1"
+
+# 하이브리드 검색: 벡터 Top HYBRID_FETCH_K + 키워드(BM25) Top HYBRID_FETCH_K 를 RRF 로 합침
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "1") == "1"
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+# Agent1 프롬프트 컨텍스트: 후보 AGENT1_MAX_K 개 중 코사인 유사도 AGENT1_MIN_SCORE 이상인 청크를
+# 점수순으로 AGENT1_CONTEXT_TOKENS (tiktoken) 안에서 채움. AGENT1_TOP_K 는 절감 토큰 비교용 기존 고정 k
+# 컷오프 기본값은 임베딩 모델의 유사도 분포에 맞춤: ada-002 는 무관한 문서끼리도 0.8 안팎이라 0.8,
+# hashing 은 관련 질의 0.2 / 무관 질의 0.1 안팎이라 0.12 (0.15 부터는 Agent1 정답 포함률이 떨어짐,
+# bench_context_budget.py 의 정답 포함률 / 무관 질의 검증)
+_DEFAULT_MIN_SCORE = "0.8" if EMBEDDING_BACKEND == "openai" else "0.12"
+AGENT1_TOP_K = int(os.getenv("AGENT1_TOP_K", "4"))
+AGENT1_MAX_K = int(os.getenv("AGENT1_MAX_K", "8"))
+AGENT1_MIN_SCORE = float(os.getenv("AGENT1_MIN_SCORE", _DEFAULT_MIN_SCORE))
+AGENT1_CONTEXT_TOKENS = int(os.getenv("AGENT1_CONTEXT_TOKENS", "1500"))
+# 컷오프 / 예산과 관계없이 항상 넣을 최상위 문서 수 (Agent1 / Agent2 공통)
+CONTEXT_MIN_DOCS = int(os.getenv("CONTEXT_MIN_DOCS", "1"))
+
+# Agent1 의미 기반 응답 캐시 (faiss_index 재생성 시 자동 무효화)
+AGENT1_CACHE_ENABLED = os.getenv("AGENT1_CACHE_ENABLED", "1") == "1"
+AGENT1_CACHE_THRESHOLD = float(os.getenv("AGENT1_CACHE_THRESHOLD", "0.95"))
+AGENT1_CACHE_MAX_ENTRIES = int(os.getenv("AGENT1_CACHE_MAX_ENTRIES", "512"))
+AGENT1_CACHE_TTL = float(os.getenv("AGENT1_CACHE_TTL", "86400"))
+# 인덱스 디렉터리 지문(파일 stat) 확인 주기(초): 인덱스가 바뀐 뒤 이 시간 안에 캐시 무효화
+AGENT1_CACHE_FINGERPRINT_INTERVAL = float(os.getenv("AGENT1_CACHE_FINGERPRINT_INTERVAL", "5"))
+
+# Agent2 강의 검색: 대화에서 추출한 조건(카테고리/난이도/길이/평점/업데이트일)으로 사전 필터
+AGENT2_METADATA_FILTER = os.getenv("AGENT2_METADATA_FILTER", "1") == "1"
+AGENT2_TOP_K = int(os.getenv("AGENT2_TOP_K", "5"))
+# Agent2 컨텍스트 선택 (Agent1 과 같은 방식, AGENT2_TOP_K 는 절감 토큰 비교 기준)
+AGENT2_MAX_K = int(os.getenv("AGENT2_MAX_K", "8"))
+AGENT2_MIN_SCORE = float(os.getenv("AGENT2_MIN_SCORE", _DEFAULT_MIN_SCORE))
+AGENT2_CONTEXT_TOKENS = int(os.getenv("AGENT2_CONTEXT_TOKENS", "1200"))
+# Agent2 대화 메모리: 최근 MEMORY_RECENT_TURNS 턴은 원문, 이전 턴은 누적 요약 (conversation_memory.py)
+# 대화 기록 부분은 MEMORY_MAX_TOKENS 를 넘지 않음
+MEMORY_RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "4"))
+MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "1500"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "400"))
+MEMORY_TURN_TOKENS = int(os.getenv("MEMORY_TURN_TOKENS", "400"))
+MEMORY_SUMMARY_MODEL = os.getenv("MEMORY_SUMMARY_MODEL", ANALYSIS_MODEL)
+# 밀려난 턴 요약을 실행할 백그라운드 스레드 수 (세션마다 요약은 한 번에 하나)
+MEMORY_SUMMARY_WORKERS = int(os.getenv("MEMORY_SUMMARY_WORKERS", "2"))
+# Agent2 재정렬: 후보를 넉넉히 가져와 유사도 + 품질/최신성 신호 가중합으로 상위 AGENT2_MAX_K 선택
+AGENT2_RERANK_ENABLED = os.getenv("AGENT2_RERANK_ENABLED", "1") == "1"
+AGENT2_RERANK_CANDIDATES = int(os.getenv("AGENT2_RERANK_CANDIDATES", "30"))
+# 예: AGENT2_RERANK_WEIGHTS='{"similarity": 0.5, "user_rating": 0.2}' (생략한 항목은 기본값)
+AGENT2_RERANK_WEIGHTS = json.loads(os.getenv("AGENT2_RERANK_WEIGHTS", "{}"))
+AGENT2_FRESHNESS_HALF_LIFE_DAYS = float(os.getenv("AGENT2_FRESHNESS_HALF_LIFE_DAYS", "180"))
+# Agent2 다양성: 같은 제목은 최고 점수 강의 하나만 + MMR (AGENT2_MMR_LAMBDA="" 이면 MMR 끔)
+AGENT2_COLLAPSE_TITLES = os.getenv("AGENT2_COLLAPSE_TITLES", "1") == "1"
+AGENT2_MMR_LAMBDA = float(os.getenv("AGENT2_MMR_LAMBDA", "0.5")) if os.getenv("AGENT2_MMR_LAMBDA", "0.5") else None
+
+# 추측 실행: 라우팅과 동시에 제품 / 강의 검색을 모두 시작하고 선택된 쪽만 사용 (반대쪽 검색 비용은 버림)
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "0") == "1"
+SPECULATIVE_WORKERS = int(os.getenv("SPECULATIVE_WORKERS", "8"))
+# 라우팅 + Agent2 답변 한 번에: 로컬 분류가 확정되지 않는 질문은 강의 컨텍스트와 product_lookup 도구를 주고
+# 한 번만 호출해 바로 답하거나(agent2) 도구 호출로 Agent1 로 넘김 (라우팅 LLM 왕복 생략)
+FUSED_ROUTING = os.getenv("FUSED_ROUTING", "0") == "1"
+# 의도 분류 라우터: "llm" | "local" | "hybrid"
+ROUTER_MODE = os.getenv("ROUTER_MODE", "hybrid")
+# hybrid 모드에서 두 centroid 유사도 차이가 이 값보다 작으면 LLM 으로 재분류
+ROUTER_MARGIN_THRESHOLD = float(os.getenv("ROUTER_MARGIN_THRESHOLD", "0.03"))
+ROUTING_EXAMPLES_PATH = os.path.join(PROMPT_DIR, "routing_examples.json")
+
+# chat_history 비동기 저장: "supabase" | "memory" (로컬 대체 백엔드)
+CHAT_STORE_BACKEND = os.getenv("CHAT_STORE_BACKEND", "supabase")
+CHAT_WRITER_BATCH_SIZE = int(os.getenv("CHAT_WRITER_BATCH_SIZE", "20"))
+CHAT_WRITER_FLUSH_INTERVAL = float(os.getenv("CHAT_WRITER_FLUSH_INTERVAL", "0.5"))
+CHAT_WRITER_MAX_QUEUE = int(os.getenv("CHAT_WRITER_MAX_QUEUE", "1000"))
+# chat_history 저장 방식: "outbox" (로컬 SQLite 선기록 후 재전송) | "queue" (메모리 write-behind)
+CHAT_STORE_MODE = os.getenv("CHAT_STORE_MODE", "outbox")
+CHAT_OUTBOX_PATH = os.getenv("CHAT_OUTBOX_PATH", "chat_outbox.sqlite3")
+CHAT_OUTBOX_MAX_BACKOFF = float(os.getenv("CHAT_OUTBOX_MAX_BACKOFF", "60"))
+# 일시 오류로 이만큼 실패한 행은 outbox_dead 로 옮김 (0 이면 무제한, 영구 오류 행은 바로 옮김)
+CHAT_OUTBOX_MAX_ATTEMPTS = int(os.getenv("CHAT_OUTBOX_MAX_ATTEMPTS", "20"))
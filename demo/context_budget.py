@@ -0,0 +1,56 @@
+# ==============================
+# ✂️ 검색 컨텍스트 선택 (관련도 컷오프 + 프롬프트 토큰 예산)
+# ==============================
+# 고정 k 개를 그대로 프롬프트에 넣는 대신 (문서, 코사인 유사도) 후보를 검색 파이프라인의 순위대로 보면서
+#   1. 유사도가 min_score 미만인 문서는 버림
+#   2. 본문 토큰 합이 max_tokens 를 넘게 만드는 문서는 건너뜀 (뒤의 짧은 문서는 더 들어갈 수 있음)
+#   3. 단, 앞쪽 min_docs 개는 조건과 관계없이 유지 (빈 컨텍스트 방지)
+# 순위(RRF / 재정렬 / MMR 결과)는 그대로 두고 코사인 유사도는 컷오프에만 씁니다.
+# 토큰 수는 token_count (tiktoken) 기준입니다. 고정 k(baseline_k) 였다면 보냈을 토큰과 비교한 절감량을
+# {name}.context_tokens_saved 지표로 남깁니다.
+from typing import NamedTuple
+
+from metrics import metrics
+from token_count import count_tokens
+
+
+class ContextSelection(NamedTuple):
+    docs: list
+    scores: list[float]
+    tokens: int           # 선택한 문서 본문 토큰 수
+    baseline_tokens: int  # 상위 baseline_k 개를 그대로 넣었을 때 토큰 수
+    below_score: int      # 관련도 컷오프로 뺀 후보 수
+    over_budget: int      # 토큰 예산으로 뺀 후보 수
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.baseline_tokens - self.tokens
+
+
+def select_context(scored_docs: list[tuple], max_tokens: int, min_score: float = 0.0, min_docs: int = 1,
+                   baseline_k: int | None = None, name: str | None = None) -> ContextSelection:
+    # scored_docs: [(Document, 유사도)] 검색 순위 순 -> 순위대로 선택, 결과도 순위 순
+    tokens = [count_tokens(doc.page_content) for doc, _ in scored_docs]
+    docs, scores, used, below_score, over_budget = [], [], 0, 0, 0
+    for (doc, score), size in zip(scored_docs, tokens):
+        if len(docs) >= min_docs:
+            if score < min_score:
+                below_score += 1
+                continue
+            if used + size > max_tokens:
+                over_budget += 1
+                continue
+        docs.append(doc)
+        scores.append(score)
+        used += size
+
+    baseline_k = len(scored_docs) if baseline_k is None else baseline_k
+    baseline = sum(tokens[:baseline_k])
+    selection = ContextSelection(docs, scores, used, baseline, below_score, over_budget)
+    if name:
+        metrics.observe(f"{name}.context_tokens", selection.tokens)
+        metrics.observe(f"{name}.context_tokens_saved", selection.saved_tokens)
+        metrics.observe(f"{name}.context_docs", len(docs))
+        metrics.incr(f"{name}.context_below_score", below_score)
+        metrics.incr(f"{name}.context_over_budget", over_budget)
+    return selection
@@ -0,0 +1,160 @@
+# ==============================
+# 🧠 Agent2 대화 메모리 (최근 턴 원문 + 이전 턴 누적 요약, 토큰 상한)
+# ==============================
+# 매 턴 전체 대화를 이어 붙이는 대신
+# - 최근 recent_turns 개 턴은 원문 그대로 유지
+# - 그보다 오래된 턴은 요약 하나로 접음: 턴이 밀려날 때 (기존 요약 + 새로 밀려난 턴) 만 요약하므로
+#   대화가 길어져도 요약 호출 입력 크기가 일정
+# - 화면용 HTML(<br>, 말풍선 태그)이 아닌 정리된 텍스트만 저장
+# - 요약(LLM 호출)은 executor 에서 백그라운드로 실행: add_turn 은 기다리지 않고, 요약이 끝날 때까지
+#   밀려날 턴은 원문으로 남아 있다가 요약이 반영될 때 함께 빠짐 (한 번에 하나의 요약만 진행)
+# - render() 결과(요약 + 최근 턴 + 현재 질문)는 max_tokens 를 넘지 않음
+#   render() 는 상태를 바꾸지 않음: 넘치면 가장 오래된 원문 턴부터 빼고, 그래도 넘으면 요약 / 현재 질문을 자름
+import re
+import html
+import time
+import logging
+import threading
+import contextvars
+
+from metrics import metrics
+from token_count import count_tokens, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+_BR = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]+>")
+SUMMARY_HEADER = "[이전 대화 요약]\n"
+
+
+def clean_text(text: str) -> str:
+    text = html.unescape(_TAG.sub("", _BR.sub("\n", text)))
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def format_turns(turns: list[tuple[str, str]]) -> str:
+    return "".join(f"사용자: {user}\n챗봇: {bot}\n" for user, bot in turns)
+
+
+def summarize_with_llm(client, prompt_template, model: str, max_tokens: int,
+                       summary: str, turns: list[tuple[str, str]]) -> str:
+    res = client.chat.completions.create(model=model, messages=[
+        {"role": "system", "content": "대화 요약 도우미"},
+        {"role": "user", "content": prompt_template.format(
+            summary=summary or "(없음)", turns=format_turns(turns), max_tokens=max_tokens,
+        )},
+    ])
+    return res.choices[0].message.content.strip()
+
+
+class ConversationMemory:
+    def __init__(self, summarize=None, recent_turns: int = 4, max_tokens: int = 1500,
+                 summary_tokens: int = 400, turn_tokens: int = 400, executor=None):
+        # summarize(기존 요약, [(사용자, 챗봇)]) -> 새 요약 (None 이면 밀려난 턴은 버리고 최근 턴만 유지)
+        # turn_tokens: 원문으로 남기는 턴 하나(질문 / 답변 각각)의 토큰 상한
+        # executor: 요약을 실행할 스레드 풀 (None 이면 add_turn 안에서 동기 실행)
+        self.summarize = summarize
+        self.recent_turns = recent_turns
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.turn_tokens = turn_tokens
+        self.executor = executor
+        self.summary = ""
+        self.turns: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._folding = None  # 진행 중인 요약 Future
+        self._query_tokens = 0  # 다음 질문 자리 추정치 (직전 사용자 메시지 길이)
+
+    @classmethod
+    def from_history(cls, chat_history: list[dict], **kwargs) -> "ConversationMemory":
+        # 세션 상태의 chat_history ({"user", "bot"}) 로 복원
+        memory = cls(**kwargs)
+        for turn in chat_history:
+            memory.add_turn(turn["user"], turn["bot"])
+        return memory
+
+    def _clip(self, text: str) -> str:
+        return truncate_tokens(clean_text(text), self.turn_tokens)
+
+    def add_turn(self, user: str, bot: str):
+        with self._lock:
+            self.turns.append((self._clip(user), self._clip(bot)))
+            self._query_tokens = count_tokens(f"사용자: {self.turns[-1][0]}\n")
+            evicted = self._evict()
+        if evicted:
+            self._fold(evicted)
+
+    def wait(self, timeout: float | None = None):
+        # 진행 중인 요약이 (이어서 예약된 것까지) 끝날 때까지 대기 - 벤치마크 / 종료용
+        while (future := self._folding) is not None:
+            future.result(timeout)
+
+    def _excess(self) -> int:
+        # 접어야 할 가장 오래된 턴 수: recent_turns 초과분 + 다음 질문 자리를 남기고 max_tokens 를 넘치는 만큼
+        count = max(len(self.turns) - self.recent_turns, 0)
+        summary = count_tokens(f"{SUMMARY_HEADER}{self.summary}\n\n") if self.summary else 0
+        while count < len(self.turns) and \
+                summary + count_tokens(format_turns(self.turns[count:])) + self._query_tokens > self.max_tokens:
+            count += 1
+        return count
+
+    def _evict(self) -> list[tuple[str, str]]:
+        # self._lock 안에서 호출. 동기 모드면 접을 턴을 반환, 백그라운드 모드면 요약을 예약하고 [] 반환
+        if self._folding is not None:
+            return []  # 진행 중인 요약이 끝나면 이어서 접음
+        count = self._excess()
+        if not count:
+            return []
+        if self.summarize is None:
+            del self.turns[:count]
+            metrics.incr("memory.folded_turns", count)
+            return []
+        evicted = self.turns[:count]
+        if self.executor is None:
+            return evicted
+        self._folding = self.executor.submit(contextvars.copy_context().run, self._fold, evicted)
+        return []
+
+    def _fold(self, evicted: list[tuple[str, str]]):
+        # 한 번에 하나만 실행되므로 요약 / 턴 앞부분은 그동안 바뀌지 않음 (add_turn 은 뒤에 붙이기만 함)
+        start = time.perf_counter()
+        try:
+            summary = self.summarize(self.summary, evicted)
+        except Exception as e:
+            # 요약 실패 시 밀려난 턴 원문을 이어 붙이고 상한에서 자름 (다음 접기에서 다시 요약됨)
+            logger.warning(f"❗대화 요약 실패, 원문으로 대체: {e}")
+            summary = f"{self.summary}\n{format_turns(evicted)}".strip()
+        metrics.observe("memory.summarize_ms", (time.perf_counter() - start) * 1000)
+        metrics.incr("memory.folded_turns", len(evicted))
+        with self._lock:
+            self.summary = truncate_tokens(summary, self.summary_tokens, keep="end")
+            del self.turns[:len(evicted)]
+            self._folding = None
+            evicted = self._evict()  # 요약하는 동안 더 쌓인 턴
+        if evicted:
+            self._fold(evicted)
+
+    def render(self, user_query: str) -> str:
+        # 프롬프트의 {full_history} 자리에 넣을 텍스트 (현재 질문 포함), 메모리 상태는 바꾸지 않음
+        current = f"사용자: {self._clip(user_query)}\n"
+        with self._lock:
+            summary_text, turns = self.summary, list(self.turns)
+        summary = f"{SUMMARY_HEADER}{summary_text}\n\n" if summary_text else ""
+        while True:
+            text = summary + format_turns(turns) + current
+            tokens = count_tokens(text)
+            if tokens <= self.max_tokens or not turns:
+                break
+            turns = turns[1:]  # 요약이 아직 반영되지 않은 오래된 턴은 이번 프롬프트에서만 뺌
+            metrics.incr("memory.render_dropped_turns")
+
+        if tokens > self.max_tokens:
+            # 원문 턴을 모두 뺐는데도 넘침: 요약 앞부분을 자르고, 그래도 안 되면 현재 질문만
+            room = self.max_tokens - count_tokens(current) - count_tokens(SUMMARY_HEADER) - 1
+            summary = truncate_tokens(summary_text, room, keep="end") if room > 0 else ""
+            text = (f"{SUMMARY_HEADER}{summary}\n\n" if summary else "") + current
+            if count_tokens(text) > self.max_tokens:
+                text = truncate_tokens(current, self.max_tokens)
+            tokens = count_tokens(text)
+        metrics.observe("memory.history_tokens", tokens)
+        return text
@@ -0,0 +1,250 @@
+# ==============================
+# 📚 컬럼형 강의 카탈로그
+# ==============================
+# sales_learning_dummy_data.json 의 강의 목록을 컬럼 단위 NumPy 배열로 보관합니다.
+# - 수치 컬럼: int / float 배열, update_date: datetime64[D]
+# - category / difficulty / title: 사전 인코딩(코드 배열 + 값 목록)
+# - mask / take / sort / top_k 는 모두 벡터 연산
+# - catalog[i] 는 dict 처럼 쓸 수 있는 행 뷰(CourseRow)를 반환
+import json
+import hashlib
+from collections.abc import Mapping
+
+import numpy as np
+
+# 필드 순서는 원본 JSON 과 동일하게 유지 (문서 텍스트가 바뀌지 않도록)
+SCHEMA = {
+    "id": "int",
+    "title": "category",
+    "category": "category",
+    "duration_min": "int",
+    "difficulty": "category",
+    "completion_rate": "float",
+    "review_rate": "float",
+    "average_quiz_score": "float",
+    "user_rating": "float",
+    "num_of_learners": "int",
+    "recent_popularity": "float",
+    "update_date": "date",
+    "completion_time_ratio": "float",
+}
+
+# 순서가 의미 있는 범주는 코드 순서를 고정 (난이도 범위 필터용)
+ORDERED_CATEGORIES = {
+    "difficulty": ["입문", "초급", "중급", "고급", "전문가"],
+}
+
+_DTYPES = {"int": np.int64, "float": np.float64, "date": "datetime64[D]"}
+
+
+def _encode(values: list, fixed: list | None = None) -> tuple[np.ndarray, list]:
+    categories = list(fixed or [])
+    lookup = {value: code for code, value in enumerate(categories)}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(categories)
+            categories.append(value)
+        codes[i] = code
+    return codes, categories
+
+
+class CourseRow(Mapping):
+    __slots__ = ("_catalog", "_index")
+
+    def __init__(self, catalog: "CourseCatalog", index: int):
+        self._catalog = catalog
+        self._index = index
+
+    def __getitem__(self, field: str):
+        return self._catalog.value(field, self._index)
+
+    def __iter__(self):
+        return iter(self._catalog.fields)
+
+    def __len__(self) -> int:
+        return len(self._catalog.fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class CourseCatalog:
+    def __init__(self, columns: dict[str, np.ndarray], categories: dict[str, list], fields: list[str]):
+        self.columns = columns
+        self.categories = categories
+        self.fields = fields
+        self._category_arrays = {name: np.asarray(values, dtype=object) for name, values in categories.items()}
+
+    # ---------- 생성 ----------
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "CourseCatalog":
+        fields = list(records[0].keys()) if records else list(SCHEMA)
+        columns, categories = {}, {}
+        for field in fields:
+            kind = SCHEMA.get(field, "object")
+            values = [record.get(field) for record in records]
+            if kind == "category":
+                columns[field], categories[field] = _encode(values, ORDERED_CATEGORIES.get(field))
+            elif kind == "object":
+                columns[field] = np.asarray(values, dtype=object)
+            else:
+                columns[field] = np.asarray(values, dtype=_DTYPES[kind])
+        return cls(columns, categories, fields)
+
+    @classmethod
+    def from_json(cls, path: str) -> "CourseCatalog":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_records(json.load(f)["courses"])
+
+    # ---------- 행 뷰 ----------
+    def __len__(self) -> int:
+        return len(self.columns[self.fields[0]]) if self.fields else 0
+
+    def __getitem__(self, index: int) -> CourseRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return CourseRow(self, index)
+
+    def __iter__(self):
+        return (CourseRow(self, i) for i in range(len(self)))
+
+    def value(self, field: str, index: int):
+        column = self.columns[field]
+        if field in self.categories:
+            return self.categories[field][column[index]]
+        kind = SCHEMA.get(field, "object")
+        if kind == "date":
+            return str(column[index])
+        return column[index].item() if kind != "object" else column[index]
+
+    def values(self, field: str) -> np.ndarray:
+        # 범주형은 디코딩된 값 배열, 나머지는 원본 컬럼
+        if field in self.categories:
+            return self._category_arrays[field][self.columns[field]]
+        return self.columns[field]
+
+    def to_records(self) -> list[dict]:
+        return [dict(row) for row in self]
+
+    # ---------- 벡터 연산 ----------
+    def codes(self, field: str, values) -> np.ndarray:
+        lookup = {value: code for code, value in enumerate(self.categories[field])}
+        return np.asarray([lookup[v] for v in values if v in lookup], dtype=np.int32)
+
+    def mask(self, **conditions) -> np.ndarray:
+        # 조건 형식
+        #   category="고객응대" / category=["고객응대", "세일즈 전략"]   : 일치
+        #   duration_min=(None, 15) / update_date=("2025-01-01", None) : 닫힌 구간 [lo, hi]
+        #   difficulty=("초급", "중급")                                 : 순서형 범주 구간
+        result = np.ones(len(self), dtype=bool)
+        for field, condition in conditions.items():
+            if condition is None:
+                continue
+            column = self.columns[field]
+            if isinstance(condition, tuple):
+                lo, hi = condition
+                if field in self.categories:
+                    lo = None if lo is None else self.categories[field].index(lo)
+                    hi = None if hi is None else self.categories[field].index(hi)
+                elif SCHEMA.get(field) == "date":
+                    lo = None if lo is None else np.datetime64(lo, "D")
+                    hi = None if hi is None else np.datetime64(hi, "D")
+                if lo is not None:
+                    result &= column >= lo
+                if hi is not None:
+                    result &= column <= hi
+            else:
+                wanted = condition if isinstance(condition, (list, set, frozenset)) else [condition]
+                if field in self.categories:
+                    # 코드 -> bool 룩업 테이블로 한 번에 gather
+                    table = np.zeros(len(self.categories[field]), dtype=bool)
+                    table[self.codes(field, wanted)] = True
+                    result &= table[column]
+                else:
+                    result &= np.isin(column, list(wanted))
+        return result
+
+    def take(self, indices) -> "CourseCatalog":
+        indices = np.asarray(indices)
+        columns = {field: column[indices] for field, column in self.columns.items()}
+        return CourseCatalog(columns, self.categories, self.fields)
+
+    def sort(self, field: str, descending: bool = False, mask: np.ndarray | None = None) -> np.ndarray:
+        candidates = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        order = np.argsort(self.columns[field][candidates], kind="stable")
+        if descending:
+            order = order[::-1]
+        return candidates[order]
+
+    def top_k(self, scores, k: int, mask: np.ndarray | None = None) -> np.ndarray:
+        # scores: 컬럼 이름 또는 len(self) 길이 점수 배열. 높은 순서로 k 개의 인덱스 반환
+        scores = self.columns[scores] if isinstance(scores, str) else np.asarray(scores)
+        candidates = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        if candidates.size == 0:
+            return candidates
+        selected = scores[candidates]
+        k = min(k, candidates.size)
+        part = np.argpartition(-selected, k - 1)[:k]
+        return candidates[part[np.argsort(-selected[part], kind="stable")]]
+
+    def id_positions(self, ids) -> np.ndarray:
+        # 강의 id -> 카탈로그 내 위치
+        order = np.argsort(self.columns["id"])
+        sorted_ids = self.columns["id"][order]
+        ids = np.asarray(ids, dtype=np.int64)
+        found = np.searchsorted(sorted_ids, ids)
+        found = np.clip(found, 0, len(sorted_ids) - 1)
+        valid = sorted_ids[found] == ids
+        return np.where(valid, order[found], -1)
+
+    def content_hash(self) -> str:
+        digest = hashlib.sha256()
+        for field in self.fields:
+            digest.update(field.encode("utf-8"))
+            column = self.columns[field]
+            if column.dtype == object:
+                digest.update(json.dumps(column.tolist(), ensure_ascii=False, default=str).encode("utf-8"))
+            else:
+                digest.update(np.ascontiguousarray(column).tobytes())
+            if field in self.categories:
+                digest.update(json.dumps(self.categories[field], ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+
+# ==============================
+# 🧪 대규모 합성 카탈로그 (벤치마크용, dummy.py 와 같은 분포)
+# ==============================
+def synthetic_catalog(n: int, seed: int = 42, titles: list | None = None) -> CourseCatalog:
+    rng = np.random.default_rng(seed)
+    titles = titles or [f"강의 {i}" for i in range(max(15, n // 20))]
+    categories = ["제품지식", "세일즈 매너", "세일즈 전략", "고객응대"]
+    today = np.datetime64("2025-07-01", "D")
+    columns = {
+        "id": np.arange(1, n + 1, dtype=np.int64),
+        "title": rng.integers(0, len(titles), n).astype(np.int32),
+        "category": rng.integers(0, len(categories), n).astype(np.int32),
+        "duration_min": rng.integers(5, 31, n).astype(np.int64),
+        "difficulty": rng.integers(0, len(ORDERED_CATEGORIES["difficulty"]), n).astype(np.int32),
+        "completion_rate": np.round(rng.uniform(0, 100, n), 1),
+        "review_rate": np.round(rng.uniform(0, 50, n), 1),
+        "average_quiz_score": np.round(rng.uniform(0, 100, n), 1),
+        "user_rating": np.round(rng.uniform(0.1, 5.0, n), 2),
+        "num_of_learners": rng.integers(0, 3000, n).astype(np.int64),
+        "recent_popularity": np.round(rng.uniform(0, 50, n), 1),
+        "update_date": today - rng.integers(1, 365, n).astype("timedelta64[D]"),
+        "completion_time_ratio": np.round(rng.uniform(50, 300, n), 1),
+    }
+    category_values = {
+        "title": list(titles),
+        "category": categories,
+        "difficulty": list(ORDERED_CATEGORIES["difficulty"]),
+    }
+    return CourseCatalog(columns, category_values, list(SCHEMA))
@@ -0,0 +1,83 @@
+# ==============================
+# 🏅 품질/최신성 신호 기반 강의 재정렬 (Agent2)
+# ==============================
+# 벡터 검색으로 후보를 넉넉히 가져온 뒤, 유사도와 카탈로그 품질 지표를 섞은 점수로 다시 정렬합니다.
+#   score = w_sim * 유사도(후보 내 min-max) + Σ w_i * 신호_i(카탈로그 전체 min-max, 0~1)
+# 신호 행렬은 카탈로그 로드 시 한 번만 계산하고, 재정렬은 후보 행을 모아 행렬-벡터 곱 한 번으로 끝냅니다.
+import numpy as np
+
+# 신호 이름 -> (원본 컬럼, 변환). 변환 결과는 클수록 좋은 값
+SIGNALS = {
+    "user_rating": ("user_rating", None),
+    "completion_rate": ("completion_rate", None),
+    "average_quiz_score": ("average_quiz_score", None),
+    "review_rate": ("review_rate", None),
+    "num_of_learners": ("num_of_learners", np.log1p),            # 수강자 수는 로그 스케일
+    "recent_popularity": ("recent_popularity", None),
+    "completion_time_ratio": ("completion_time_ratio", np.negative),  # 예정 시간 대비 소요가 적을수록 좋음
+    "freshness": ("update_date", None),                          # 반감기 기반 감쇠 (아래 참고)
+}
+
+DEFAULT_WEIGHTS = {
+    "similarity": 0.6,
+    "user_rating": 0.12,
+    "completion_rate": 0.06,
+    "average_quiz_score": 0.03,
+    "review_rate": 0.03,
+    "num_of_learners": 0.05,
+    "recent_popularity": 0.06,
+    "completion_time_ratio": 0.0,
+    "freshness": 0.05,
+}
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.float64)
+    if values.size == 0:
+        return values
+    low, span = values.min(), values.max() - values.min()
+    if span <= 0:
+        return np.ones_like(values)
+    return (values - low) / span
+
+
+class CourseReranker:
+    def __init__(self, catalog, weights: dict | None = None, half_life_days: float = 180.0):
+        unknown = set(weights or {}) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"알 수 없는 재정렬 가중치: {sorted(unknown)}")
+        self.catalog = catalog
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.half_life_days = half_life_days
+        self.signal_names = [name for name in SIGNALS if self.weights[name]]
+        self.signal_weights = np.asarray([self.weights[name] for name in self.signal_names], dtype=np.float64)
+        self.signals = self._signal_matrix()  # (강의 수, 신호 수), 값은 0~1
+
+    def _signal(self, name: str) -> np.ndarray:
+        field, transform = SIGNALS[name]
+        column = self.catalog.columns[field]
+        if name == "freshness":
+            # 카탈로그에서 가장 최근 업데이트일 기준 경과일로 감쇠 (더미 데이터의 날짜에 좌우되지 않도록)
+            age = (column.max() - column).astype("timedelta64[D]").astype(np.float64)
+            return 0.5 ** (age / self.half_life_days)
+        values = column.astype(np.float64)
+        return _min_max(transform(values) if transform else values)
+
+    def _signal_matrix(self) -> np.ndarray:
+        if not self.signal_names or not len(self.catalog):
+            return np.zeros((len(self.catalog), len(self.signal_names)))
+        return np.stack([self._signal(name) for name in self.signal_names], axis=1)
+
+    def scores(self, positions: np.ndarray, similarity: np.ndarray) -> np.ndarray:
+        # positions: 카탈로그 위치, similarity: 같은 길이의 검색 유사도
+        positions = np.asarray(positions, dtype=np.int64)
+        combined = self.weights["similarity"] * _min_max(np.asarray(similarity))
+        if self.signal_names:
+            combined = combined + self.signals[positions] @ self.signal_weights
+        return combined
+
+    def rerank(self, positions: np.ndarray, similarity: np.ndarray, k: int) -> np.ndarray:
+        # 후보 배열 안에서의 순서(인덱스)를 점수 내림차순으로 k 개 반환
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.argsort(-self.scores(positions, similarity), kind="stable")[:k]
@@ -0,0 +1,312 @@
+# ==============================
+# 🎯 메타데이터 사전 필터 강의 검색 (Agent2)
+# ==============================
+# 1. 질문/대화에서 조건(카테고리, 난이도, 길이, 평점, 업데이트일)을 규칙 기반으로 추출
+# 2. CourseCatalog.mask 로 조건을 만족하는 강의 집합을 벡터 연산으로 계산
+# 3. 살아남은 강의의 벡터 안에서만 유사도 검색
+#    - Flat 인덱스 + 후보가 적을 때: 해당 행만 모아 직접 거리 계산 (후보 수에 비례)
+#    - 그 외: faiss IDSelector 로 검색 범위 제한 (IVF / HNSW 는 nprobe / efSearch 유지)
+# 4. (선택) 후보를 넉넉히 가져와 CourseReranker 로 품질/최신성 신호를 섞어 재정렬
+# 5. (선택) 다양성: 제목별 최고 점수 강의 하나만 남기기 + MMR(maximal marginal relevance)
+# (선택) 키워드 인덱스가 있으면 벡터 후보와 BM25 후보를 RRF 로 합친 점수를 관련도로 사용
+import re
+from datetime import date, timedelta
+
+import faiss
+import numpy as np
+
+from course_catalog import ORDERED_CATEGORIES
+from keyword_index import rrf_fuse
+from vector_index import cosine_similarity, search_parameters
+
+DIFFICULTIES = ORDERED_CATEGORIES["difficulty"]
+
+CATEGORY_KEYWORDS = {
+    "제품지식": ["제품지식", "제품 지식"],
+    "세일즈 매너": ["매너"],
+    "세일즈 전략": ["세일즈 전략", "판매 전략", "영업 전략"],
+    "고객응대": ["고객응대", "고객 응대", "응대"],
+}
+
+
+# ==============================
+# 조건 추출
+# ==============================
+def _duration(text: str) -> tuple | None:
+    match = re.search(r"(\d+)\s*분\s*(이하|이내|안쪽|미만|까지|안으로)", text)
+    if match:
+        minutes = int(match.group(1))
+        return (None, minutes - 1 if match.group(2) == "미만" else minutes)
+    match = re.search(r"(\d+)\s*분\s*(이상|넘는|초과)", text)
+    if match:
+        minutes = int(match.group(1))
+        return (minutes + 1 if match.group(2) == "초과" else minutes, None)
+    if re.search(r"짧은|짧게|가볍게", text):
+        return (None, 10)
+    return None
+
+
+def _difficulty(text: str) -> tuple | list | None:
+    found = [level for level in DIFFICULTIES if level in text]
+    range_match = re.search(r"(입문|초급|중급|고급|전문가)\s*(?:~|-|에서)\s*(입문|초급|중급|고급|전문가)", text)
+    if range_match:
+        lo, hi = sorted(range_match.groups(), key=DIFFICULTIES.index)
+        return (lo, hi)
+    if len(found) == 1:
+        level = found[0]
+        if re.search(level + r"\s*(?:이하|까지)", text):
+            return (DIFFICULTIES[0], level)
+        if re.search(level + r"\s*이상", text):
+            return (level, DIFFICULTIES[-1])
+        return [level]
+    if found:
+        return found
+    if "쉬운" in text:
+        return (DIFFICULTIES[0], "초급")
+    return None
+
+
+def _category(text: str) -> list | None:
+    found = [category for category, keywords in CATEGORY_KEYWORDS.items()
+             if any(keyword in text for keyword in keywords)]
+    return found or None
+
+
+def _rating(text: str) -> tuple | None:
+    match = re.search(r"평점\s*(\d(?:\.\d+)?)\s*점?\s*이상", text)
+    if match:
+        return (float(match.group(1)), None)
+    if re.search(r"평점\s*(?:이|가)?\s*높은|평이 좋은|별점 높은", text):
+        return (4.0, None)
+    return None
+
+
+def _update_date(text: str, today: date) -> tuple | None:
+    match = re.search(r"(\d+)\s*개월\s*(?:이내|안에|내)", text)
+    if match:
+        return ((today - timedelta(days=30 * int(match.group(1)))).isoformat(), None)
+    if re.search(r"최근\s*(?:에)?\s*업데이트|최신 강의|최신 내용", text):
+        return ((today - timedelta(days=90)).isoformat(), None)
+    return None
+
+
+def extract_constraints(text: str, today: date | None = None) -> dict:
+    today = today or date.today()
+    extracted = {
+        "category": _category(text),
+        "difficulty": _difficulty(text),
+        "duration_min": _duration(text),
+        "user_rating": _rating(text),
+        "update_date": _update_date(text, today),
+    }
+    return {field: value for field, value in extracted.items() if value is not None}
+
+
+def extract_conversation_constraints(user_messages: list[str], today: date | None = None) -> dict:
+    # 오래된 발화부터 적용하고 최근 발화의 조건이 덮어씀
+    constraints = {}
+    for message in user_messages:
+        constraints.update(extract_constraints(message, today))
+    return constraints
+
+
+# ==============================
+# 사전 필터 검색
+# ==============================
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float = 0.7) -> np.ndarray:
+    # relevance 가 높으면서 이미 고른 항목과 덜 비슷한 항목을 차례로 선택 (선택 순서대로 인덱스 반환)
+    if len(relevance) == 0:
+        return np.empty(0, dtype=np.int64)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    selected = [int(np.argmax(relevance))]
+    max_similarity = vectors @ vectors[selected[0]]
+    while len(selected) < min(k, len(relevance)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        chosen = int(np.argmax(scores))
+        selected.append(chosen)
+        max_similarity = np.maximum(max_similarity, vectors @ vectors[chosen])
+    return np.asarray(selected, dtype=np.int64)
+
+
+_COURSE_ID = re.compile(r"^course:(\d+)")
+_CONTENT_ID = re.compile(r"^id:\s*(\d+)", re.MULTILINE)
+
+
+class CourseSearcher:
+    # 후보 비율이 이 값 이하일 때만 직접 거리 계산 (그 이상은 faiss 스캔이 더 빠름)
+    SUBSET_SCAN_RATIO = 0.1
+
+    def __init__(self, index, catalog, embed_query, documents_for_rows, vector_course_ids: np.ndarray,
+                 reranker=None, rerank_candidates: int = 30, collapse_titles: bool = False,
+                 mmr_lambda: float | None = None, keyword_scores=None, rrf_k: int = 60):
+        # vector_course_ids[i] = faiss i 번째 벡터가 속한 강의 id (-1: 알 수 없음)
+        # mmr_lambda: None 이면 MMR 미사용, 1.0 에 가까울수록 관련도 위주
+        # keyword_scores(query) -> faiss 행 순서의 BM25 점수 배열 (None 이면 벡터 검색만)
+        self.index = index
+        self.keyword_scores = keyword_scores
+        self.rrf_k = rrf_k
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self.collapse_titles = collapse_titles
+        self.mmr_lambda = mmr_lambda
+        self.catalog = catalog
+        self.embed_query = embed_query
+        self.documents_for_rows = documents_for_rows
+        self.vector_positions = catalog.id_positions(vector_course_ids)
+        self.vector_positions[np.asarray(vector_course_ids) < 0] = -1
+        self._flat = faiss.downcast_index(index)
+        self._xb = None
+        if isinstance(self._flat, faiss.IndexFlat):
+            self._xb = faiss.rev_swig_ptr(self._flat.get_xb(), index.ntotal * index.d).reshape(index.ntotal, index.d)
+            self._xb_norms = (self._xb ** 2).sum(axis=1)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, catalog, embeddings, keyword_index=None, **kwargs) -> "CourseSearcher":
+        ids = []
+        for row in range(vectorstore.index.ntotal):
+            docstore_id = vectorstore.index_to_docstore_id[row]
+            match = _COURSE_ID.match(str(docstore_id))
+            if not match:  # 매니페스트 이전 인덱스: 본문의 "id: N" 사용
+                match = _CONTENT_ID.search(vectorstore.docstore.search(docstore_id).page_content)
+            ids.append(int(match.group(1)) if match else -1)
+
+        def documents_for_rows(rows):
+            return [vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(row)]) for row in rows]
+
+        if keyword_index is not None:
+            row_of = {doc_id: row for row, doc_id in vectorstore.index_to_docstore_id.items()}
+            keyword_rows = np.asarray([row_of.get(doc_id, -1) for doc_id in keyword_index.doc_ids], dtype=np.int64)
+            valid = keyword_rows >= 0
+
+            def keyword_scores(query):
+                scores = np.zeros(vectorstore.index.ntotal, dtype=np.float32)
+                scores[keyword_rows[valid]] = keyword_index.scores(query)[valid]
+                return scores
+
+            kwargs["keyword_scores"] = keyword_scores
+
+        return cls(vectorstore.index, catalog, embeddings.embed_query, documents_for_rows, np.asarray(ids), **kwargs)
+
+    def _similarity(self, distances: np.ndarray) -> np.ndarray:
+        # 정규화된 임베딩 기준 코사인 유사도로 통일 (L2 제곱거리 d -> 1 - d / 2)
+        if self.index.metric_type == faiss.METRIC_L2:
+            return 1.0 - distances / 2.0
+        return distances
+
+    def allowed_rows(self, constraints: dict | None) -> np.ndarray | None:
+        if not constraints:
+            return None
+        mask = self.catalog.mask(**constraints)
+        valid = self.vector_positions >= 0
+        return np.flatnonzero(valid & mask[np.where(valid, self.vector_positions, 0)])
+
+    def search_rows(self, query_vector, k: int, rows: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        # (faiss 행 번호, 유사도) 를 유사도 내림차순으로 반환
+        query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        if rows is None:
+            distances, found = self.index.search(query, k)
+        elif rows.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        elif self._xb is not None and rows.size <= self.SUBSET_SCAN_RATIO * self.index.ntotal:
+            dots = self._xb[rows] @ query[0]
+            if self.index.metric_type == faiss.METRIC_L2:
+                scores = self._xb_norms[rows] - 2 * dots + float(query[0] @ query[0])
+                order = np.argsort(scores)[:k]
+            else:
+                scores = dots
+                order = np.argsort(-scores)[:k]
+            distances, found = scores[order][None], rows[order][None]
+        else:
+            params = search_parameters(self.index, faiss.IDSelectorBatch(rows.astype(np.int64)))
+            distances, found = self.index.search(query, k, params=params)
+        keep = found[0] >= 0
+        return found[0][keep], self._similarity(distances[0][keep])
+
+    def fused_rows(self, query: str, query_vector, fetch: int,
+                   rows: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        # 벡터 Top fetch + BM25 Top fetch (같은 사전 필터 적용) -> RRF 점수를 최댓값 1 로 맞춰 반환
+        found, similarity = self.search_rows(query_vector, fetch, rows)
+        if self.keyword_scores is None or not query:
+            return found, similarity
+        scores = self.keyword_scores(query)
+        if rows is not None:
+            allowed = np.zeros(scores.size, dtype=bool)
+            allowed[rows] = True
+            scores[~allowed] = 0
+        hits = np.flatnonzero(scores > 0)
+        if hits.size > fetch:
+            hits = hits[np.argpartition(-scores[hits], fetch - 1)[:fetch]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        fused = rrf_fuse([found.tolist(), hits.tolist()], k=self.rrf_k)
+        if not fused:
+            return found, similarity
+        fused_rows = np.asarray([row for row, _ in fused], dtype=np.int64)
+        fused_scores = np.asarray([score for _, score in fused], dtype=np.float32)
+        return fused_rows, fused_scores / fused_scores[0]
+
+    @property
+    def post_processing(self) -> bool:
+        return self.reranker is not None or self.collapse_titles or self.mmr_lambda is not None
+
+    def _vectors(self, rows: np.ndarray) -> np.ndarray:
+        if self._xb is not None:
+            return self._xb[rows]
+        return self.index.reconstruct_batch(rows.astype(np.int64))
+
+    def select_rows(self, rows: np.ndarray, similarity: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        # 유사도 순 후보에서 k 개 선택: 강의당 청크 1개 -> 재정렬 -> 제목 중복 제거 -> MMR
+        positions = self.vector_positions[rows]
+        _, first = np.unique(positions, return_index=True)
+        keep = np.sort(first)
+        # 강의를 알 수 없는 행(-1)은 한 강의로 합쳐지지 않도록 모두 유지
+        keep = np.union1d(keep, np.flatnonzero(positions < 0))
+
+        relevance = similarity[keep].astype(np.float64)
+        known = positions[keep] >= 0
+        if self.reranker is not None and known.any():
+            relevance[known] = self.reranker.scores(positions[keep][known], similarity[keep][known])
+            relevance[~known] = relevance[known].min() - 1.0  # 신호가 없는 행은 뒤로
+        ranking = np.argsort(-relevance, kind="stable")
+        order, relevance = keep[ranking], relevance[ranking]
+
+        if self.collapse_titles:
+            # 같은 제목은 점수가 가장 높은 강의 하나만 (order 가 점수 내림차순이므로 첫 등장)
+            titles = np.where(positions[order] >= 0, self.catalog.columns["title"][positions[order]],
+                              -1 - np.arange(order.size))
+            _, first = np.unique(titles, return_index=True)
+            first = np.sort(first)
+            order, relevance = order[first], relevance[first]
+
+        if self.mmr_lambda is not None and order.size > 1:
+            picked = mmr_select(relevance, self._vectors(rows[order]), k, self.mmr_lambda)
+        else:
+            picked = np.arange(min(k, order.size))
+        order = order[picked]
+        return rows[order], similarity[order]
+
+    def search_vector(self, query_vector, k: int, rows: np.ndarray | None = None,
+                      query: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        if not self.post_processing:
+            if self.keyword_scores is None or not query:
+                return self.search_rows(query_vector, k, rows)
+            found, scores = self.fused_rows(query, query_vector, max(k, self.rerank_candidates), rows)
+            return found[:k], scores[:k]
+        limit = self.index.ntotal if rows is None else rows.size
+        fetch = max(k, self.rerank_candidates)
+        while True:
+            found, scores = self.fused_rows(query, query_vector, fetch, rows)
+            selected = self.select_rows(found, scores, k)
+            # 제목 중복 제거 후 k 개가 안 되면 후보를 늘려 다시 검색
+            if selected[0].size >= k or fetch >= limit:
+                return selected
+            fetch = min(fetch * 4, limit)
+
+    def search(self, query: str, k: int = 5, constraints: dict | None = None, query_vector=None,
+               with_similarity: bool = False) -> list[tuple]:
+        # with_similarity: 점수를 RRF / 재정렬 점수 대신 질의와의 코사인 유사도로 반환 (관련도 컷오프용)
+        query_vector = self.embed_query(query) if query_vector is None else query_vector
+        rows, scores = self.search_vector(query_vector, k, self.allowed_rows(constraints), query=query)
+        if with_similarity:
+            scores = cosine_similarity(self.index, rows, query_vector)
+        return list(zip(self.documents_for_rows(rows), scores.tolist()))
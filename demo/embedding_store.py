@@ -0,0 +1,155 @@
+# ==============================
+# 🧮 영속 임베딩 저장소 (content-addressed)
+# ==============================
+# hash(model, text) -> float32 벡터. 인덱스 빌드(문서)와 질의 임베딩 모두 이 저장소를 거치므로
+# 청킹을 바꿔 인덱스를 다시 만들어도 새 청크만 임베딩하고, 반복 질의는 네트워크를 타지 않습니다.
+#
+# 디렉터리 구성 (모델별 하위 디렉터리)
+#   meta.json    : {"model": ..., "dim": ...}
+#   vectors.f32  : float32 행렬 (append-only, np.memmap 으로 읽음)
+#   keys.bin     : 16바이트 digest 배열, i 번째 digest 가 vectors.f32 의 i 번째 행
+import os
+import re
+import json
+import fcntl
+import hashlib
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from metrics import metrics
+
+DIGEST_SIZE = 16
+
+
+def content_key(model: str, text: str) -> bytes:
+    return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+class EmbeddingStore:
+    def __init__(self, root: str, model: str):
+        self.model = model
+        self.directory = os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]", "_", model))
+        os.makedirs(self.directory, exist_ok=True)
+        self._meta_path = os.path.join(self.directory, "meta.json")
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._keys_path = os.path.join(self.directory, "keys.bin")
+        self._lock = threading.Lock()
+        self._offsets: dict[bytes, int] = {}
+        self._keys_bytes = 0
+        self._matrix: np.ndarray | None = None
+        self.dim: int | None = None
+        self._read_dim()
+        self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _read_dim(self):
+        # 저장소를 다른 프로세스가 나중에 만들었을 수 있으므로 dim 을 모르면 meta.json 을 다시 확인
+        if self.dim is None and os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+
+    def _refresh(self):
+        # 다른 프로세스가 추가한 digest 를 이어서 읽음 (벡터를 먼저 쓰고 digest 를 쓰므로 항상 keys <= rows)
+        if not os.path.exists(self._keys_path):
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_bytes)
+            tail = f.read()
+        usable = len(tail) - len(tail) % DIGEST_SIZE
+        row = len(self._offsets)
+        for i in range(0, usable, DIGEST_SIZE):
+            self._offsets.setdefault(tail[i:i + DIGEST_SIZE], row)
+            row += 1
+        self._keys_bytes += usable
+
+    def _rows(self) -> np.ndarray:
+        rows = self._keys_bytes // DIGEST_SIZE
+        if self._matrix is None or self._matrix.shape[0] < rows:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._matrix
+
+    def get_many(self, keys: list[bytes]) -> list[np.ndarray | None]:
+        with self._lock:
+            if any(key not in self._offsets for key in keys):
+                self._refresh()
+            if not self._offsets:
+                return [None] * len(keys)
+            self._read_dim()
+            matrix = self._rows()
+            return [np.array(matrix[self._offsets[key]]) if key in self._offsets else None for key in keys]
+
+    def put_many(self, keys: list[bytes], vectors: list) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._read_dim()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model, "dim": self.dim}, f)
+            with open(self._keys_path, "ab") as keys_file:
+                fcntl.flock(keys_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()
+                    new = [(k, v) for k, v in zip(keys, vectors) if k not in self._offsets]
+                    if not new:
+                        return
+                    # 직전 비정상 종료로 벡터 행이 digest 보다 많으면 잘라서 정렬을 맞춤
+                    expected = self._keys_bytes // DIGEST_SIZE * self.dim * 4
+                    with open(self._vectors_path, "ab") as vectors_file:
+                        vectors_file.truncate(expected)
+                        vectors_file.write(np.stack([v for _, v in new]).tobytes())
+                        vectors_file.flush()
+                        os.fsync(vectors_file.fileno())
+                    keys_file.write(b"".join(k for k, _ in new))
+                    keys_file.flush()
+                finally:
+                    fcntl.flock(keys_file, fcntl.LOCK_UN)
+                self._refresh()
+
+
+class CachedEmbeddings(Embeddings):
+    # 임의의 LangChain Embeddings 를 감싸 저장소를 먼저 조회하고, 없는 텍스트만 한 번에 임베딩
+    def __init__(self, base: Embeddings, store: EmbeddingStore):
+        self.base = base
+        self.store = store
+
+    @property
+    def model(self) -> str:
+        return self.store.model
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [content_key(self.store.model, text) for text in texts]
+        found = self.store.get_many(keys)
+
+        missing: dict[bytes, str] = {}
+        for key, text, vector in zip(keys, texts, found):
+            if vector is None:
+                missing.setdefault(key, text)
+        metrics.incr("embedding_store.hits", len(texts) - sum(v is None for v in found))
+        metrics.incr("embedding_store.misses", len(missing))
+
+        if missing:
+            new_vectors = self.base.embed_documents(list(missing.values()))
+            self.store.put_many(list(missing.keys()), new_vectors)
+            fresh = dict(zip(missing.keys(), new_vectors))
+            found = [vector if vector is not None else fresh[key] for key, vector in zip(keys, found)]
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in found]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = content_key(self.store.model, text)
+        vector = self.store.get_many([key])[0]
+        if vector is not None:
+            metrics.incr("embedding_store.hits")
+            return vector.tolist()
+        metrics.incr("embedding_store.misses")
+        vector = self.base.embed_query(text)
+        self.store.put_many([key], [vector])
+        return list(vector)
+
+
+def embedding_model_name(embeddings) -> str:
+    return getattr(embeddings, "model", None) or type(embeddings).__name__
@@ -0,0 +1,199 @@
+# ==============================
+# 🧾 매니페스트 기반 증분 인덱스 빌드
+# ==============================
+# 인덱스 디렉터리에 manifest.json 을 함께 저장합니다.
+#   - sources       : 원본 파일(또는 데이터) 해시 -> 같으면 파싱 없이 바로 로드
+#   - params        : 청킹 파라미터 + 임베딩 모델 -> 다르면 전체 재빌드
+#   - units         : 단위(PDF 페이지 / 강의)별 내용 해시와 해당 청크 docstore id
+# 원본이 바뀌면 단위별로 diff 를 떠서 삭제/변경된 단위의 벡터만 지우고,
+# 추가/변경된 단위의 청크만 다시 임베딩해 추가합니다.
+#
+# dedup=True 이면 청크 id 를 본문 해시로 만들어 본문이 같은 청크는 한 번만 저장/검색합니다.
+# (여러 단위가 같은 id 를 공유하므로 diff 시에는 어느 단위에서도 쓰지 않는 id 만 삭제)
+#
+# 저장/로드는 index_store 를 거칩니다 (storage="mmap": pickle 없는 mmap 형식, "pickle": save_local).
+# index_config(vector_index.index_spec)가 flat 이 아니면 표본으로 학습한 IVF/PQ/HNSW/SQ 인덱스로 빌드합니다.
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Callable, NamedTuple
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from index_store import has_store, load_store, save_store
+from vector_index import build_index, build_params, configure_search, delete_documents, describe_index
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+LOSSLESS_INDEXES = ("IndexFlatL2", "IndexIVFFlat", "IndexHNSWFlat")
+
+
+class IndexUnit(NamedTuple):
+    key: str                 # 예: "Rag_Galaxy25_Ultra.pdf#p3", "course:17"
+    content_hash: str
+    chunks: list[Document]   # 분할이 끝난 청크
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(index_dir: str) -> dict | None:
+    path = os.path.join(index_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(index_dir: str, manifest: dict):
+    path = os.path.join(index_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def chunk_ids(unit: IndexUnit, dedup: bool = False) -> list[str]:
+    if dedup:
+        return [f"text:{sha256_text(chunk.page_content)[:32]}" for chunk in unit.chunks]
+    return [f"{unit.key}#c{i}" for i in range(len(unit.chunks))]
+
+
+def _unique_chunks(units: list[IndexUnit], dedup: bool, skip: set | None = None) -> tuple[list[Document], list[str]]:
+    docs, ids, seen = [], [], set(skip or ())
+    for unit in units:
+        for doc, doc_id in zip(unit.chunks, chunk_ids(unit, dedup)):
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            docs.append(doc)
+            ids.append(doc_id)
+    return docs, ids
+
+
+def _stored_vectors(index_dir: str, embeddings) -> dict[str, np.ndarray]:
+    # 매니페스트 이전 인덱스 / 인덱스 타입만 바뀐 경우: 본문이 같은 청크는 저장된 벡터를 그대로 재사용
+    db = load_store(index_dir, embeddings, storage="pickle")
+    vectors = db.index.reconstruct_n(0, db.index.ntotal)
+    return {
+        db.docstore.search(doc_id).page_content: vectors[row]
+        for row, doc_id in db.index_to_docstore_id.items()
+    }
+
+
+def _reusable(manifest: dict | None, params: dict) -> bool:
+    # 저장된 벡터가 원본 그대로(무손실 인덱스)이고 청킹/모델은 같으면 재임베딩 없이 재사용
+    if not manifest:
+        return True
+    same_chunks = {k: v for k, v in manifest.get("params", {}).items() if k != "index"} == \
+        {k: v for k, v in params.items() if k != "index"}
+    return same_chunks and manifest.get("index", {}).get("class", "IndexFlatL2") in LOSSLESS_INDEXES
+
+
+def _full_build(index_dir: str, embeddings, units: list[IndexUnit], reuse: dict | None = None,
+                dedup: bool = False, storage: str = "mmap", index_config: dict | None = None) -> FAISS:
+    docs, ids = _unique_chunks(units, dedup)
+
+    reuse = reuse or {}
+    texts = [doc.page_content for doc in docs]
+    missing = list(dict.fromkeys(text for text in texts if text not in reuse))
+    if missing:
+        reuse = {**reuse, **dict(zip(missing, embeddings.embed_documents(missing)))}
+    text_embeddings = [(text, list(map(float, reuse[text]))) for text in texts]
+    metadatas = [doc.metadata for doc in docs]
+    if build_params(index_config) and texts:
+        # 전체 벡터 중 표본으로 학습한 뒤 같은 순서로 추가
+        index = build_index(index_config, np.asarray([vector for _, vector in text_embeddings], dtype=np.float32))
+        db = FAISS(embeddings, index, InMemoryDocstore(), {})
+        db.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+    else:
+        db = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+    save_store(db, index_dir, storage)
+    return db
+
+
+def sync_faiss_index(
+    index_dir: str,
+    embeddings,
+    source_hashes: dict[str, str],
+    params: dict,
+    load_units: Callable[[], list[IndexUnit]],
+    dedup: bool = False,
+    storage: str = "mmap",
+    index_config: dict | None = None,
+) -> FAISS:
+    start = time.perf_counter()
+    if dedup:
+        params = {**params, "dedup": True}
+    if build_params(index_config):
+        params = {**params, "index": build_params(index_config)}
+    manifest = load_manifest(index_dir)
+    has_index = has_store(index_dir)
+
+    # 1. 원본이 그대로면 파싱 없이 로드 (읽기 전용 mmap)
+    if has_index and manifest and manifest.get("params") == params and manifest.get("sources") == source_hashes:
+        db = load_store(index_dir, embeddings, storage)
+        configure_search(db.index, index_config)
+        return db
+
+    units = load_units()
+    new_units = {unit.key: unit for unit in units}
+
+    # 2. 매니페스트가 없거나 청킹/모델이 바뀌면 전체 재빌드
+    if not has_index or not manifest or manifest.get("version") != MANIFEST_VERSION or manifest.get("params") != params:
+        reuse = _stored_vectors(index_dir, embeddings) if has_index and _reusable(manifest, params) else None
+        db = _full_build(index_dir, embeddings, units, reuse, dedup, storage, index_config)
+        added, removed, changed = len(units), 0, 0
+    else:
+        # 3. 단위별 diff 후 영향받은 벡터/docstore 항목만 갱신
+        db = load_store(index_dir, embeddings, storage, writable=True)
+        old_units = manifest["units"]
+        removed_keys = [key for key in old_units if key not in new_units]
+        changed_keys = [key for key in old_units if key in new_units and old_units[key]["hash"] != new_units[key].content_hash]
+        added_keys = [key for key in new_units if key not in old_units]
+
+        if dedup:
+            # 본문 해시 id: 새 단위 어디에서도 쓰지 않는 id 만 지우고, 인덱스에 없던 본문만 추가
+            old_ids = {i for unit in old_units.values() for i in unit["ids"]}
+            new_ids = {i for unit in units for i in chunk_ids(unit, dedup)}
+            stale_ids = list(old_ids - new_ids)
+            skip = old_ids & new_ids
+        else:
+            stale_ids = [i for key in removed_keys + changed_keys for i in old_units[key]["ids"]]
+            skip = None
+        if stale_ids:
+            delete_documents(db, stale_ids)
+
+        docs, ids = _unique_chunks([new_units[key] for key in changed_keys + added_keys], dedup, skip)
+        if docs:
+            db.add_documents(docs, ids=ids)
+        save_store(db, index_dir, storage)
+        added, removed, changed = len(added_keys), len(removed_keys), len(changed_keys)
+
+    configure_search(db.index, index_config)
+    save_manifest(index_dir, {
+        "version": MANIFEST_VERSION,
+        "params": params,
+        "index": describe_index(db.index),
+        "sources": source_hashes,
+        "units": {unit.key: {"hash": unit.content_hash, "ids": chunk_ids(unit, dedup)} for unit in units},
+    })
+    logger.info(
+        f"{index_dir}: +{added} ~{changed} -{removed} 단위 반영 ({(time.perf_counter() - start) * 1000:.0f} ms)"
+    )
+    return db
@@ -0,0 +1,163 @@
+# ==============================
+# 💾 pickle 없는 mmap 인덱스 저장 형식
+# ==============================
+# FAISS.save_local / load_local 은 docstore 를 index.pkl 로 pickle 해서, 로드할 때
+# allow_dangerous_deserialization=True 로 전체를 파이썬 객체로 되살립니다.
+# 이 모듈은 같은 디렉터리에 아래 파일을 씁니다.
+#   index.faiss          : faiss 인덱스 (IO_FLAG_MMAP_IFC 로 열어 벡터를 복사하지 않고 페이지 공유)
+#   docstore.bin         : 문서별 UTF-8 JSON {"page_content", "metadata"} 를 이어 붙인 blob
+#   docstore.offsets.npy : int64 오프셋 테이블 (n + 1), i 번째 문서 = blob[offsets[i]:offsets[i + 1]]
+#   docstore.ids.json    : faiss 행 순서의 docstore id 목록
+# 문서는 검색에 걸린 것만 그때그때 읽어 디코딩합니다. 여러 워커 프로세스가 같은 파일을 열면
+# 벡터와 문서 blob 은 OS 페이지 캐시를 통해 공유됩니다.
+import os
+import json
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain.docstore.document import Document
+from langchain_community.vectorstores import FAISS
+
+STORE_FORMAT_VERSION = 1
+INDEX_NAME = "index.faiss"
+BLOB_NAME = "docstore.bin"
+OFFSETS_NAME = "docstore.offsets.npy"
+IDS_NAME = "docstore.ids.json"
+PICKLE_NAME = "index.pkl"
+
+
+class MmapDocstore(Docstore, AddableMixin):
+    # 읽기는 mmap blob 에서 지연 디코딩, 추가/삭제는 메모리 overlay 에 기록 (save_store 시 다시 직렬화)
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, ids: list[str]):
+        self._blob = blob
+        self._offsets = offsets
+        self._ids = ids
+        self._row_of: dict[str, int] | None = None
+        self._added: dict[str, Document] = {}
+        self._deleted: set[str] = set()
+
+    def _row(self, doc_id: str) -> int | None:
+        if self._row_of is None:
+            self._row_of = {value: row for row, value in enumerate(self._ids)}
+        return self._row_of.get(doc_id)
+
+    def _read(self, row: int) -> Document:
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        record = json.loads(self._blob[start:end].tobytes().decode("utf-8"))
+        return Document(page_content=record["page_content"], metadata=record["metadata"])
+
+    def search(self, search: str) -> str | Document:
+        if search in self._added:
+            return self._added[search]
+        row = None if search in self._deleted else self._row(search)
+        if row is None:
+            return f"ID {search} not found."
+        return self._read(row)
+
+    def add(self, texts: dict[str, Document]) -> None:
+        overlapping = [doc_id for doc_id in texts if doc_id in self._added
+                       or (doc_id not in self._deleted and self._row(doc_id) is not None)]
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        self._added.update(texts)
+
+    def delete(self, ids: list) -> None:
+        for doc_id in ids:
+            if self._added.pop(doc_id, None) is None:
+                if doc_id in self._deleted or self._row(doc_id) is None:
+                    raise ValueError(f"ID {doc_id} not found.")
+                self._deleted.add(doc_id)
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._deleted) + len(self._added)
+
+
+def has_mmap_store(index_dir: str) -> bool:
+    names = (INDEX_NAME, BLOB_NAME, OFFSETS_NAME, IDS_NAME)
+    return all(os.path.exists(os.path.join(index_dir, name)) for name in names)
+
+
+def store_fingerprint(index_dir: str) -> str:
+    # 저장된 벡터/문서 파일의 크기 + 수정 시각 (바뀌면 파생 인덱스를 다시 맞춤)
+    parts = []
+    for name in (INDEX_NAME, BLOB_NAME, IDS_NAME, PICKLE_NAME):
+        path = os.path.join(index_dir, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def has_store(index_dir: str) -> bool:
+    return os.path.exists(os.path.join(index_dir, INDEX_NAME)) and (
+        has_mmap_store(index_dir) or os.path.exists(os.path.join(index_dir, PICKLE_NAME))
+    )
+
+
+def _replace(path: str, write) -> None:
+    with open(path + ".tmp", "wb") as f:
+        write(f)
+    os.replace(path + ".tmp", path)
+
+
+def save_store(db: FAISS, index_dir: str, storage: str = "mmap") -> None:
+    if storage == "pickle":
+        db.save_local(index_dir)
+        return
+    if storage != "mmap":
+        raise ValueError(f"지원하지 않는 인덱스 저장 형식: {storage}")
+
+    os.makedirs(index_dir, exist_ok=True)
+    ids = [db.index_to_docstore_id[row] for row in range(db.index.ntotal)]
+    offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+
+    def write_blob(f):
+        # 문서를 하나씩 직렬화해 바로 씀 (전체 blob 을 메모리에 만들지 않음)
+        for row, doc_id in enumerate(ids):
+            doc = db.docstore.search(doc_id)
+            record = json.dumps({"page_content": doc.page_content, "metadata": doc.metadata},
+                                ensure_ascii=False).encode("utf-8")
+            f.write(record)
+            offsets[row + 1] = offsets[row] + len(record)
+
+    # 인덱스 -> blob -> 오프셋 -> id 순으로 교체 (id 파일의 count 로 세트 일치 여부 확인)
+    faiss.write_index(db.index, os.path.join(index_dir, INDEX_NAME + ".tmp"))
+    os.replace(os.path.join(index_dir, INDEX_NAME + ".tmp"), os.path.join(index_dir, INDEX_NAME))
+    _replace(os.path.join(index_dir, BLOB_NAME), write_blob)
+    _replace(os.path.join(index_dir, OFFSETS_NAME), lambda f: np.save(f, offsets))
+    _replace(os.path.join(index_dir, IDS_NAME), lambda f: f.write(json.dumps(
+        {"version": STORE_FORMAT_VERSION, "count": len(ids), "ids": ids}, ensure_ascii=False
+    ).encode("utf-8")))
+    if os.path.exists(os.path.join(index_dir, PICKLE_NAME)):
+        os.remove(os.path.join(index_dir, PICKLE_NAME))
+
+
+def _load_mmap(index_dir: str, embeddings, writable: bool) -> FAISS:
+    with open(os.path.join(index_dir, IDS_NAME), "r", encoding="utf-8") as f:
+        header = json.load(f)
+    ids = header["ids"]
+    offsets = np.load(os.path.join(index_dir, OFFSETS_NAME), mmap_mode="r")
+    blob_path = os.path.join(index_dir, BLOB_NAME)
+    blob = (np.memmap(blob_path, dtype=np.uint8, mode="r") if os.path.getsize(blob_path)
+            else np.zeros(0, dtype=np.uint8))
+
+    # 수정할 인덱스(증분 빌드)는 메모리로 읽고, 읽기 전용은 mmap 으로 열어 페이지를 공유
+    flags = 0 if writable else faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+    index = faiss.read_index(os.path.join(index_dir, INDEX_NAME), flags)
+    if not (header["count"] == len(offsets) - 1 == index.ntotal):
+        raise ValueError(f"{index_dir}: 인덱스와 docstore 파일의 문서 수가 다릅니다")
+    return FAISS(embeddings, index, MmapDocstore(blob, offsets, ids), dict(enumerate(ids)))
+
+
+def load_store(index_dir: str, embeddings, storage: str = "mmap", writable: bool = False) -> FAISS:
+    # 저장 형식이 없거나 다르면 기존 pickle 을 한 번만 읽어 요청한 형식으로 변환
+    pickled = os.path.exists(os.path.join(index_dir, PICKLE_NAME))
+    if has_mmap_store(index_dir) and (storage == "mmap" or not pickled):
+        return _load_mmap(index_dir, embeddings, writable)
+    db = FAISS.load_local(index_dir, embeddings, allow_dangerous_deserialization=True)
+    if storage == "mmap":
+        save_store(db, index_dir, storage)
+        if not writable:
+            return _load_mmap(index_dir, embeddings, writable)
+    return db
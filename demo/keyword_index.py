@@ -0,0 +1,177 @@
+# ==============================
+# 🔤 로컬 BM25 키워드 인덱스 (한국어 음절 n-gram)
+# ==============================
+# 모델명, "mAh", "S펜", "200MP" 처럼 정확한 토큰이 중요한 질문을 위해 FAISS 와 같은 청크를
+# 역색인으로도 검색합니다. 결과는 벡터 검색과 RRF(reciprocal rank fusion)로 합칩니다.
+#
+# - 토큰화: NFKC + 소문자 후 한글 연속 구간은 음절 bigram(1음절이면 unigram),
+#           영문/숫자 구간과 공백 단위 단어(예: "s펜", "200mp")는 통째로
+# - 저장: index.faiss 옆 keyword_index.json (docstore id -> 단어 빈도, 본문 해시), pickle 없이 JSON
+# - 증분: 벡터스토어 docstore 와 id/본문 해시를 비교해 추가/변경/삭제된 청크만 토큰화
+# - 질의: 용어별 (문서 번호, BM25 가중치) 배열을 미리 만들어 두고 np.add.at 으로 합산
+import os
+import re
+import json
+import hashlib
+import logging
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+from index_store import store_fingerprint
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_INDEX_NAME = "keyword_index.json"
+TOKENIZER_VERSION = 1
+
+
+def text_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+_RUN = re.compile(r"[가-힣]+|[0-9a-z]+(?:\.[0-9]+)?")
+_WORD = re.compile(r"[0-9a-z가-힣]+(?:\.[0-9]+)?[0-9a-z가-힣]*")
+_HANGUL = re.compile(r"[가-힣]+")
+
+
+def tokenize(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens = []
+    for run in _RUN.findall(text):
+        if _HANGUL.fullmatch(run):
+            tokens.extend([run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)])
+        else:
+            tokens.append(run)
+    # 한글/영문/숫자가 섞인 단어는 그대로 한 번 더 (예: "s펜", "200mp")
+    for word in _WORD.findall(text):
+        if not _HANGUL.fullmatch(word) and _HANGUL.search(word):
+            tokens.append(word)
+    return tokens
+
+
+class KeywordIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: dict[str, dict[str, int]] = {}  # docstore id -> {용어: 빈도}
+        self.digests: dict[str, str] = {}          # docstore id -> 본문 해시
+        self.source = ""                           # 마지막으로 맞춘 벡터스토어 파일 지문
+        self._compiled = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # ---------- 갱신 ----------
+    def add(self, ids: list[str], texts: list[str]):
+        for doc_id, text in zip(ids, texts):
+            self.docs[doc_id] = dict(Counter(tokenize(text)))
+            self.digests[doc_id] = text_digest(text)
+        self._compiled = None
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.docs.pop(doc_id, None)
+            self.digests.pop(doc_id, None)
+        self._compiled = None
+
+    # ---------- 저장 / 로드 ----------
+    def save(self, index_dir: str):
+        path = os.path.join(index_dir, KEYWORD_INDEX_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": TOKENIZER_VERSION, "k1": self.k1, "b": self.b,
+                       "source": self.source, "docs": self.docs, "digests": self.digests},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "KeywordIndex | None":
+        path = os.path.join(index_dir, KEYWORD_INDEX_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != TOKENIZER_VERSION:
+            return None
+        index = cls(data["k1"], data["b"])
+        index.docs = data["docs"]
+        index.digests = data["digests"]
+        index.source = data.get("source", "")
+        return index
+
+    # ---------- 검색 ----------
+    def _compile(self):
+        # 용어 -> (문서 번호 배열, BM25 가중치 배열). 갱신 후 첫 검색에서 한 번만 계산
+        doc_ids = list(self.docs)
+        lengths = np.asarray([sum(terms.values()) for terms in self.docs.values()], dtype=np.float64)
+        avg_length = lengths.mean() if lengths.size else 0.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1e-9))
+
+        postings: dict[str, tuple[list, list]] = {}
+        for position, terms in enumerate(self.docs.values()):
+            for term, tf in terms.items():
+                docs, tfs = postings.setdefault(term, ([], []))
+                docs.append(position)
+                tfs.append(tf)
+
+        compiled = {}
+        for term, (docs, tfs) in postings.items():
+            docs = np.asarray(docs, dtype=np.int32)
+            tfs = np.asarray(tfs, dtype=np.float64)
+            idf = np.log(1 + (len(doc_ids) - docs.size + 0.5) / (docs.size + 0.5))
+            compiled[term] = (docs, (idf * tfs * (self.k1 + 1) / (tfs + norms[docs])).astype(np.float32))
+        self._compiled = (doc_ids, compiled)
+        return self._compiled
+
+    @property
+    def doc_ids(self) -> list[str]:
+        return (self._compiled or self._compile())[0]
+
+    def scores(self, query: str) -> np.ndarray:
+        # doc_ids 순서의 BM25 점수 배열
+        doc_ids, compiled = self._compiled or self._compile()
+        scores = np.zeros(len(doc_ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term in compiled:
+                docs, weights = compiled[term]
+                np.add.at(scores, docs, weights)
+        return scores
+
+    def search(self, query: str, k: int = 20) -> list[tuple[str, float]]:
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        if hits.size > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        doc_ids = self.doc_ids
+        return [(doc_ids[i], float(scores[i])) for i in hits]
+
+
+def sync_keyword_index(index_dir: str, vectorstore) -> KeywordIndex:
+    # 벡터스토어 docstore 와 비교해 빠지거나 새로 생기거나 본문이 바뀐 청크만 반영
+    # (증분 빌드는 바뀐 단위의 청크 id 를 재사용하므로 id 만으로는 변경을 알 수 없음)
+    # 벡터스토어 파일이 마지막 동기화 때와 같으면 문서를 읽지 않고 바로 사용
+    index = KeywordIndex.load(index_dir) or KeywordIndex()
+    source = store_fingerprint(index_dir)
+    if not source or index.source != source:
+        texts = {doc_id: vectorstore.docstore.search(doc_id).page_content
+                 for doc_id in vectorstore.index_to_docstore_id.values()}
+        stale = [doc_id for doc_id in index.docs if doc_id not in texts]
+        missing = [doc_id for doc_id, text in texts.items() if index.digests.get(doc_id) != text_digest(text)]
+        index.delete(stale)
+        index.add(missing, [texts[doc_id] for doc_id in missing])
+        index.source = source
+        index.save(index_dir)
+        logger.info(f"{index_dir}: 키워드 인덱스 +{len(missing)} -{len(stale)} 청크 반영")
+    index.doc_ids  # 첫 질의에서 컴파일하지 않도록 미리 계산
+    return index
+
+
+def rrf_fuse(rankings: list[list], k: int = 60) -> list[tuple]:
+    # 여러 순위 목록을 1 / (k + 순위) 합으로 합침 -> [(항목, 점수)] 점수 내림차순
+    scores: dict = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda pair: -pair[1])
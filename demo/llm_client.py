@@ -0,0 +1,285 @@
+# ==============================
+# 🛡️ 채팅 호출 안정화 계층 (마감 시간 / 재시도 / 헤징 / 서킷 브레이커)
+# ==============================
+# create_chat_client() 가 원본 클라이언트를 이 클래스로 감싸 돌려주므로 라우팅, 두 에이전트,
+# 대화 요약, 히스토리 분석이 모두 같은 client.chat.completions.create 인터페이스로 이 계층을 거칩니다.
+# - 마감 시간: 호출 전체에 deadline 초, 시도마다 남은 시간 안에서 timeout 을 전달
+# - 재시도   : 타임아웃 / 연결 오류 / 429 / 5xx 만, 지수 백오프 + full jitter (남은 시간 안에서만)
+# - 헤징     : 시도가 최근 지연 p95 안에 끝나지 않으면 같은 요청을 한 번 더 보내 먼저 온 응답을 사용
+#              (stream=True 는 첫 청크까지의 시간 기준, 첫 청크를 받은 뒤에는 재시도 / 헤징 없음)
+# - 서킷 브레이커: 재시도까지 실패한 호출이 연속 failure_threshold 번이면 cooldown 초 동안 즉시 실패,
+#              이후 한 요청만 시험 삼아 보내 성공하면 닫힘
+# - 스케줄러 : scheduler 가 있으면 시도마다 RPM / TPM / 동시 요청 자리를 받은 뒤 보냄 (scheduler.py)
+#              대기도 마감 시간에 포함되며, 헤지는 자리가 바로 날 때만 보냄
+# 실패는 LLMUnavailableError 로 올라가고, 호출자는 검색 결과 기반의 축약 답변 등으로 대체합니다.
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import httpx
+import numpy as np
+import openai
+
+from metrics import metrics
+from scheduler import RequestScheduler, SchedulerTimeout, estimate_chat_tokens
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,  # APITimeoutError 포함
+    openai.RateLimitError,
+    openai.InternalServerError,
+    httpx.TransportError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+class LLMUnavailableError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() - self._opened_at < self.cooldown else "half_open"
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True  # 시험 요청은 한 번에 하나
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("LLM 서킷 닫힘 (시험 요청 성공)")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        metrics.gauge("llm.breaker_open", 0)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                logger.warning(f"❗LLM 서킷 열림: 연속 실패 {self._failures}회, {self.cooldown:.0f}초 동안 즉시 실패")
+                self._opened_at = time.monotonic()
+            self._probing = False
+        metrics.gauge("llm.breaker_open", int(self._opened_at is not None))
+
+    def release_probe(self):
+        # 시험 요청이 업스트림까지 가지 못하고 끝남: 실패 수 / 열린 시각은 그대로 두고 다음 요청이 시험하게 함
+        with self._lock:
+            self._probing = False
+
+
+class _LatencyWindow:
+    # 최근 성공 시도의 지연(초) -> 헤지 지연 p95 계산
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int) -> float | None:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            samples = np.asarray(self._samples)
+        return float(np.percentile(samples, q))
+
+
+class _StreamStart(NamedTuple):
+    response: object   # 원본 스트림 (close() 로 연결 해제)
+    iterator: object
+    first: object      # 첫 청크 (빈 스트림이면 None)
+    permit: object     # 스케줄러 자리 (스트림을 다 읽거나 닫을 때 반환)
+
+
+def _close_late(future):
+    # 먼저 끝난 시도에 밀린 스트림 요청은 연결을 닫음
+    if future.cancelled() or future.exception() is not None:
+        return
+    result, _ = future.result()
+    if isinstance(result, _StreamStart):
+        if hasattr(result.response, "close"):
+            result.response.close()
+        if result.permit is not None:
+            result.permit.release()
+
+
+class ResilientChatClient:
+    def __init__(self, client, deadline: float = 30.0, attempt_timeout: float = 20.0, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 4.0, hedge: bool = True,
+                 hedge_quantile: float = 95.0, hedge_default_delay: float = 2.0, hedge_min_delay: float = 0.2,
+                 hedge_min_samples: int = 20, breaker: CircuitBreaker | None = None, max_workers: int = 64,
+                 scheduler: RequestScheduler | None = None, completion_tokens: int = 500):
+        # hedge_default_delay: 지연 샘플이 hedge_min_samples 개 모이기 전의 헤지 지연
+        # completion_tokens: max_tokens 가 없는 요청의 응답 토큰 추정치 (스케줄러 TPM 계산용)
+        self.client = client
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.scheduler = scheduler
+        self.completion_tokens = completion_tokens
+        self._latency: dict[tuple, _LatencyWindow] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def hedge_delay(self, key: tuple) -> float | None:
+        if not self.hedge:
+            return None
+        window = self._latency.get(key)
+        p = window.quantile(self.hedge_quantile, self.hedge_min_samples) if window else None
+        return max(self.hedge_min_delay, self.hedge_default_delay if p is None else p)
+
+    def create(self, deadline: float | None = None, **kwargs):
+        # deadline: 이 호출만 다른 마감 시간(초)을 쓸 때
+        if not self.breaker.allow():
+            metrics.incr("llm.breaker_rejections")
+            raise LLMUnavailableError("LLM 서킷이 열려 있습니다 (업스트림 장애로 즉시 실패)")
+        stream = bool(kwargs.get("stream"))
+        key = (kwargs.get("model"), stream)
+        expires = time.monotonic() + (deadline or self.deadline)
+        tokens = 0
+        if self.scheduler is not None:
+            tokens = estimate_chat_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"), self.completion_tokens)
+        last_error: Exception | None = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                remaining = expires - time.monotonic()
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+                if delay >= remaining:
+                    break
+                metrics.incr("llm.retries")
+                time.sleep(delay)
+            try:
+                result = self._hedged(kwargs, key, expires, tokens)
+            except SchedulerTimeout as e:
+                # 로컬 대기열에서 마감 시간을 다 씀: 업스트림 장애가 아니므로 서킷에는 기록하지 않음
+                self.breaker.release_probe()
+                raise LLMUnavailableError(f"LLM 요청 대기 시간 초과: {e}") from e
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                logger.warning(f"LLM 호출 실패 ({attempt + 1}회): {e!r}")
+                continue
+            except Exception:
+                # 요청 자체 오류(400 / 인증 등): 업스트림은 응답했으므로 서킷에는 성공으로 기록
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            return self._stream_from(result) if stream else result
+
+        self.breaker.record_failure()
+        metrics.incr("llm.failures")
+        raise LLMUnavailableError(f"LLM 호출 실패: {last_error!r}") from last_error
+
+    def _attempt(self, kwargs: dict, timeout: float, permit):
+        start = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(**kwargs, timeout=timeout)
+            if kwargs.get("stream"):
+                iterator = iter(response)
+                response = _StreamStart(response, iterator, next(iterator, None), permit)
+                permit = None
+            return response, time.perf_counter() - start
+        finally:
+            if permit is not None:
+                permit.release()
+
+    def _hedged(self, kwargs: dict, key: tuple, expires: float, tokens: int):
+        if time.monotonic() >= expires:
+            raise TimeoutError("LLM 마감 시간 초과")
+        permit = None
+        if self.scheduler is not None:
+            permit = self.scheduler.acquire(tokens, timeout=expires - time.monotonic())
+        now = time.monotonic()
+        metrics.incr("llm.attempts")
+        primary = self._pool.submit(self._attempt, kwargs, min(self.attempt_timeout, expires - now), permit)
+        pending = {primary}
+        hedge_delay = self.hedge_delay(key)
+        hedge_at = None if hedge_delay is None else now + hedge_delay
+        error: Exception | None = None
+        while pending:
+            until = expires if hedge_at is None else min(expires, hedge_at)
+            done, pending = wait(pending, timeout=max(0.0, until - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                self._latency.setdefault(key, _LatencyWindow()).add(seconds)
+                metrics.observe("llm.attempt_ms", seconds * 1000)
+                if future is not primary:
+                    metrics.incr("llm.hedge_wins")
+                for late in pending:
+                    late.add_done_callback(_close_late)
+                return result
+            now = time.monotonic()
+            if not pending:
+                break
+            if now >= expires:
+                metrics.incr("llm.timeouts")
+                for late in pending:
+                    late.add_done_callback(_close_late)
+                raise TimeoutError("LLM 마감 시간 초과")
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                permit = None
+                if self.scheduler is not None:
+                    permit = self.scheduler.try_acquire(tokens)
+                    if permit is None:
+                        metrics.incr("llm.hedges_skipped")  # 한도에 걸려 있을 때 헤지는 부하만 늘림
+                        continue
+                metrics.incr("llm.hedges")
+                metrics.incr("llm.attempts")
+                pending.add(self._pool.submit(self._attempt, kwargs, min(self.attempt_timeout, expires - now), permit))
+        raise error
+
+    @staticmethod
+    def _stream_from(start: _StreamStart):
+        try:
+            if start.first is not None:
+                yield start.first
+            yield from start.iterator
+        finally:
+            if start.permit is not None:
+                start.permit.release()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
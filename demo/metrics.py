@@ -0,0 +1,52 @@
+# ==============================
+# 📈 프로세스 단위 지표 수집
+# ==============================
+# 지연 시간 등 분포형 지표는 최근 N개 샘플을, 횟수형 지표는 누적 카운터로 보관합니다.
+# 설정 탭과 벤치마크 스크립트가 summary() 를 그대로 출력합니다.
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class Metrics:
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(value)
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {name: np.asarray(values) for name, values in self._samples.items() if values}
+            result = {name: value for name, value in self._counters.items()}
+            result.update(self._gauges)
+        for name, values in samples.items():
+            result[name] = {
+                "count": int(values.size),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,184 @@
+# ==============================
+# 🧪 오프라인 백엔드 (네트워크 / API 키 불필요)
+# ==============================
+# 폐쇄망 CI 나 벤치마크를 재현 가능하게 돌리기 위한 대체 구현입니다.
+# - HashingEmbeddings : 문자 n-gram + 단어 특징을 해시해 고정 차원으로 투영 (결정적, LangChain Embeddings 호환)
+# - FakeChatClient    : openai.OpenAI 의 client.chat.completions.create 대체 (일반 / stream=True 응답, 지연 주입,
+#                       tools 를 넘기면 제품 정보 질문에 첫 번째 도구 호출)
+import re
+import json
+import time
+import hashlib
+import unicodedata
+from functools import lru_cache
+from types import SimpleNamespace
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+# ==============================
+# 해시 n-gram 임베딩
+# ==============================
+@lru_cache(maxsize=1 << 18)
+def _bucket(feature: str, dim: int) -> tuple[int, float]:
+    # 프로세스 간에도 같은 값이 나오도록 내장 hash() 대신 blake2b 사용
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+
+class HashingEmbeddings(Embeddings):
+    def __init__(self, dim: int = 256, ngram_range: tuple[int, int] = (1, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    @property
+    def model(self) -> str:
+        low, high = self.ngram_range
+        return f"hashing-ngram{low}{high}-d{self.dim}"
+
+    def _features(self, text: str) -> list[str]:
+        text = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text).lower()).strip()
+        features = []
+        low, high = self.ngram_range
+        for word in text.split(" "):
+            if not word:
+                continue
+            features.append(f"w:{word}")
+            padded = f" {word} "
+            for n in range(low, high + 1):
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float64)
+        for feature in self._features(text):
+            index, sign = _bucket(feature, self.dim)
+            vector[index] += sign
+        # 긴 문서가 특정 버킷에 쏠리지 않도록 부호 유지 로그 스케일 후 L2 정규화
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).astype(np.float32).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+# ==============================
+# 가짜 chat completion 클라이언트
+# ==============================
+PRODUCT_KEYWORDS = (
+    "배터리", "카메라", "화면", "디스플레이", "스펙", "사양", "성능", "용량", "충전", "무게", "크기",
+    "s펜", "방수", "프로세서", "메모리", "저장", "색상", "가격", "갤럭시", "울트라", "mah", "mp",
+)
+
+
+def _offline_route(question: str) -> str:
+    lowered = question.lower()
+    if "강의" in lowered or "추천" in lowered:
+        return "agent2"
+    return "agent1" if any(keyword in lowered for keyword in PRODUCT_KEYWORDS) else "agent2"
+
+
+def _last_question(messages: list[dict]) -> str:
+    last = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    if "[사용자 질문]" in last:
+        return last.rsplit("[사용자 질문]", 1)[-1].strip()
+    # Agent2 프롬프트: [대화 기록] 의 마지막 "사용자:" 줄이 현재 질문
+    asked = [line[len("사용자:"):].strip() for line in last.splitlines() if line.startswith("사용자:")]
+    return asked[-1] if asked else last.strip()
+
+
+def offline_reply(messages: list[dict]) -> str:
+    # 라우팅 프롬프트면 키워드로 agent1 / agent2 를, 그 외에는 질문을 인용한 고정 형식 답변을 반환
+    system = " ".join(m["content"] for m in messages if m["role"] == "system")
+    last = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    question = last.rsplit("[사용자 질문]", 1)[-1].strip() or last.strip()
+    if "분류" in system:
+        return _offline_route(question)
+    tail = question.splitlines()[-1] if question else ""
+    return f"[오프라인 응답] {tail[:80]}"
+
+
+def offline_tool_call(messages: list[dict], tools: list[dict]) -> dict | None:
+    # 라우팅 겸 답변 호출(tools): 제품 정보 질문이면 첫 번째 도구를 호출, 아니면 None (바로 답변)
+    question = _last_question(messages)
+    if not tools or _offline_route(question) != "agent1":
+        return None
+    return {"name": tools[0]["function"]["name"], "arguments": json.dumps({"query": question}, ensure_ascii=False)}
+
+
+def _usage(messages: list[dict], text: str) -> SimpleNamespace:
+    prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 2
+    completion_tokens = len(text) // 2
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                           total_tokens=prompt_tokens + completion_tokens)
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeChatClient"):
+        self.owner = owner
+
+    def create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        owner = self.owner
+        owner.calls.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+        tool_call = offline_tool_call(messages, kwargs.get("tools"))
+        text = "" if tool_call else owner.responder(messages)
+        if owner.ttft:
+            time.sleep(owner.ttft)
+        if tool_call:
+            return self._tool_response(model, messages, tool_call, stream)
+        if not stream:
+            if owner.token_delay:
+                time.sleep(owner.token_delay * max(1, len(text) // owner.chunk_chars))
+            return SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(index=0, finish_reason="stop",
+                                         message=SimpleNamespace(role="assistant", content=text))],
+                usage=_usage(messages, text),
+            )
+        return self._stream(model, text)
+
+    @staticmethod
+    def _tool_response(model: str, messages: list, tool_call: dict, stream: bool):
+        call = SimpleNamespace(id="call_fake", type="function", function=SimpleNamespace(**tool_call))
+        if not stream:
+            return SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(index=0, finish_reason="tool_calls", message=SimpleNamespace(
+                    role="assistant", content=None, tool_calls=[call]))],
+                usage=_usage(messages, tool_call["arguments"]),
+            )
+        delta = SimpleNamespace(content=None, tool_calls=[SimpleNamespace(index=0, **vars(call))])
+        return iter([
+            SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, finish_reason=None, delta=delta)]),
+            SimpleNamespace(model=model, choices=[
+                SimpleNamespace(index=0, finish_reason="tool_calls", delta=SimpleNamespace(content=None))
+            ]),
+        ])
+
+    def _stream(self, model: str, text: str):
+        step = self.owner.chunk_chars
+        for i in range(0, len(text), step):
+            if i and self.owner.token_delay:
+                time.sleep(self.owner.token_delay)
+            yield SimpleNamespace(model=model, choices=[
+                SimpleNamespace(index=0, finish_reason=None, delta=SimpleNamespace(content=text[i:i + step]))
+            ])
+        yield SimpleNamespace(model=model, choices=[
+            SimpleNamespace(index=0, finish_reason="stop", delta=SimpleNamespace(content=None))
+        ])
+
+
+class FakeChatClient:
+    def __init__(self, responder=None, ttft: float = 0.0, token_delay: float = 0.0, chunk_chars: int = 4):
+        # responder(messages) -> 응답 문자열, ttft / token_delay: 첫 토큰 / 청크 간 지연(초)
+        self.responder = responder or offline_reply
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.chunk_chars = chunk_chars
+        self.calls: list[dict] = []
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
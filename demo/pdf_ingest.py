@@ -0,0 +1,327 @@
+# ==============================
+# 📥 PDF 디렉터리 병렬 인제스트 (제품 매뉴얼 전체 -> 하나의 FAISS 인덱스)
+# ==============================
+# load_or_create_rag_retriever 의 다중 파일 버전입니다. 매니페스트 형식(단위 = "파일#p페이지",
+# 청크 id = "단위#c번호")은 index_builder 와 같아서 단일 PDF 인덱스를 그대로 이어서 쓸 수 있습니다.
+#
+# 1. 파일별 sha256 을 매니페스트 sources 와 비교 -> 새/변경 파일만 처리, 사라진 파일의 청크는 삭제
+# 2. 프로세스 풀에서 파일 단위로 페이지 추출 + 청킹 (동시에 떠 있는 파일 수 = workers * 2)
+# 3. 청크를 batch_size 개씩 묶어 스레드 풀에서 임베딩 (동시 요청 max_inflight 개)
+# 4. 끝난 배치부터 제출 순서대로 인덱스에 추가
+# 5. checkpoint_every 청크마다 인덱스 + 매니페스트(처리가 끝난 파일만)를 저장 -> 중간에 멈춰도 다음 실행은 그 뒤부터
+#    mmap 저장이면 저장한 인덱스를 다시 열어 docstore 본문을 디스크로 내림
+# 메모리에 머무는 청크 본문은 (workers * 2 개 파일) + (max_inflight + 1) * batch_size 에 마지막 체크포인트 이후
+# 추가분(최대 checkpoint_every 개)입니다. 단, FAISS 인덱스의 벡터는 전체가 메모리에 있으므로
+# (청크당 차원 * 4 바이트, ada-002 는 6 KB) 전체 메모리는 코퍼스 크기에 비례해 늘어납니다.
+#
+# 실행: 저장소 루트에서 python demo/pdf_ingest.py <PDF 디렉터리> [--index-dir faiss_index] [--workers N]
+import os
+import sys
+import time
+import logging
+import argparse
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.docstore.document import Document
+from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_community.vectorstores import FAISS
+
+from embedding_store import embedding_model_name
+from index_builder import (
+    MANIFEST_VERSION, IndexUnit, chunk_ids, load_manifest, save_manifest, sha256_file, sha256_text,
+)
+from index_store import has_store, load_store, save_store
+from metrics import metrics
+from vector_index import delete_documents, describe_index
+
+logger = logging.getLogger(__name__)
+
+
+class IngestStats(NamedTuple):
+    files: int      # 새로 / 변경되어 처리한 파일
+    skipped: int    # 해시가 같아 건너뛴 파일
+    removed: int    # 디렉터리에서 사라진 파일
+    pages: int      # 처리한 파일의 페이지 수
+    chunks: int     # 새로 임베딩해 추가한 청크 수
+    seconds: float
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (f"파일 {self.files}개 처리 / {self.skipped}개 유지 / {self.removed}개 삭제, "
+                f"{self.pages} 페이지, {self.chunks} 청크, {self.seconds:.1f}s "
+                f"({self.pages_per_sec:.1f} pages/s, {self.chunks_per_sec:.1f} chunks/s)")
+
+
+def find_pdfs(pdf_dir: str) -> dict[str, str]:
+    # 디렉터리 기준 상대 경로("/" 구분) -> 실제 경로, 정렬 순서
+    found = {}
+    for root, dirs, names in os.walk(pdf_dir):
+        dirs.sort()
+        for name in sorted(names):
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                found[os.path.relpath(path, pdf_dir).replace(os.sep, "/")] = path
+    return found
+
+
+def extract_units(path: str, source: str, chunk_size: int, chunk_overlap: int) -> list[IndexUnit]:
+    # 프로세스 풀 워커: PDF 하나의 페이지 추출 + 청킹
+    pages = PyMuPDFLoader(path).load()
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return [
+        IndexUnit(
+            key=f"{source}#p{page.metadata.get('page', i)}",
+            content_hash=sha256_text(page.page_content),
+            chunks=splitter.split_documents([page]),
+        )
+        for i, page in enumerate(pages)
+    ]
+
+
+def _source_of(unit_key: str) -> str:
+    return unit_key.rsplit("#p", 1)[0]
+
+
+def _submit(pool, fn, *args) -> Future:
+    if pool is not None:
+        return pool.submit(fn, *args)
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
+class _EmbeddingAppender:
+    # 청크를 배치로 묶어 임베딩 스레드 풀에 넘기고, 완료된 배치를 제출 순서대로 인덱스에 추가
+    def __init__(self, embeddings, db: FAISS | None, batch_size: int, max_inflight: int):
+        self.embeddings = embeddings
+        self.db = db
+        self.batch_size = batch_size
+        self.max_inflight = max_inflight
+        self.chunks = 0
+        self._buffer: list[tuple[str, Document]] = []
+        self._pending: deque = deque()
+        self._executor = ThreadPoolExecutor(max_inflight, thread_name_prefix="ingest-embed")
+
+    def put(self, doc_id: str, doc: Document):
+        self._buffer.append((doc_id, doc))
+        if len(self._buffer) >= self.batch_size:
+            self._submit()
+
+    def delete(self, ids: list[str]):
+        delete_documents(self.db, ids)
+
+    def _submit(self):
+        batch, self._buffer = self._buffer, []
+        texts = [doc.page_content for _, doc in batch]
+        self._pending.append((self._executor.submit(self.embeddings.embed_documents, texts), batch))
+        self._drain(self.max_inflight)
+
+    def _drain(self, limit: int):
+        while len(self._pending) > limit:
+            future, batch = self._pending.popleft()
+            text_embeddings = list(zip([doc.page_content for _, doc in batch], future.result()))
+            metadatas = [doc.metadata for _, doc in batch]
+            ids = [doc_id for doc_id, _ in batch]
+            if self.db is None:
+                self.db = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=ids)
+            else:
+                self.db.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+            self.chunks += len(batch)
+            metrics.incr("ingest.chunks", len(batch))
+
+    def flush(self) -> FAISS | None:
+        # 대기 중인 청크를 모두 임베딩해 인덱스에 추가
+        if self._buffer:
+            self._submit()
+        self._drain(0)
+        return self.db
+
+    def close(self) -> FAISS | None:
+        try:
+            return self.flush()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
+
+def ingest_pdf_directory(
+    pdf_dir: str,
+    embeddings,
+    index_dir: str = "faiss_index",
+    chunk_size: int = 700,
+    chunk_overlap: int = 150,
+    workers: int = 0,
+    batch_size: int = 128,
+    max_inflight: int = 4,
+    storage: str = "mmap",
+    progress_every: float = 5.0,
+    checkpoint_every: int = 20000,
+) -> tuple[FAISS, IngestStats]:
+    # checkpoint_every: 이만큼 청크를 추가할 때마다 중간 저장 (0 이면 끝날 때 한 번만)
+    start = time.perf_counter()
+    files = find_pdfs(pdf_dir)
+    if not files:
+        raise ValueError(f"{pdf_dir}: PDF 파일이 없습니다")
+    sources = {source: sha256_file(path) for source, path in files.items()}
+    params = {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "embedding_model": embedding_model_name(embeddings),
+    }
+
+    # 1. 청킹/모델이 같으면 이어서 반영, 아니면 처음부터
+    manifest = load_manifest(index_dir)
+    incremental = bool(has_store(index_dir) and manifest and manifest.get("version") == MANIFEST_VERSION
+                       and manifest.get("params") == params)
+    old_sources = manifest["sources"] if incremental else {}
+    old_units = manifest["units"] if incremental else {}
+    changed = [source for source in files if old_sources.get(source) != sources[source]]
+    removed = [source for source in old_sources if source not in files]
+    if incremental and not changed and not removed:
+        db = load_store(index_dir, embeddings, storage)
+        return db, IngestStats(0, len(files), 0, 0, 0, time.perf_counter() - start)
+
+    db = load_store(index_dir, embeddings, storage, writable=True) if incremental else None
+    units_of: dict[str, list[str]] = {}
+    for key in old_units:
+        units_of.setdefault(_source_of(key), []).append(key)
+    gone = set(changed) | set(removed)
+    units = {key: unit for key, unit in old_units.items() if _source_of(key) not in gone}
+    stale = [doc_id for source in removed for key in units_of.get(source, []) for doc_id in old_units[key]["ids"]]
+    if stale:
+        delete_documents(db, stale)
+
+    appender = _EmbeddingAppender(embeddings, db, batch_size, max_inflight)
+    pages = 0
+    last_report = time.perf_counter()
+    applied: set[str] = set()
+    since_checkpoint = 0
+
+    def write_manifest(db: FAISS, manifest_sources: dict, manifest_units: dict):
+        save_manifest(index_dir, {
+            "version": MANIFEST_VERSION,
+            "params": params,
+            "index": describe_index(db.index),
+            "sources": manifest_sources,
+            "units": manifest_units,
+        })
+
+    def checkpoint():
+        # 아직 반영하지 않은 변경 파일은 옛 해시 / 옛 단위로 기록 (인덱스에는 옛 청크가 그대로 있음)
+        nonlocal since_checkpoint
+        since_checkpoint = 0
+        db = appender.flush()
+        if db is None:
+            return
+        save_store(db, index_dir, storage)
+        unfinished = [source for source in changed if source not in applied]
+        write_manifest(
+            db,
+            {source: sources[source] if source in applied or source not in changed else old_sources[source]
+             for source in files if source in applied or source not in changed or source in old_sources},
+            {**units, **{key: old_units[key] for source in unfinished for key in units_of.get(source, [])}},
+        )
+        if storage == "mmap":
+            appender.db = load_store(index_dir, embeddings, storage, writable=True)
+        metrics.incr("ingest.checkpoints")
+        logger.info(f"{index_dir}: 체크포인트 저장 ({len(applied)}/{len(changed)} 파일, {appender.chunks} 청크)")
+
+    def apply(source: str, new_units: list[IndexUnit]):
+        # 바뀐 페이지의 옛 청크를 지우고, 새 페이지/바뀐 페이지의 청크만 임베딩 대기열로
+        nonlocal pages, last_report, since_checkpoint
+        new_by_key = {unit.key: unit for unit in new_units}
+        stale_ids = [doc_id for key in units_of.get(source, [])
+                     if key not in new_by_key or new_by_key[key].content_hash != old_units[key]["hash"]
+                     for doc_id in old_units[key]["ids"]]
+        if stale_ids:
+            appender.delete(stale_ids)
+        for unit in new_units:
+            if unit.key in old_units and old_units[unit.key]["hash"] == unit.content_hash:
+                units[unit.key] = old_units[unit.key]
+                continue
+            ids = chunk_ids(unit)
+            for doc_id, doc in zip(ids, unit.chunks):
+                appender.put(doc_id, doc)
+            units[unit.key] = {"hash": unit.content_hash, "ids": ids}
+            since_checkpoint += len(ids)
+        applied.add(source)
+        pages += len(new_units)
+        metrics.incr("ingest.pages", len(new_units))
+        if time.perf_counter() - last_report >= progress_every:
+            last_report = time.perf_counter()
+            elapsed = last_report - start
+            logger.info(f"{pages} 페이지 / {appender.chunks} 청크 "
+                        f"({pages / elapsed:.1f} pages/s, {appender.chunks / elapsed:.1f} chunks/s)")
+        if checkpoint_every and since_checkpoint >= checkpoint_every:
+            checkpoint()
+
+    # 2. 추출은 프로세스 풀 (spawn: 임베딩 스레드가 도는 프로세스를 fork 하지 않음), 결과는 제출 순서대로 반영
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) if workers > 1 else None
+    try:
+        pending: deque = deque()
+        for source in changed:
+            pending.append((source, _submit(pool, extract_units, files[source], source, chunk_size, chunk_overlap)))
+            while len(pending) >= workers * 2:
+                source_done, future = pending.popleft()
+                apply(source_done, future.result())
+        while pending:
+            source_done, future = pending.popleft()
+            apply(source_done, future.result())
+        db = appender.close()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    if db is None:
+        raise ValueError(f"{pdf_dir}: PDF 에서 추출된 텍스트가 없습니다")
+
+    # 3. 최종 저장
+    save_store(db, index_dir, storage)
+    write_manifest(db, sources, units)
+    stats = IngestStats(len(changed), len(files) - len(changed), len(removed), pages, appender.chunks,
+                        time.perf_counter() - start)
+    logger.info(f"{index_dir}: {stats}")
+    return db, stats
+
+
+def main(argv: list[str] | None = None):
+    import config
+    from backends import create_embeddings, with_embedding_store
+    from keyword_index import sync_keyword_index
+
+    parser = argparse.ArgumentParser(description="PDF 디렉터리를 FAISS 인덱스로 인제스트합니다")
+    parser.add_argument("pdf_dir")
+    parser.add_argument("--index-dir", default=config.PDF_INDEX_DIR)
+    parser.add_argument("--chunk-size", type=int, default=700)
+    parser.add_argument("--chunk-overlap", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=config.INGEST_WORKERS, help="0: CPU 수")
+    parser.add_argument("--batch-size", type=int, default=config.INGEST_EMBED_BATCH_SIZE)
+    parser.add_argument("--max-inflight", type=int, default=config.INGEST_EMBED_CONCURRENCY)
+    parser.add_argument("--checkpoint-every", type=int, default=config.INGEST_CHECKPOINT_CHUNKS, help="0: 끝날 때만 저장")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    embeddings = with_embedding_store(create_embeddings())
+    db, stats = ingest_pdf_directory(
+        args.pdf_dir, embeddings, args.index_dir,
+        chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, workers=args.workers,
+        batch_size=args.batch_size, max_inflight=args.max_inflight, storage=config.INDEX_STORAGE,
+        checkpoint_every=args.checkpoint_every,
+    )
+    if config.HYBRID_SEARCH_ENABLED:
+        sync_keyword_index(args.index_dir, db)
+    print(stats)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
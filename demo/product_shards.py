@@ -0,0 +1,265 @@
+# ==============================
+# 🗂️ 제품군별 인덱스 샤드 + 질의 시 샤드 라우팅 (Agent1)
+# ==============================
+# 코퍼스 루트의 하위 디렉터리 하나 = 제품군 하나 (예: manuals/galaxy_s/, manuals/tv/, manuals/wearable/)
+# 제품군마다 pdf_ingest 로 별도 인덱스(샤드)를 만들고 설명자 shard.json 을 함께 저장합니다.
+#   shard.json : {"name", "aliases": [모델명/별칭], "centroid": [정규화한 평균 벡터], "chunks", "bytes"}
+# 별칭은 디렉터리 이름, PDF 파일 이름, 원본 디렉터리의 aliases.txt(한 줄에 하나)에서 가져옵니다.
+# 파일 이름에서는 "manual", "사용설명서" 같은 일반 단어와 숫자만 남는 이름(예: manual_0001)은 뺍니다.
+#
+# 질의 시
+# 1. 질문에 별칭이 단어 경계에 맞춰 들어 있으면 그 샤드 (예: "S25 울트라 배터리" -> galaxy_s, "s250" 은 "s25" 아님)
+# 2. 없으면 질의 벡터와 샤드 중심 벡터의 코사인 유사도가 1등과 margin 이내인 샤드 (최대 max_shards 개)
+# 3. 고른 샤드에서만 벡터 / BM25 검색 후 샤드 구분 없이 RRF 로 합침
+# 샤드는 처음 쓰일 때 로드하고, 로드된 샤드 파일 크기 합이 memory_budget_mb 를 넘으면 가장 오래 안 쓴 샤드부터 내립니다.
+#
+# 빌드: 저장소 루트에서 python demo/product_shards.py <코퍼스 루트> [--shard-root product_shards]
+import os
+import re
+import sys
+import json
+import shutil
+import logging
+import argparse
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+from index_store import load_store
+from keyword_index import rrf_fuse, sync_keyword_index
+from metrics import metrics
+from pdf_ingest import IngestStats, find_pdfs, ingest_pdf_directory
+from retrievers import docstore_rows
+from vector_index import cosine_similarity
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTOR_NAME = "shard.json"
+ALIASES_NAME = "aliases.txt"
+# 파일 이름 별칭에서 뺄 일반 단어 (aliases.txt 에 직접 쓴 별칭은 그대로 사용)
+GENERIC_STEM_WORDS = frozenset((
+    "manual", "manuals", "user", "users", "guide", "userguide", "usermanual", "quick", "start", "quickstart",
+    "setup", "install", "installation", "instruction", "instructions", "spec", "specs", "datasheet", "doc", "docs",
+    "final", "draft", "copy", "rev", "ver", "version", "ko", "kr", "kor", "en", "eng",
+    "사용설명서", "설명서", "사용자", "매뉴얼", "가이드", "안내", "안내서", "빠른", "시작", "설치", "사양", "제품", "문서",
+))
+
+
+def alias_key(text: str) -> str:
+    # 대소문자 / 전각 / 공백 / 구분 기호 차이를 무시하고 비교
+    return re.sub(r"[^0-9a-z가-힣]", "", unicodedata.normalize("NFKC", text).lower())
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"[0-9a-z가-힣]+", unicodedata.normalize("NFKC", text).lower())
+
+
+def _stem_alias(stem: str) -> str | None:
+    # PDF 파일 이름 -> 일반 단어를 뺀 별칭 ("Galaxy_S25_Ultra_manual_KO" -> "galaxy s25 ultra"), 남는 게 없으면 None
+    words = [word for word in _words(stem) if word not in GENERIC_STEM_WORDS]
+    if not words or all(word.isdigit() for word in words):
+        return None
+    return " ".join(words)
+
+
+def _alias_pattern(alias: str) -> re.Pattern:
+    # 정규화한 질문(_match_text)에서 별칭을 단어 경계에 맞춰 찾는 패턴
+    # 글자 사이 공백은 있어도 없어도 됨 ("s25울트라" == "s25 울트라"), 영숫자 별칭 앞뒤로 영숫자가 붙으면 불일치,
+    # 한글 별칭 앞에 한글이 붙으면 불일치 (뒤에는 조사가 붙을 수 있음)
+    key = alias_key(alias)
+    left = r"(?<![0-9a-z])" if key[0].isascii() else r"(?<![가-힣])"
+    right = r"(?![0-9a-z])" if key[-1].isascii() else ""
+    return re.compile(left + " ?".join(map(re.escape, key)) + right)
+
+
+def _match_text(text: str) -> str:
+    return " ".join(_words(text))
+
+
+def _aliases(name: str, source_dir: str) -> list[str]:
+    stems = (_stem_alias(os.path.splitext(os.path.basename(path))[0]) for path in find_pdfs(source_dir).values())
+    aliases = [name] + [stem for stem in stems if stem]
+    path = os.path.join(source_dir, ALIASES_NAME)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            aliases += [line.strip() for line in f if line.strip()]
+    return list(dict.fromkeys(alias for alias in aliases if len(alias_key(alias)) >= 2))
+
+
+def _centroid(index, block: int = 65536) -> list[float]:
+    # 정규화한 벡터의 평균 방향 (큰 샤드도 블록 단위로 복원)
+    total = np.zeros(index.d, dtype=np.float64)
+    for start in range(0, index.ntotal, block):
+        vectors = index.reconstruct_n(start, min(block, index.ntotal - start))
+        total += (vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)).sum(axis=0)
+    norm = np.linalg.norm(total)
+    return (total / norm if norm else total).astype(np.float32).tolist()
+
+
+def build_product_shards(corpus_dir: str, shard_root: str, embeddings, hybrid: bool = True,
+                         **ingest_kwargs) -> dict[str, IngestStats]:
+    # 하위 디렉터리별로 증분 인제스트 후 설명자 갱신, 원본이 사라진 샤드는 삭제
+    lines = sorted(entry.name for entry in os.scandir(corpus_dir) if entry.is_dir() and find_pdfs(entry.path))
+    if not lines:
+        raise ValueError(f"{corpus_dir}: PDF 가 들어 있는 제품군 디렉터리가 없습니다")
+    os.makedirs(shard_root, exist_ok=True)
+    results = {}
+    for name in lines:
+        source_dir = os.path.join(corpus_dir, name)
+        index_dir = os.path.join(shard_root, name)
+        db, stats = ingest_pdf_directory(source_dir, embeddings, index_dir, **ingest_kwargs)
+        if hybrid:
+            sync_keyword_index(index_dir, db)
+        descriptor_path = os.path.join(index_dir, DESCRIPTOR_NAME)
+        descriptor = {
+            "name": name,
+            "aliases": _aliases(name, source_dir),
+            "centroid": None,
+            "chunks": int(db.index.ntotal),
+        }
+        previous = None
+        if os.path.exists(descriptor_path):
+            with open(descriptor_path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        if previous is not None and not (stats.files or stats.removed):
+            descriptor["centroid"] = previous["centroid"]
+        else:
+            descriptor["centroid"] = _centroid(db.index)
+        descriptor["bytes"] = sum(entry.stat().st_size for entry in os.scandir(index_dir)
+                                  if entry.is_file() and entry.name != DESCRIPTOR_NAME)
+        # 바뀐 게 없으면 다시 쓰지 않음 (답변 캐시 지문이 디렉터리 수정 시각을 봄)
+        if descriptor != previous:
+            with open(descriptor_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(descriptor, f, ensure_ascii=False)
+            os.replace(descriptor_path + ".tmp", descriptor_path)
+        results[name] = stats
+
+    for entry in os.scandir(shard_root):
+        if entry.is_dir() and entry.name not in results and os.path.exists(os.path.join(entry.path, DESCRIPTOR_NAME)):
+            logger.info(f"{entry.path}: 원본 제품군이 없어 샤드 삭제")
+            shutil.rmtree(entry.path)
+    return results
+
+
+class ShardRouter:
+    def __init__(self, shard_root: str, embeddings, max_shards: int = 3, margin: float = 0.05,
+                 memory_budget_mb: float = 1024, storage: str = "mmap", hybrid: bool = True):
+        # memory_budget_mb: 로드된 샤드 파일 크기 합 상한 (0 이면 제한 없음, 방금 쓴 샤드는 항상 유지)
+        self.shard_root = shard_root
+        self.embeddings = embeddings
+        self.max_shards = max_shards
+        self.margin = margin
+        self.memory_budget = memory_budget_mb * 2**20
+        self.storage = storage
+        self.hybrid = hybrid
+        self.descriptors = {}
+        for entry in sorted(os.scandir(shard_root), key=lambda entry: entry.name) if os.path.isdir(shard_root) else []:
+            path = os.path.join(entry.path, DESCRIPTOR_NAME)
+            if entry.is_dir() and os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self.descriptors[entry.name] = json.load(f)
+        if not self.descriptors:
+            raise ValueError(f"{shard_root}: 샤드가 없습니다 (product_shards.py 로 먼저 빌드)")
+        self.names = list(self.descriptors)
+        self.centroids = np.asarray([self.descriptors[name]["centroid"] for name in self.names], dtype=np.float32)
+        # 긴 별칭부터 비교 ("갤럭시 s25 울트라" 가 "갤럭시" 보다 우선)
+        aliases = sorted(((alias_key(alias), alias, name) for name, descriptor in self.descriptors.items()
+                          for alias in descriptor["aliases"]), key=lambda row: -len(row[0]))
+        self.aliases = [(_alias_pattern(alias), name) for _, alias, name in aliases]
+        self._loaded: OrderedDict = OrderedDict()  # 이름 -> (벡터스토어, 키워드 인덱스, 바이트)
+        self._lock = threading.Lock()
+
+    # ---------- 라우팅 ----------
+    def route(self, query: str, query_vector) -> list[str]:
+        text = _match_text(query)
+        matched = []
+        for pattern, name in self.aliases:
+            if name not in matched and pattern.search(text):
+                matched.append(name)
+        if matched:
+            metrics.incr("shards.route_alias")
+            return matched[:self.max_shards]
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = self.centroids @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        order = np.argsort(-scores)[:self.max_shards]
+        metrics.incr("shards.route_centroid")
+        return [self.names[i] for i in order if scores[i] >= scores[order[0]] - self.margin]
+
+    # ---------- 지연 로드 / LRU ----------
+    def shard(self, name: str):
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                return self._loaded[name][:2]
+            index_dir = os.path.join(self.shard_root, name)
+            db = load_store(index_dir, self.embeddings, self.storage)
+            keyword_index = sync_keyword_index(index_dir, db) if self.hybrid else None
+            self._loaded[name] = (db, keyword_index, self.descriptors[name]["bytes"])
+            metrics.incr("shards.loads")
+            while self.memory_budget and len(self._loaded) > 1 and self.loaded_bytes > self.memory_budget:
+                evicted, _ = self._loaded.popitem(last=False)
+                metrics.incr("shards.evictions")
+                logger.info(f"샤드 {evicted} 언로드 (메모리 한도 {self.memory_budget / 2**20:.0f} MB)")
+            metrics.gauge("shards.loaded", len(self._loaded))
+            return db, keyword_index
+
+    @property
+    def loaded_bytes(self) -> int:
+        return sum(size for _, _, size in self._loaded.values())
+
+    # ---------- 검색 ----------
+    def search(self, query: str, query_vector, k: int = 4, fetch_k: int = 20, rrf_k: int = 60,
+               with_similarity: bool = False) -> list:
+        # 벡터: 고른 샤드의 Top fetch_k 를 L2 거리로 한 목록에 합침 (같은 임베딩 공간이라 거리 비교 가능)
+        # BM25: 점수가 샤드별 IDF / 평균 길이에 묶여 샤드 간 비교가 안 되므로 샤드마다 별도 순위 목록으로 RRF
+        # with_similarity: [(문서, 질의와의 코사인 유사도)] 반환
+        names = self.route(query, query_vector)
+        shards = {name: self.shard(name) for name in names}
+        query_matrix = np.asarray([query_vector], dtype=np.float32)
+        vector_hits, keyword_rankings = [], []
+        for name, (db, keyword_index) in shards.items():
+            distances, rows = db.index.search(query_matrix, fetch_k)
+            vector_hits += [(float(distance), name, db.index_to_docstore_id[int(row)])
+                            for distance, row in zip(distances[0], rows[0]) if row >= 0]
+            if keyword_index is not None:
+                keyword_rankings.append([(name, doc_id) for doc_id, _ in keyword_index.search(query, fetch_k)])
+        rankings = [[(name, doc_id) for _, name, doc_id in sorted(vector_hits)[:fetch_k]]]
+        rankings += [ranking for ranking in keyword_rankings if ranking]
+        fused = rrf_fuse(rankings, k=rrf_k)[:k]
+        docs = [shards[name][0].docstore.search(doc_id) for (name, doc_id), _ in fused]
+        if not with_similarity:
+            return docs
+        similarity = [
+            float(cosine_similarity(shards[name][0].index, [docstore_rows(shards[name][0])[doc_id]], query_vector)[0])
+            for (name, doc_id), _ in fused
+        ]
+        return list(zip(docs, similarity))
+
+
+def main(argv: list[str] | None = None):
+    import config
+    from backends import create_embeddings, with_embedding_store
+
+    parser = argparse.ArgumentParser(description="제품군 디렉터리별 인덱스 샤드를 빌드합니다")
+    parser.add_argument("corpus_dir")
+    parser.add_argument("--shard-root", default=config.PRODUCT_SHARD_DIR)
+    parser.add_argument("--workers", type=int, default=config.INGEST_WORKERS, help="0: CPU 수")
+    parser.add_argument("--batch-size", type=int, default=config.INGEST_EMBED_BATCH_SIZE)
+    parser.add_argument("--max-inflight", type=int, default=config.INGEST_EMBED_CONCURRENCY)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    results = build_product_shards(
+        args.corpus_dir, args.shard_root, with_embedding_store(create_embeddings()),
+        hybrid=config.HYBRID_SEARCH_ENABLED, workers=args.workers, batch_size=args.batch_size,
+        max_inflight=args.max_inflight, storage=config.INDEX_STORAGE,
+    )
+    for name, stats in results.items():
+        print(f"{name}: {stats}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
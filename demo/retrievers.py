@@ -0,0 +1,169 @@
+# ==========================
+# 📁 인덱스 빌드 / 로딩
+# ==========================
+import os
+import re
+import json
+import logging
+import weakref
+import unicodedata
+
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.docstore.document import Document
+from langchain_community.document_loaders import PyMuPDFLoader
+
+from course_catalog import CourseCatalog
+from embedding_store import embedding_model_name
+from index_builder import IndexUnit, sha256_file, sha256_text, sync_faiss_index
+from keyword_index import rrf_fuse
+from vector_index import cosine_similarity, index_spec
+
+logger = logging.getLogger(__name__)
+
+
+# 검색용 질의 정규화 (전각/반각 통일, 공백 정리) -> 동일 질문의 임베딩 재사용률 향상
+def normalize_query(query: str) -> str:
+    query = unicodedata.normalize("NFKC", query)
+    return re.sub(r"\s+", " ", query).strip()
+
+
+_ROWS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def docstore_rows(vectorstore) -> dict:
+    # docstore id -> faiss 행 (벡터 수가 바뀌면 다시 만듦)
+    cached = _ROWS.get(vectorstore)
+    if cached is None or cached[0] != vectorstore.index.ntotal:
+        cached = (vectorstore.index.ntotal, {doc_id: row for row, doc_id in vectorstore.index_to_docstore_id.items()})
+        _ROWS[vectorstore] = cached
+    return cached[1]
+
+
+# 벡터 Top fetch_k + 키워드(BM25) Top fetch_k 를 RRF 로 합쳐 상위 k 개 문서 (keyword_index 가 None 이면 벡터 순위만)
+# with_similarity: [(문서, 질의와의 코사인 유사도)] 반환 (관련도 컷오프용)
+def hybrid_search(vectorstore, keyword_index, query: str, query_vector, k: int = 4,
+                  fetch_k: int = 20, rrf_k: int = 60, with_similarity: bool = False) -> list:
+    _, rows = vectorstore.index.search(np.asarray([query_vector], dtype=np.float32), fetch_k)
+    vector_ids = [vectorstore.index_to_docstore_id[int(row)] for row in rows[0] if row >= 0]
+    keyword_ids = [doc_id for doc_id, _ in keyword_index.search(query, fetch_k)] if keyword_index is not None else []
+    fused = rrf_fuse([vector_ids, keyword_ids], k=rrf_k)[:k]
+    docs = [vectorstore.docstore.search(doc_id) for doc_id, _ in fused]
+    if not with_similarity:
+        return docs
+    row_of = docstore_rows(vectorstore)
+    similarity = cosine_similarity(vectorstore.index, [row_of[doc_id] for doc_id, _ in fused], query_vector)
+    return list(zip(docs, similarity.tolist()))
+
+
+# ===========================
+# 📁 PDF 문서 임베딩 (Agent1)
+# ===========================
+def load_or_create_rag_retriever(
+    file_path: str,
+    embeddings,
+    index_dir: str = "faiss_index",
+    chunk_size: int = 700,
+    chunk_overlap: int = 150,
+    dedup: bool = False,
+    storage: str = "mmap",
+):
+    # PDF 페이지 단위로 diff -> 바뀐 페이지의 청크만 다시 임베딩
+    def load_units() -> list[IndexUnit]:
+        # 1. PDF 읽기 및 청킹
+        pages = PyMuPDFLoader(file_path).load()
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+        source = os.path.basename(file_path)
+        return [
+            IndexUnit(
+                key=f"{source}#p{page.metadata.get('page', i)}",
+                content_hash=sha256_text(page.page_content),
+                chunks=splitter.split_documents([page]),
+            )
+            for i, page in enumerate(pages)
+        ]
+
+    # 2. 임베딩 및 FAISS 저장 (매니페스트와 비교해 증분 반영)
+    db = sync_faiss_index(
+        index_dir,
+        embeddings,
+        source_hashes={os.path.basename(file_path): sha256_file(file_path)},
+        params={
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "embedding_model": embedding_model_name(embeddings),
+        },
+        load_units=load_units,
+        dedup=dedup,
+        storage=storage,
+    )
+    return db.as_retriever()
+
+
+# ===========================
+# 📚 강의 데이터 전처리 (Agent2)
+# ===========================
+
+# 강의 데이터 읽기
+def load_course_data(path: str = "RAG/sales_learning_dummy_data.json") -> list:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["courses"]
+    except Exception as e:
+        logger.error(f"❗강의 데이터를 불러오지 못했습니다: {e}")
+        return []
+
+
+# 강의 데이터 랭체인 문서로 변환 (dict 또는 CourseRow)
+def course_to_document(course) -> Document:
+    text = "\n".join([f"{key}: {value}" for key, value in course.items()])
+    return Document(page_content=text, metadata={"title": course.get("title", "")})
+
+
+def course_data_to_documents(course_data) -> list[Document]:
+    return [course_to_document(course) for course in course_data]
+
+
+# 임베딩 및 청킹
+def create_course_rag_retriever(
+    catalog: CourseCatalog,
+    embeddings,
+    index_dir: str = "course_faiss_index",
+    chunk_size: int = 500,
+    chunk_overlap: int = 100,
+    dedup: bool = False,
+    storage: str = "mmap",
+    index_type: str = "flat",
+    index_params: dict | None = None,
+):
+    # 강의 단위로 diff -> 수정/추가된 강의만 다시 임베딩
+    def load_units() -> list[IndexUnit]:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        units = []
+        for i, course in enumerate(catalog):
+            doc = course_to_document(course)
+            units.append(IndexUnit(
+                key=f"course:{course.get('id', i)}",
+                content_hash=sha256_text(doc.page_content),
+                chunks=splitter.split_documents([doc]),
+            ))
+        return units
+
+    db = sync_faiss_index(
+        index_dir,
+        embeddings,
+        source_hashes={"courses": catalog.content_hash()},
+        params={
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "embedding_model": embedding_model_name(embeddings),
+        },
+        load_units=load_units,
+        dedup=dedup,
+        storage=storage,
+        index_config=index_spec(index_type, index_params),
+    )
+    return db.as_retriever()
@@ -0,0 +1,115 @@
+# ==============================
+# 🔍 의도 분류 라우터 (LLM / 로컬 임베딩 / 하이브리드)
+# ==============================
+# local : 질문 임베딩을 라벨별 예시 centroid 와 코사인 유사도로 비교
+# llm   : 기존처럼 routing_prompt 로 chat completion 호출
+# hybrid: 로컬 margin 이 임계값 미만일 때만 LLM 호출
+import json
+from typing import NamedTuple
+
+import numpy as np
+
+from config import CHAT_MODEL
+from llm_client import LLMUnavailableError
+
+ROUTES = ("agent1", "agent2")
+FALLBACK_ROUTE = "agent2"
+
+
+class RouteDecision(NamedTuple):
+    route: str
+    source: str     # "local" | "llm" | "fallback" (LLM 장애로 로컬 분류 사용)
+    margin: float   # 로컬 점수 차이 (llm 모드면 nan)
+
+
+def parse_route(raw: str) -> str:
+    raw = raw.strip().lower()
+    # 안정적 처리
+    if "agent1" in raw:
+        return "agent1"
+    if "agent2" in raw:
+        return "agent2"
+    return FALLBACK_ROUTE
+
+
+def classify_with_llm(client, routing_prompt_template, user_query: str) -> str:
+    formatted_prompt = routing_prompt_template.format(user_query=user_query)
+    response = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=[
+            {"role": "system", "content": "당신은 사용자 질문을 분류하는 시스템입니다."},
+            {"role": "user", "content": formatted_prompt}
+        ]
+    )
+    return parse_route(response.choices[0].message.content)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class IntentRouter:
+    def __init__(self, embeddings, llm_classify, examples_path: str,
+                 mode: str = "hybrid", margin_threshold: float = 0.03):
+        if mode not in ("llm", "local", "hybrid"):
+            raise ValueError(f"지원하지 않는 라우터 모드: {mode}")
+        self.embeddings = embeddings
+        self.llm_classify = llm_classify
+        self.examples_path = examples_path
+        self.mode = mode
+        self.margin_threshold = margin_threshold
+        self._centroids: np.ndarray | None = None
+
+    @property
+    def centroids(self) -> np.ndarray:
+        # 예시 임베딩은 최초 로컬 분류 시 한 번만 계산
+        if self._centroids is None:
+            with open(self.examples_path, "r", encoding="utf-8") as f:
+                examples = json.load(f)
+            rows = []
+            for label in ROUTES:
+                vectors = np.asarray(self.embeddings.embed_documents(examples[label]), dtype=np.float32)
+                rows.append(_normalize(_normalize(vectors).mean(axis=0)))
+            self._centroids = np.stack(rows)
+        return self._centroids
+
+    def local_scores(self, user_query: str) -> np.ndarray:
+        query = _normalize(np.asarray(self.embeddings.embed_query(user_query), dtype=np.float32))
+        return self.centroids @ query
+
+    def route(self, user_query: str, mode: str | None = None) -> RouteDecision:
+        mode = mode or self.mode
+        if mode == "llm":
+            try:
+                return RouteDecision(self.llm_classify(user_query), "llm", float("nan"))
+            except LLMUnavailableError:
+                return self.fallback_decision(user_query)
+
+        scores = self.local_scores(user_query)
+        best = int(np.argmax(scores))
+        margin = float(abs(scores[0] - scores[1]))
+        if mode == "hybrid" and margin < self.margin_threshold:
+            try:
+                return RouteDecision(self.llm_classify(user_query), "llm", margin)
+            except LLMUnavailableError:
+                return RouteDecision(ROUTES[best], "fallback", margin)
+        return RouteDecision(ROUTES[best], "local", margin)
+
+    def local_decision(self, user_query: str) -> RouteDecision | None:
+        # LLM 없이 확정되는 경우만 (local 모드, hybrid 에서 margin 이 충분할 때). 아니면 None
+        if self.mode == "llm":
+            return None
+        scores = self.local_scores(user_query)
+        margin = float(abs(scores[0] - scores[1]))
+        if self.mode == "hybrid" and margin < self.margin_threshold:
+            return None
+        return RouteDecision(ROUTES[int(np.argmax(scores))], "local", margin)
+
+    def fallback_decision(self, user_query: str) -> RouteDecision:
+        # LLM 분류 장애: 로컬 centroid 분류 (예시 임베딩도 실패하면 기본 라우트)
+        try:
+            scores = self.local_scores(user_query)
+        except Exception:
+            return RouteDecision(FALLBACK_ROUTE, "fallback", float("nan"))
+        return RouteDecision(ROUTES[int(np.argmax(scores))], "fallback", float(abs(scores[0] - scores[1])))
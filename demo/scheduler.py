@@ -0,0 +1,230 @@
+# ==============================
+# 🚦 프로세스 단위 LLM / 임베딩 요청 스케줄러 (RPM / TPM 토큰 버킷, 우선순위, 대화별 공정 큐)
+# ==============================
+# 세션마다 라우팅 / 질의 임베딩 / 답변 생성을 제각각 보내면 몰릴 때 OpenAI RPM / TPM 한도를 넘겨
+# 모두가 동시에 429 를 받습니다. 채팅 클라이언트(llm_client.py)와 임베딩(ScheduledEmbeddings)이
+# 보내기 전에 이 스케줄러에서 자리를 받습니다.
+# - 한도   : 분당 요청 수 / 분당 (추정) 토큰 수 토큰 버킷 + 동시 요청 수 상한 (0 이면 제한 없음)
+#            버킷 크기는 burst_seconds 초 분량이라 한도 안에서도 순간 몰림을 평탄하게 흘려보냄
+# - 우선순위: interactive(채팅 답변 / 질의 임베딩) > analysis(히스토리 분석) > batch(인덱스 빌드)
+#            대기 중인 상위 클래스 요청이 있으면 하위 클래스는 보내지 않음
+# - 공정 큐 : 같은 클래스 안에서는 conversation_id 별 큐를 돌아가며 하나씩 (한 대화의 연속 호출이
+#            다른 대화를 밀어내지 않음)
+# 우선순위와 conversation_id 는 request_context() 로 지정하며 contextvars 로 호출 경로를 따라갑니다.
+import time
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from langchain_core.embeddings import Embeddings
+
+from metrics import metrics
+from token_count import count_tokens
+
+PRIORITIES = ("interactive", "analysis", "batch")
+
+_priority: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_priority", default=None)
+_conversation: contextvars.ContextVar[str | None] = contextvars.ContextVar("conversation_id", default=None)
+
+
+class SchedulerTimeout(TimeoutError):
+    pass
+
+
+@contextmanager
+def request_context(priority: str | None = None, conversation_id: str | None = None):
+    # with request_context("analysis"): ... 안에서 보내는 요청의 우선순위 / 공정 큐 키
+    if priority is not None and priority not in PRIORITIES:
+        raise ValueError(f"지원하지 않는 우선순위: {priority} (가능: {', '.join(PRIORITIES)})")
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    if conversation_id is not None:
+        tokens.append((_conversation, _conversation.set(conversation_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def estimate_chat_tokens(messages: list[dict], max_tokens: int | None, completion_tokens: int) -> int:
+    # TPM 은 프롬프트 + 응답 토큰: 응답은 max_tokens 가 있으면 그 값, 없으면 completion_tokens 로 추정
+    prompt = sum(count_tokens(m.get("content") or "") + 4 for m in messages)
+    return prompt + (max_tokens or completion_tokens)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst_seconds: float = 1.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        # cost 를 꺼낼 수 있을 때까지 남은 초. 버킷보다 큰 요청은 가득 찼을 때 보내고 빚으로 남김
+        self._refill(now)
+        need = min(cost, self.capacity)
+        return 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+
+    def take(self, cost: float):
+        self.tokens -= cost
+
+
+class _Waiter:
+    __slots__ = ("tokens", "requests")
+
+    def __init__(self, tokens: int, requests: int):
+        self.tokens = tokens
+        self.requests = requests
+
+
+class Permit:
+    # 동시 요청 자리. 응답(스트림이면 마지막 청크)을 받은 뒤 release()
+    def __init__(self, scheduler: "RequestScheduler"):
+        self._scheduler = scheduler
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._scheduler._release()
+
+    def __enter__(self) -> "Permit":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class RequestScheduler:
+    def __init__(self, rpm: float = 0, tpm: float = 0, max_concurrency: int = 0,
+                 burst_seconds: float = 1.0, name: str = "scheduler"):
+        self.name = name
+        self.requests = TokenBucket(rpm, burst_seconds) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, burst_seconds) if tpm > 0 else None
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        # 우선순위 -> conversation_id -> 대기열 (OrderedDict 순서로 대화를 돌아가며 처리)
+        self._queues: dict[str, OrderedDict] = {priority: OrderedDict() for priority in PRIORITIES}
+        self._depth = 0
+
+    def _head(self) -> _Waiter | None:
+        for queue in self._queues.values():
+            if queue:
+                return next(iter(queue.values()))[0]
+        return None
+
+    def _wait_time(self, waiter: _Waiter, now: float) -> float | None:
+        # 0 이면 지금 보낼 수 있음, None 이면 동시 요청 자리가 날 때까지
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            return None
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(waiter.requests, now))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(waiter.tokens, now))
+        return max(waits)
+
+    def _admit(self, waiter: _Waiter):
+        if self.requests is not None:
+            self.requests.take(waiter.requests)
+        if self.tokens is not None:
+            self.tokens.take(waiter.tokens)
+        self.in_flight += 1
+
+    def _remove(self, priority: str, key, waiter: _Waiter, served: bool):
+        queue = self._queues[priority]
+        waiters = queue[key]
+        waiters.remove(waiter)
+        if not waiters:
+            del queue[key]
+        elif served:
+            queue.move_to_end(key)  # 다음 차례는 다른 대화
+        self._depth -= 1
+        metrics.gauge(f"{self.name}.queue_depth", self._depth)
+
+    def acquire(self, tokens: int, requests: int = 1, priority: str | None = None,
+                conversation_id: str | None = None, timeout: float | None = None) -> Permit:
+        priority = priority or _priority.get() or "interactive"
+        if priority not in PRIORITIES:
+            raise ValueError(f"지원하지 않는 우선순위: {priority} (가능: {', '.join(PRIORITIES)})")
+        key = conversation_id or _conversation.get()
+        waiter = _Waiter(tokens, requests)
+        start = time.monotonic()
+        with self._cond:
+            self._queues[priority].setdefault(key, deque()).append(waiter)
+            self._depth += 1
+            metrics.gauge(f"{self.name}.queue_depth", self._depth)
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(waiter, now) if self._head() is waiter else None
+                if wait == 0:
+                    break
+                if timeout is not None:
+                    remaining = start + timeout - now
+                    if remaining <= 0:
+                        self._remove(priority, key, waiter, served=False)
+                        self._cond.notify_all()
+                        metrics.incr(f"{self.name}.timeouts")
+                        raise SchedulerTimeout(f"요청 대기 시간 초과 ({timeout:.1f}s, 대기 {self._depth}건)")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+            self._remove(priority, key, waiter, served=True)
+            self._admit(waiter)
+            self._cond.notify_all()
+        waited_ms = (time.monotonic() - start) * 1000
+        metrics.observe(f"{self.name}.wait_ms", waited_ms)
+        metrics.observe(f"{self.name}.{priority}.wait_ms", waited_ms)
+        return Permit(self)
+
+    def try_acquire(self, tokens: int, requests: int = 1) -> Permit | None:
+        # 대기열이 비어 있고 지금 바로 보낼 수 있을 때만 (헤지 요청용, 기다리지 않음)
+        waiter = _Waiter(tokens, requests)
+        with self._cond:
+            if self._depth or self._wait_time(waiter, time.monotonic()) != 0:
+                return None
+            self._admit(waiter)
+        return Permit(self)
+
+    def _release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+
+class ScheduledEmbeddings(Embeddings):
+    # 임베딩 호출도 같은 방식으로 스케줄링. 질의(embed_query)는 interactive, 문서(embed_documents)는
+    # 인덱스 빌드이므로 batch 가 기본 (request_context 로 바꿀 수 있음)
+    def __init__(self, base: Embeddings, scheduler: RequestScheduler, timeout: float | None = None):
+        self.base = base
+        self.scheduler = scheduler
+        self.timeout = timeout
+
+    @property
+    def model(self) -> str:
+        return getattr(self.base, "model", None) or type(self.base).__name__
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        # OpenAIEmbeddings 는 chunk_size 개씩 나눠 요청
+        chunk_size = getattr(self.base, "chunk_size", None) or len(texts)
+        requests = -(-len(texts) // chunk_size)
+        tokens = sum(count_tokens(text) for text in texts)
+        with self.scheduler.acquire(tokens, requests, priority=_priority.get() or "batch", timeout=self.timeout):
+            return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with self.scheduler.acquire(count_tokens(text), timeout=self.timeout):
+            return self.base.embed_query(text)
@@ -0,0 +1,144 @@
+# ==============================
+# 🗂️ Agent1 의미 기반 응답 캐시
+# ==============================
+# 질문 임베딩과 최종 답변을 저장해 두고, 새 질문이 코사인 유사도 임계값 이상이면
+# 검색/생성 없이 저장된 답변을 반환합니다.
+# - LRU + TTL 만료, 최대 항목 수 제한
+# - 인덱스 디렉터리 파일(index.faiss, docstore.* 등) 지문이 바뀌면 전체 무효화
+#   지문(디렉터리 stat)은 조회마다가 아니라 fingerprint_interval 초마다 확인,
+#   인덱스를 다시 불러온 쪽은 check_fingerprint() 로 바로 확인
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from metrics import metrics
+
+
+class CacheEntry(NamedTuple):
+    vector: np.ndarray
+    answer: str
+    created_at: float
+    cost_ms: float  # 캐시 미스 시 답변 생성에 걸린 시간
+
+
+def index_fingerprint(index_dir: str) -> str:
+    parts = []
+    for name in sorted(os.listdir(index_dir)) if os.path.isdir(index_dir) else []:
+        stat = os.stat(os.path.join(index_dir, name))
+        parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512, ttl: float = 86400,
+                 fingerprint_fn=None, fingerprint_interval: float = 5.0, name: str = "semantic_cache"):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fingerprint_fn = fingerprint_fn
+        self.fingerprint_interval = fingerprint_interval
+        self.name = name
+        self._fingerprint = fingerprint_fn() if fingerprint_fn else None
+        self._fingerprint_checked = time.monotonic()
+        self._entries: OrderedDict[int, CacheEntry] = OrderedDict()
+        self._next_key = 0
+        self._matrix: np.ndarray | None = None  # 유사도 계산용 (entries 순서와 동일)
+        self._keys: list[int] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def check_fingerprint(self):
+        # 인덱스를 다시 불러온 직후 호출: 주기를 기다리지 않고 지문 확인
+        with self._lock:
+            self._check_fingerprint(force=True)
+
+    def _check_fingerprint(self, force: bool = False):
+        if self.fingerprint_fn is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._fingerprint_checked < self.fingerprint_interval:
+            return
+        self._fingerprint_checked = now
+        current = self.fingerprint_fn()
+        if current != self._fingerprint:
+            self._fingerprint = current
+            self._entries.clear()
+            self._matrix = None
+            metrics.incr(f"{self.name}.invalidations")
+
+    def _expire(self):
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _similarity_matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._keys = list(self._entries.keys())
+            self._matrix = (np.stack([self._entries[k].vector for k in self._keys])
+                            if self._keys else np.empty((0, 0), dtype=np.float32))
+        return self._matrix
+
+    def lookup(self, vector) -> str | None:
+        start = time.perf_counter()
+        query = self._unit(vector)
+        with self._lock:
+            self._check_fingerprint()
+            self._expire()
+            matrix = self._similarity_matrix()
+            hit = None
+            if len(self._keys):
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    key = self._keys[best]
+                    self._entries.move_to_end(key)
+                    hit = self._entries[key]
+
+            if hit is None:
+                self.misses += 1
+                metrics.incr(f"{self.name}.misses")
+                return None
+            saved = max(0.0, hit.cost_ms - (time.perf_counter() - start) * 1000)
+            self.hits += 1
+            self.saved_ms += saved
+        metrics.incr(f"{self.name}.hits")
+        metrics.incr(f"{self.name}.latency_saved_ms", saved)
+        return hit.answer
+
+    def put(self, vector, answer: str, cost_ms: float):
+        with self._lock:
+            self._entries[self._next_key] = CacheEntry(self._unit(vector), answer, time.time(), cost_ms)
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "latency_saved_ms": self.saved_ms,
+            }
@@ -0,0 +1,80 @@
+# ==============================
+# 🌊 그래프 응답 토큰 스트리밍
+# ==============================
+# graph.invoke 를 워커 스레드에서 실행하고, 노드가 on_token 으로 넘긴 토큰을
+# 큐를 통해 호출 스레드(Streamlit 스크립트 스레드)에 제너레이터로 전달합니다.
+# UI 갱신은 항상 호출 스레드에서만 일어납니다.
+# 워커 스레드는 호출 스레드의 contextvars(요청 우선순위 / conversation_id, scheduler.py)를 이어받습니다.
+import time
+import contextvars
+import queue
+import threading
+
+from metrics import metrics
+
+_DONE = object()
+
+
+class TokenStream:
+    def __init__(self, graph, state: dict):
+        self.graph = graph
+        self.state = state
+        self.route: str | None = None
+        self.result: dict | None = None
+        self.error: Exception | None = None
+        self.started_at: float | None = None
+        self.first_token_at: float | None = None
+        self.finished_at: float | None = None
+        self._queue: queue.Queue = queue.Queue()
+
+    def _set_route(self, route: str):
+        self.route = route
+
+    def _run(self):
+        try:
+            self.result = self.graph.invoke({
+                **self.state,
+                "on_token": self._queue.put,
+                "on_route": self._set_route,
+            })
+        except Exception as e:
+            self.error = e
+        finally:
+            self._queue.put(_DONE)
+
+    def __iter__(self):
+        self.started_at = time.perf_counter()
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(self._run,), daemon=True)
+        worker.start()
+        while True:
+            token = self._queue.get()
+            if token is _DONE:
+                break
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            yield token
+        worker.join()
+        self.finished_at = time.perf_counter()
+        self._record()
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def ttft_ms(self) -> float | None:
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started_at) * 1000
+
+    @property
+    def total_ms(self) -> float | None:
+        if self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at) * 1000
+
+    def _record(self):
+        route = self.route or "unknown"
+        metrics.observe("latency_ms", self.total_ms)
+        metrics.observe(f"{route}.latency_ms", self.total_ms)
+        if self.ttft_ms is not None:
+            metrics.observe("ttft_ms", self.ttft_ms)
+            metrics.observe(f"{route}.ttft_ms", self.ttft_ms)
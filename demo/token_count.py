@@ -0,0 +1,51 @@
+# ==============================
+# 🔢 토큰 수 계산 (tiktoken, 오프라인 근사 대체)
+# ==============================
+# tiktoken 은 최초 사용 시 BPE 파일을 내려받으므로 폐쇄망에서는 실패할 수 있습니다.
+# 그때는 한글 음절 / 영문 단어 / 숫자 3자리 / 기호 단위로 세는 근사 인코더를 사용합니다.
+import re
+import logging
+from functools import lru_cache
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+_APPROX = re.compile(r"[가-힣]|[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d가-힣]")
+
+
+class ApproxEncoding:
+    name = "approx"
+
+    def encode(self, text: str) -> list[str]:
+        return _APPROX.findall(text)
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str = "cl100k_base"):
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"tiktoken 인코딩({name})을 불러오지 못해 근사 토큰 수를 사용합니다: {e}")
+        return ApproxEncoding()
+
+
+def count_tokens(text: str, name: str = "cl100k_base") -> int:
+    return len(get_encoding(name).encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "start", name: str = "cl100k_base") -> str:
+    # 토큰 수가 max_tokens 이하가 되도록 문자 단위로 자름 (keep="end" 면 뒤쪽을 남김)
+    if count_tokens(text, name) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        part = text[:mid] if keep == "start" else text[-mid:]
+        if count_tokens(part, name) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    if not low:
+        return ""
+    return text[:low] if keep == "start" else text[-low:]
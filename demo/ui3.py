@@ -1,9 +1,19 @@
 # 변경 사항
     # 상단 로고가 내려오는 현상 수정
+    # 그래프 / 클라이언트를 앱 컨텍스트(ctx)로 전달받음
+    # 에이전트 응답을 토큰 단위로 스트리밍 표시
+    # 채팅 호출 장애 시 오류 문자열 대신 안내 문구 표시 (llm_client.py)
+    # 채팅 / 분석 호출에 우선순위와 conversation_id 지정 (scheduler.py)
 
 import streamlit as st
 from datetime import datetime
 
+from config import ANALYSIS_MODEL
+from metrics import metrics
+from streaming import TokenStream
+from llm_client import LLMUnavailableError
+from scheduler import request_context
+
 def render_samsung_header():
     samsung_blue = "#1428A0"
     st.markdown(
@@ -19,7 +29,14 @@ def render_samsung_header():
         unsafe_allow_html=True
     )
 
-def render_app_ui(graph, save_chat_to_db):
+def agent_header(route: str | None) -> str:
+    if route == "agent1":
+        return "📱 [루비콘 Agent]"
+    if route == "agent2":
+        return "🎓 [학습 추천 Agent]"
+    return "🤖 [Agent 응답]"
+
+def render_app_ui(ctx, save_chat_to_db):
     st.set_page_config(
         page_title="삼성 세일즈 Agentic 챗봇",
         page_icon="💼",
@@ -29,6 +46,9 @@ def render_app_ui(graph, save_chat_to_db):
     # === 세션 상태 초기화 ===
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
+    if "memory" not in st.session_state:
+        # Agent2 프롬프트용 대화 메모리 (화면용 HTML 이 아닌 정리된 텍스트, 토큰 상한)
+        st.session_state.memory = ctx.new_memory()
     if "selected_tab" not in st.session_state:
         st.session_state.selected_tab = "챗봇"
     if "is_typing" not in st.session_state:
@@ -211,24 +231,35 @@ def render_app_ui(graph, save_chat_to_db):
                 f'<div class="chat-bubble-user">🙍‍♂️ {user_input}</div>',
                 unsafe_allow_html=True
             )
-            with st.spinner("AI가 답변을 작성 중입니다..."):
-                st.session_state.is_typing = True
-                result = graph.invoke({"user_query": user_input})
-                response_text = result.get("final_response", "")
-                if isinstance(response_text, dict):
-                    response_text = response_text.get("result", str(response_text))
-                route_used = result.get("route", "")
-                if route_used == "agent1":
-                    response_header = "📱 [루비콘 Agent]"
-                elif route_used == "agent2":
-                    response_header = "🎓 [학습 추천 Agent]"
-                else:
-                    response_header = "🤖 [Agent 응답]"
-                bot_response = f"{response_header}<br><br>{response_text}"
-                st.markdown(
-                    f'<div class="chat-bubble-assistant">{bot_response}</div>',
-                    unsafe_allow_html=True
-                )
+            st.session_state.is_typing = True
+            bubble = st.empty()
+            bubble.markdown(
+                '<div class="chat-bubble-assistant">AI가 답변을 작성 중입니다...</div>',
+                unsafe_allow_html=True
+            )
+            stream = TokenStream(ctx.graph, {
+                "user_query": user_input,
+                "chat_history": st.session_state.chat_history,
+                "memory": st.session_state.memory,
+            })
+            partial_text = ""
+            # 이 대화의 호출은 interactive 우선순위, conversation_id 별 공정 큐로 스케줄링
+            with request_context("interactive", st.session_state.get("conversation_id")):
+                for token in stream:
+                    partial_text += token
+                    bubble.markdown(
+                        f'<div class="chat-bubble-assistant">{agent_header(stream.route)}<br><br>{partial_text}▌</div>',
+                        unsafe_allow_html=True
+                    )
+            result = stream.result
+            response_text = result.get("final_response", "")
+            if isinstance(response_text, dict):
+                response_text = response_text.get("result", str(response_text))
+            bot_response = f"{agent_header(result.get('route'))}<br><br>{response_text}"
+            bubble.markdown(
+                f'<div class="chat-bubble-assistant">{bot_response}</div>',
+                unsafe_allow_html=True
+            )
             st.session_state.is_typing = False
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             st.session_state.chat_history.append({
@@ -236,6 +267,8 @@ def render_app_ui(graph, save_chat_to_db):
                 "bot": bot_response,
                 "time": now
             })
+            with request_context("interactive", st.session_state.get("conversation_id")):
+                st.session_state.memory.add_turn(user_input, response_text)
             save_chat_to_db(user_input, response_text)
             st.rerun()
 
@@ -273,7 +306,6 @@ def render_app_ui(graph, save_chat_to_db):
 
         # 👇 분석 요청/결과 노출 (변경 없음)
         if "analysis_type" in st.session_state and st.session_state.analysis_type:
-            from stdemo7 import client  # LLM 인스턴스 가져오기
             history_str = ""
             for turn in st.session_state.chat_history:
                 history_str += f"사용자: {turn['user']}\n"
@@ -286,14 +318,18 @@ def render_app_ui(graph, save_chat_to_db):
                 prompt = f"아래는 사용자의 세일즈/학습 관련 대화 기록입니다.\n이 사용자에게 맞는 학습 방법/전략을 2~3개 추천해 주세요.\n\n{history_str}"
             with st.spinner("AI가 히스토리 분석 중..."):
                 try:
-                    res = client.chat.completions.create(
-                        model="gpt-4.1-nano",
-                        messages=[
-                            {"role": "system", "content": "세일즈/학습 전문가"},
-                            {"role": "user", "content": prompt}
-                        ]
-                    )
+                    # 히스토리 분석은 채팅 답변보다 낮은 우선순위
+                    with request_context("analysis", st.session_state.get("conversation_id")):
+                        res = ctx.client.chat.completions.create(
+                            model=ANALYSIS_MODEL,
+                            messages=[
+                                {"role": "system", "content": "세일즈/학습 전문가"},
+                                {"role": "user", "content": prompt}
+                            ]
+                        )
                     result_text = res.choices[0].message.content.strip()
+                except LLMUnavailableError:
+                    result_text = "⚠️ 지금은 분석 요청이 몰려 응답이 지연되고 있습니다. 잠시 후 다시 시도해 주세요."
                 except Exception as e:
                     result_text = f"❗분석 오류: {e}"
                 st.session_state.analysis_result = result_text
@@ -312,6 +348,16 @@ def render_app_ui(graph, save_chat_to_db):
         st.session_state.dark_mode = dark_mode_val        
         st.info("추후 사용자 프로필, 다크모드, 데이터 초기화 등 환경설정 메뉴를 구현 예정!")
         st.info("Router 기반으로 Agent1, Agent2를 구분하는 것이 아닌, 탭에서 Agent1, Agent2를 선택하는 방향도 고려 중")
+        with st.expander("⏱️ 앱 초기화 시간 (프로세스당 1회)"):
+            st.code(ctx.startup_report())
+        with st.expander("📈 응답 지표 (TTFT / 전체 지연, ms)"):
+            st.json(metrics.summary())
+        if ctx.answer_cache is not None:
+            with st.expander("🗂️ Agent1 응답 캐시"):
+                st.json(ctx.answer_cache.stats())
+        if hasattr(ctx.chat_writer, "stats"):
+            with st.expander("💾 대화 저장 outbox 상태"):
+                st.json(ctx.chat_writer.stats())
 
     st.markdown('</div>', unsafe_allow_html=True)  # main-container end
 
@@ -0,0 +1,164 @@
+# ==============================
+# 🗜️ 압축 / 근사 벡터 인덱스 (IVF, PQ, HNSW, 스칼라 양자화)
+# ==============================
+# 강의 카탈로그가 수십만~백만 건이 되면 Flat(float32 전수 비교)은 메모리와 검색 시간이 선형으로 늘어납니다.
+#   flat      : IndexFlatL2 (기준, 정확)
+#   ivf_flat  : 클러스터 nlist 개 중 nprobe 개만 스캔, 벡터는 float32 그대로
+#   ivf_pq    : IVF + product quantization (벡터당 pq_m 바이트, 기본 차원/8, 메모리 최소)
+#   hnsw      : 그래프 탐색 (빠름, 그래프 링크만큼 메모리 추가)
+#   sq_fp16   : float16 저장 (메모리 1/2, 정확도 거의 동일)
+#   sq_int8   : 차원별 8bit 양자화 (메모리 1/4)
+# 학습이 필요한 타입은 최대 train_size 개 표본으로 학습합니다. 빌드 파라미터는 매니페스트 params 에 들어가
+# 바뀌면 전체 재빌드되고, 학습된 중심점/코드북은 index.faiss 에 함께 저장됩니다.
+# nprobe / ef_search 는 검색 시점 파라미터라 재빌드 없이 로드할 때마다 적용합니다.
+import math
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "sq_fp16", "sq_int8")
+BUILD_DEFAULTS = {"nlist": 0, "pq_m": 0, "pq_nbits": 8, "hnsw_m": 32, "ef_construction": 80, "train_size": 50_000}
+SEARCH_DEFAULTS = {"nprobe": 16, "ef_search": 64}
+
+
+def index_spec(index_type: str = "flat", params: dict | None = None) -> dict:
+    # {"type", 빌드 파라미터..., "search": {검색 파라미터}} (nlist / pq_m 의 0 은 벡터 수/차원으로 자동 결정)
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 타입: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+    params = dict(params or {})
+    unknown = set(params) - set(BUILD_DEFAULTS) - set(SEARCH_DEFAULTS)
+    if unknown:
+        raise ValueError(f"알 수 없는 인덱스 파라미터: {sorted(unknown)}")
+    spec = {"type": index_type}
+    spec.update({key: int(params.get(key, value)) for key, value in BUILD_DEFAULTS.items()})
+    spec["search"] = {key: int(params.get(key, value)) for key, value in SEARCH_DEFAULTS.items()}
+    return spec
+
+
+def build_params(spec: dict | None) -> dict | None:
+    # 매니페스트에 기록할 빌드 파라미터 (flat 은 None -> 기존 매니페스트와 호환)
+    if not spec or spec["type"] == "flat":
+        return None
+    return {key: value for key, value in spec.items() if key != "search"}
+
+
+def _pq_m(dim: int, requested: int) -> int:
+    if requested:
+        if dim % requested:
+            raise ValueError(f"pq_m({requested})은 임베딩 차원({dim})의 약수여야 합니다")
+        return requested
+    # 기본: 서브벡터당 8차원 (1536 차원 -> 192 바이트, float32 대비 1/32)
+    return next(m for m in range(max(1, dim // 8), 0, -1) if dim % m == 0)
+
+
+def resolved_build(spec: dict, n: int, dim: int) -> dict:
+    # 벡터 수에 맞춘 실제 빌드 값: nlist ≈ 4√n (클러스터당 학습 표본 39 개 이상), PQ 중심점 수 ≤ n
+    resolved = dict(spec)
+    if spec["type"].startswith("ivf"):
+        nlist = spec["nlist"] or int(4 * math.sqrt(max(n, 1)))
+        resolved["nlist"] = max(1, min(nlist, min(n, spec["train_size"]) // 39))
+    if spec["type"] == "ivf_pq":
+        resolved["pq_m"] = _pq_m(dim, spec["pq_m"])
+        resolved["pq_nbits"] = max(1, min(spec["pq_nbits"], int(math.log2(max(min(n, spec["train_size"]), 2)))))
+    return resolved
+
+
+def _factory_string(spec: dict) -> str:
+    kind = spec["type"]
+    if kind == "flat":
+        return "Flat"
+    if kind == "ivf_flat":
+        return f"IVF{spec['nlist']},Flat"
+    if kind == "ivf_pq":
+        return f"IVF{spec['nlist']},PQ{spec['pq_m']}x{spec['pq_nbits']}"
+    if kind == "hnsw":
+        return f"HNSW{spec['hnsw_m']},Flat"
+    return "SQfp16" if kind == "sq_fp16" else "SQ8"
+
+
+def build_index(spec: dict | None, vectors: np.ndarray, seed: int = 0):
+    # 학습까지 끝난 빈 인덱스 (벡터 추가는 호출 쪽에서 -> docstore id 와 같은 순서 유지)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    spec = resolved_build(spec or index_spec(), n, dim)
+    index = faiss.index_factory(dim, _factory_string(spec), faiss.METRIC_L2)
+    base = faiss.downcast_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efConstruction = spec["ef_construction"]
+    if isinstance(base, faiss.IndexIVFPQ):
+        base.do_polysemous_training = False  # 해밍 필터 검색은 쓰지 않음 (학습 시간만 수 배)
+    if not index.is_trained:
+        sample = vectors
+        if n > spec["train_size"]:
+            sample = vectors[np.sort(np.random.default_rng(seed).choice(n, spec["train_size"], replace=False))]
+        index.train(sample)
+    if isinstance(base, faiss.IndexIVF):
+        # reconstruct(MMR, 압축 재구성)를 위해 id -> (리스트, 위치) 배열 유지
+        base.set_direct_map_type(faiss.DirectMap.Array)
+    return index
+
+
+def configure_search(index, spec: dict | None):
+    base = faiss.downcast_index(index)
+    search = (spec or index_spec())["search"]
+    if isinstance(base, faiss.IndexIVF):
+        base.nprobe = min(search["nprobe"], base.nlist)
+    elif isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = search["ef_search"]
+
+
+def search_parameters(index, selector):
+    # IDSelector 검색 시 인덱스 타입별 파라미터 객체 (IVF 는 SearchParametersIVF 만 허용, nprobe 도 함께 전달)
+    base = faiss.downcast_index(index)
+    if isinstance(base, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=base.nprobe)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=base.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def cosine_similarity(index, rows, query_vector) -> np.ndarray:
+    # 저장된 벡터를 복원해 질의와의 코사인 유사도 (RRF / 재정렬 점수와 달리 검색 방식과 무관하게 비교 가능)
+    rows = np.asarray(rows, dtype=np.int64)
+    if rows.size == 0:
+        return np.empty(0, dtype=np.float32)
+    vectors = index.reconstruct_batch(rows)
+    query = np.asarray(query_vector, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    return (vectors @ query / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def supports_row_removal(index) -> bool:
+    # remove_ids 후 남은 벡터가 0..n-1 로 당겨지는 타입 (LangChain FAISS.delete 의 가정)
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlatCodes)
+
+
+def delete_documents(db, ids: list[str]):
+    # IVF / HNSW: 남길 벡터를 복원해 학습된 빈 인덱스에 다시 추가 (재학습/재임베딩 없음)
+    if supports_row_removal(db.index):
+        db.delete(ids)
+        return
+    removed = set(ids)
+    keep = np.asarray([row for row in range(db.index.ntotal) if db.index_to_docstore_id[row] not in removed],
+                      dtype=np.int64)
+    kept_ids = [db.index_to_docstore_id[int(row)] for row in keep]
+    index = faiss.clone_index(db.index)  # 학습 상태와 nprobe / efSearch 유지
+    index.reset()
+    if keep.size:
+        index.add(db.index.reconstruct_batch(keep))
+    db.index = index
+    db.docstore.delete(ids)
+    db.index_to_docstore_id = dict(enumerate(kept_ids))
+
+
+def describe_index(index) -> dict:
+    # 매니페스트에 남길 실제 인덱스 구성 (자동 결정된 nlist / 코드 크기 확인용)
+    base = faiss.downcast_index(index)
+    info = {"class": type(base).__name__, "ntotal": int(index.ntotal), "dim": int(index.d)}
+    if isinstance(base, faiss.IndexIVF):
+        info.update(nlist=int(base.nlist), nprobe=int(base.nprobe), code_size=int(base.code_size))
+    elif isinstance(base, faiss.IndexHNSW):
+        info.update(hnsw_m=int(base.hnsw.nb_neighbors(1)), ef_search=int(base.hnsw.efSearch))
+    elif isinstance(base, faiss.IndexFlatCodes):
+        info.update(code_size=int(base.code_size))
+    return info